@@ -0,0 +1,140 @@
+"""
+工具测试脚本的公共部分
+
+各工具目录下的 test_*.py 既可以用 pytest 运行，也可以直接 python3 运行：
+  - fixture 声明的夹具在 pytest 下注册为模块级 fixture，直接运行时由 run_tests 按参数名注入
+  - run_tests 依次运行测试函数，为每个测试打印「测试 N: 说明」标题，最后汇总结果并以退出码表示成败
+测试中用 check 断言并打印每一项检查；缺少线上服务地址、可选依赖等条件时用 skip 跳过。
+"""
+
+import inspect
+import itertools
+import sys
+import traceback
+import unittest
+from contextlib import ExitStack
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence
+
+try:
+    import pytest
+except ImportError:
+    pytest = None
+
+# 模块名 -> {夹具名: (函数, 参数取值)}，供直接运行时注入
+_FIXTURES: Dict[str, Dict[str, tuple]] = {}
+
+
+def check(name: str, condition: Any, detail: Any = "") -> None:
+    """打印一项检查的结果，不满足时抛出 AssertionError"""
+    print(f"  {'✓' if condition else '✗'} {name}{'：' + str(detail) if detail else ''}")
+    if not condition:
+        raise AssertionError(name)
+
+
+def skip(reason: str) -> None:
+    """跳过当前测试（pytest 与 run_tests 都识别 unittest.SkipTest）"""
+    raise unittest.SkipTest(reason)
+
+
+def fixture(params: Optional[Sequence[Any]] = None, ids: Optional[Sequence[str]] = None) -> Callable:
+    """
+    声明模块级夹具
+
+    夹具函数的参数为其依赖的其他夹具；提供 params 时另有一个 param 参数，依赖它的测试对每个取值各运行一遍。
+    夹具函数可以是生成器：yield 之前为准备，之后为清理。
+    """
+    def decorate(func: Callable) -> Any:
+        _FIXTURES.setdefault(func.__module__, {})[func.__name__] = (func, params)
+        if pytest is None:
+            return func
+        names = [name for name in inspect.signature(func).parameters if name != "param"]
+
+        def call(request, kwargs):
+            if params is not None:
+                kwargs["param"] = request.param
+            return func(**kwargs)
+
+        if inspect.isgeneratorfunction(func):
+            def wrapper(request, **kwargs):
+                yield from call(request, kwargs)
+        else:
+            def wrapper(request, **kwargs):
+                return call(request, kwargs)
+        # pytest 按签名解析依赖，带 params 的夹具必须静态声明才能参数化依赖它的测试
+        wrapper.__signature__ = inspect.Signature([
+            inspect.Parameter(name, inspect.Parameter.POSITIONAL_OR_KEYWORD) for name in ["request"] + names
+        ])
+        wrapper.__doc__ = func.__doc__
+        return pytest.fixture(scope="module", params=params, ids=ids, name=func.__name__)(wrapper)
+    return decorate
+
+
+def _dependencies(func: Callable, registry: Dict[str, tuple]) -> list:
+    return [name for name in inspect.signature(func).parameters if name in registry]
+
+
+def _param_fixtures(func: Callable, registry: Dict[str, tuple], seen: Optional[set] = None) -> set:
+    """func 直接或间接依赖的带 params 的夹具"""
+    seen = set() if seen is None else seen
+    found = set()
+    for name in _dependencies(func, registry):
+        if name in seen:
+            continue
+        seen.add(name)
+        if registry[name][1] is not None:
+            found.add(name)
+        found |= _param_fixtures(registry[name][0], registry, seen)
+    return found
+
+
+def run_tests(title: str, tests: Iterable[Callable]) -> None:
+    """直接运行脚本时的入口：依次运行 tests，打印汇总后退出（有失败时退出码为 1）"""
+    tests = list(tests)
+    registry = _FIXTURES.get(tests[0].__module__, {}) if tests else {}
+    param_names = [name for name, (_, params) in registry.items() if params is not None]
+    print(f"\n开始运行 {title}\n")
+
+    failed = False
+    done = set()
+    for combo in itertools.product(*(registry[name][1] for name in param_names)):
+        chosen = dict(zip(param_names, combo))
+        with ExitStack() as stack:
+            values: Dict[str, Any] = {}
+
+            def resolve(name: str) -> Any:
+                if name not in values:
+                    func, params = registry[name]
+                    kwargs = {dep: resolve(dep) for dep in _dependencies(func, registry)}
+                    if params is not None:
+                        kwargs["param"] = chosen[name]
+                    value = func(**kwargs)
+                    if inspect.isgenerator(value):
+                        generator = value
+                        value = next(generator)
+                        stack.callback(lambda g=generator: next(g, None))
+                    values[name] = value
+                return values[name]
+
+            for number, test in enumerate(tests, 1):
+                key = (test, tuple(sorted((name, repr(chosen[name])) for name in _param_fixtures(test, registry))))
+                if key in done:
+                    continue
+                done.add(key)
+                print("=" * 60)
+                print(f"测试 {number}: {(test.__doc__ or test.__name__).strip().splitlines()[0]}")
+                print("=" * 60)
+                try:
+                    test(**{name: resolve(name) for name in _dependencies(test, registry)})
+                except unittest.SkipTest as e:
+                    print(f"  - 跳过：{e}")
+                except AssertionError:
+                    failed = True
+                except Exception:
+                    failed = True
+                    traceback.print_exc()
+                print()
+
+    print("=" * 60)
+    print("测试失败" if failed else "测试完成")
+    print("=" * 60)
+    sys.exit(1 if failed else 0)
@@ -2,11 +2,1696 @@
 """
 AWS 综合服务管理器 - 单一函数，全部参数写在入参里
 支持：S3、Lambda、RDS、DynamoDB、CloudWatch 等常见 AWS 服务
-所有逻辑在一个 def 里，不调用任何其他 py 文件，直接使用 boto3
+所有逻辑在本文件内，不调用任何其他 py 文件，直接使用 boto3
 """
+from __future__ import annotations
+
+import base64
+import copy
+import hashlib
 import json
-from typing import Optional, Dict, Any, List
-import boto3
+import os
+import queue
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Tuple, Iterator
+
+
+# ========== boto3 client 缓存 ==========
+# service 参数 -> boto3 client 名称
+_SERVICE_CLIENT_NAMES = {
+    "s3": "s3",
+    "lambda": "lambda",
+    "rds": "rds",
+    "dynamodb": "dynamodb",
+    "cloudwatch_logs": "logs",
+    "logs": "logs",
+}
+
+# 最多缓存的 client 数量，超出后淘汰最久未使用的
+_CLIENT_CACHE_MAX_SIZE = 32
+# client 空闲超过该秒数后淘汰
+_CLIENT_IDLE_TTL = 600
+# 每个 client 的 HTTP 连接池大小，需不小于并发线程数
+_CLIENT_MAX_POOL_CONNECTIONS = 32
+
+# (access_key, 凭证指纹, region, client 名称) -> (client, 最后使用时间)
+_CLIENT_CACHE: "OrderedDict[Tuple[str, str, str, str], Tuple[Any, float]]" = OrderedDict()
+_CLIENT_CACHE_LOCK = threading.Lock()
+# boto3 Session 创建 client 不是线程安全的，创建过程使用单独的锁，不阻塞缓存查找
+_CLIENT_BUILD_LOCK = threading.Lock()
+
+
+# ========== 延迟导入 boto3 ==========
+# boto3/botocore 在首次创建 client 时才导入，参数校验失败等路径不再承担导入开销。
+# 进程内共享的 boto3 Session，在 _CLIENT_BUILD_LOCK 内创建和使用
+_boto3_session: Any = None
+
+
+def _get_boto3_session() -> Any:
+    """延迟导入 boto3 并创建共享 Session，调用方需持有 _CLIENT_BUILD_LOCK"""
+    global _boto3_session
+    if _boto3_session is None:
+        import boto3.session
+        _boto3_session = boto3.session.Session()
+    return _boto3_session
+
+
+def _credential_fingerprint(access_key: str, secret_key: str) -> str:
+    """凭证指纹，避免在缓存键中保存明文 secret_key"""
+    return hashlib.sha256(f"{access_key}:{secret_key}".encode("utf-8")).hexdigest()
+
+
+def _get_client(access_key: str, secret_key: str, region: str, client_name: str) -> Any:
+    """
+    获取进程内共享的 boto3 client，只创建当前服务需要的那一个
+
+    - 以 (凭证, region, 服务) 为键缓存，命中时直接复用
+    - 超过 _CLIENT_IDLE_TTL 未使用的 client 会被淘汰
+    - 缓存数量超过 _CLIENT_CACHE_MAX_SIZE 时按 LRU 淘汰
+    - 同一 access_key 出现新的 secret_key（凭证轮换）时，清除旧凭证的全部 client
+    """
+    fingerprint = _credential_fingerprint(access_key, secret_key)
+    cache_key = (access_key, fingerprint, region, client_name)
+    now = time.monotonic()
+
+    with _CLIENT_CACHE_LOCK:
+        for k in list(_CLIENT_CACHE.keys()):
+            _, last_used = _CLIENT_CACHE[k]
+            if now - last_used > _CLIENT_IDLE_TTL or (k[0] == access_key and k[1] != fingerprint):
+                del _CLIENT_CACHE[k]
+
+        cached = _CLIENT_CACHE.get(cache_key)
+        if cached is not None:
+            _CLIENT_CACHE[cache_key] = (cached[0], now)
+            _CLIENT_CACHE.move_to_end(cache_key)
+            return cached[0]
+
+    # 在缓存锁之外创建 client，慢速创建不会阻塞其他账号、region 的查找；
+    # 每个 client 只加载自身服务的模型
+    with _CLIENT_BUILD_LOCK:
+        # 等待创建锁期间可能已由其他线程创建
+        with _CLIENT_CACHE_LOCK:
+            cached = _CLIENT_CACHE.get(cache_key)
+            if cached is not None:
+                return cached[0]
+        from botocore.config import Config
+        client = _get_boto3_session().client(
+            client_name,
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key,
+            region_name=region,
+            config=Config(max_pool_connections=_CLIENT_MAX_POOL_CONNECTIONS)
+        )
+        with _CLIENT_CACHE_LOCK:
+            _CLIENT_CACHE[cache_key] = (client, time.monotonic())
+            while len(_CLIENT_CACHE) > _CLIENT_CACHE_MAX_SIZE:
+                _CLIENT_CACHE.popitem(last=False)
+        return client
+
+
+def clear_client_cache(access_key: Optional[str] = None) -> int:
+    """
+    清除缓存的 boto3 client
+
+    参数:
+        access_key: 只清除该 access_key 对应的 client；为空时清除全部
+    返回:
+        被清除的 client 数量
+    """
+    with _CLIENT_CACHE_LOCK:
+        if access_key is None:
+            count = len(_CLIENT_CACHE)
+            _CLIENT_CACHE.clear()
+            return count
+        keys = [k for k in _CLIENT_CACHE if k[0] == access_key]
+        for k in keys:
+            del _CLIENT_CACHE[k]
+        return len(keys)
+
+
+# ========== S3 分页列举 ==========
+# S3 单页最多返回 1000 个键
+_S3_PAGE_SIZE = 1000
+# 未指定 max_keys 时单次调用最多返回的条目数，保证内存有界
+_S3_DEFAULT_MAX_KEYS = 10000
+# list_objects 未指定 max_items 时沿用单次 list_objects_v2 调用的上限
+_S3_LIST_OBJECTS_DEFAULT_MAX_ITEMS = _S3_PAGE_SIZE
+
+
+def _iter_s3_object_pages(
+    client: Any,
+    bucket_name: str,
+    prefix: Optional[str] = None,
+    delimiter: Optional[str] = None,
+    start_after: Optional[str] = None,
+    continuation_token: Optional[str] = None,
+    max_keys: Optional[int] = None,
+    page_size: Optional[int] = None
+):
+    """
+    逐页列举 S3 对象的生成器，每次 yield 一页 (objects, common_prefixes, next_token)
+
+    - objects: [{"key", "size", "etag", "last_modified"}]
+    - common_prefixes: 指定 delimiter 时的公共前缀（"目录"）
+    - next_token: 从本页之后继续列举的令牌，没有更多数据时为 None
+
+    max_keys 为对象与公共前缀的总预算，最后一页的 MaxKeys 会收缩到剩余预算，
+    因此返回的 next_token 能精确地从预算截止处继续列举。
+    next_token 为 S3 原生的 ContinuationToken，list_objects 与 list_objects_paginated 可互相续传。
+    """
+    remaining = max_keys if max_keys and max_keys > 0 else None
+    page_limit = min(_S3_PAGE_SIZE, int(page_size)) if page_size and int(page_size) > 0 else _S3_PAGE_SIZE
+    kwargs = {'Bucket': bucket_name}
+    if prefix:
+        kwargs['Prefix'] = prefix
+    if delimiter:
+        kwargs['Delimiter'] = delimiter
+    if continuation_token:
+        kwargs['ContinuationToken'] = continuation_token
+    elif start_after:
+        kwargs['StartAfter'] = start_after
+
+    while True:
+        kwargs['MaxKeys'] = min(page_limit, remaining) if remaining is not None else page_limit
+        response = client.list_objects_v2(**kwargs)
+        objects = [{
+            'key': obj['Key'],
+            'size': obj.get('Size'),
+            'etag': obj.get('ETag', '').strip('"'),
+            'last_modified': obj['LastModified'].isoformat() if obj.get('LastModified') else None
+        } for obj in response.get('Contents', [])]
+        common_prefixes = [p['Prefix'] for p in response.get('CommonPrefixes', [])]
+        next_token = response.get('NextContinuationToken') if response.get('IsTruncated') else None
+        yield objects, common_prefixes, next_token
+
+        if remaining is not None:
+            remaining -= len(objects) + len(common_prefixes)
+            if remaining <= 0:
+                return
+        if not next_token:
+            return
+        kwargs['ContinuationToken'] = next_token
+        kwargs.pop('StartAfter', None)
+
+
+# ========== S3 分片上传 / 并行分段下载 ==========
+# S3 分片最小 5 MiB（最后一片除外），最多 10000 片
+_S3_MIN_PART_SIZE = 5 * 1024 * 1024
+_S3_MAX_PARTS = 10000
+_S3_DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+_S3_DEFAULT_CONCURRENCY = 8
+# 读取响应流时的缓冲块大小
+_S3_STREAM_BLOCK_SIZE = 1024 * 1024
+
+
+def _resolve_transfer_options(chunk_size: Optional[int], max_concurrency: Optional[int]) -> Tuple[int, int]:
+    """规范化分片大小与并发数，并发数不超过 client 连接池大小"""
+    chunk_size = int(chunk_size) if chunk_size else _S3_DEFAULT_CHUNK_SIZE
+    max_concurrency = int(max_concurrency) if max_concurrency else _S3_DEFAULT_CONCURRENCY
+    max_concurrency = max(1, min(max_concurrency, _CLIENT_MAX_POOL_CONNECTIONS))
+    return chunk_size, max_concurrency
+
+
+def _s3_upload_file(
+    client: Any,
+    bucket_name: str,
+    object_key: str,
+    local_file_path: str,
+    chunk_size: int,
+    max_concurrency: int
+) -> Dict[str, Any]:
+    """
+    从本地文件上传对象，按二进制流式读取
+
+    文件不超过一个分片时直接 put_object；否则使用分片上传，
+    各分片在线程池中由工作线程各自读取并上传，内存占用约为 max_concurrency 个分片。
+    任一分片失败时中止分片上传，避免残留未完成的分片。
+    """
+    file_size = os.path.getsize(local_file_path)
+    chunk_size = max(chunk_size, _S3_MIN_PART_SIZE)
+    if file_size > chunk_size * _S3_MAX_PARTS:
+        chunk_size = -(-file_size // _S3_MAX_PARTS)
+
+    if file_size <= chunk_size:
+        with open(local_file_path, 'rb') as f:
+            response = client.put_object(Bucket=bucket_name, Key=object_key, Body=f)
+        return {"size": file_size, "parts": 1, "etag": response.get('ETag', '').strip('"')}
+
+    upload_id = client.create_multipart_upload(Bucket=bucket_name, Key=object_key)['UploadId']
+
+    def upload_part(part_number: int) -> Dict[str, Any]:
+        offset = (part_number - 1) * chunk_size
+        with open(local_file_path, 'rb') as f:
+            f.seek(offset)
+            body = f.read(chunk_size)
+        response = client.upload_part(
+            Bucket=bucket_name,
+            Key=object_key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=body
+        )
+        return {'PartNumber': part_number, 'ETag': response['ETag']}
+
+    part_count = -(-file_size // chunk_size)
+    try:
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            parts = list(executor.map(upload_part, range(1, part_count + 1)))
+        response = client.complete_multipart_upload(
+            Bucket=bucket_name,
+            Key=object_key,
+            UploadId=upload_id,
+            MultipartUpload={'Parts': parts}
+        )
+    except Exception:
+        client.abort_multipart_upload(Bucket=bucket_name, Key=object_key, UploadId=upload_id)
+        raise
+    return {"size": file_size, "parts": part_count, "etag": response.get('ETag', '').strip('"')}
+
+
+def _s3_download_file(
+    client: Any,
+    bucket_name: str,
+    object_key: str,
+    local_file_path: str,
+    chunk_size: int,
+    max_concurrency: int
+) -> Dict[str, Any]:
+    """
+    下载对象到本地文件
+
+    对象超过一个分片时按 Range 分段，在线程池中并行 GET，
+    各段以流的方式写入文件对应偏移处，内存占用与对象大小无关。
+    分段大小与上传相同，最小 5 MiB。
+    """
+    chunk_size = max(chunk_size, _S3_MIN_PART_SIZE)
+    head = client.head_object(Bucket=bucket_name, Key=object_key)
+    file_size = head['ContentLength']
+    # 以 ETag 固定对象版本，避免下载过程中对象被覆盖导致各段不一致
+    etag = head.get('ETag')
+
+    def write_range(start: int, end: Optional[int]) -> None:
+        kwargs = {'Bucket': bucket_name, 'Key': object_key}
+        if end is not None:
+            kwargs['Range'] = f"bytes={start}-{end}"
+            if etag:
+                kwargs['IfMatch'] = etag
+        body = client.get_object(**kwargs)['Body']
+        with open(local_file_path, 'r+b') as f:
+            f.seek(start)
+            for block in iter(lambda: body.read(_S3_STREAM_BLOCK_SIZE), b''):
+                f.write(block)
+
+    with open(local_file_path, 'wb') as f:
+        f.truncate(file_size)
+
+    if file_size <= chunk_size:
+        write_range(0, None)
+        return {"size": file_size, "parts": 1, "local_file_path": local_file_path}
+
+    ranges = [(start, min(start + chunk_size, file_size) - 1) for start in range(0, file_size, chunk_size)]
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        list(executor.map(lambda r: write_range(*r), ranges))
+    return {"size": file_size, "parts": len(ranges), "local_file_path": local_file_path}
+
+
+# ========== DynamoDB 批量读写 ==========
+# BatchWriteItem 每批最多 25 项，BatchGetItem 每批最多 100 个键
+_DYNAMODB_WRITE_BATCH_SIZE = 25
+_DYNAMODB_GET_BATCH_SIZE = 100
+# 未处理项重试次数与指数退避参数（秒）
+_DYNAMODB_BATCH_MAX_RETRIES = 8
+_DYNAMODB_BACKOFF_BASE = 0.05
+_DYNAMODB_BACKOFF_MAX = 5.0
+
+
+def _dynamodb_backoff(attempt: int) -> None:
+    """指数退避 + 抖动"""
+    delay = min(_DYNAMODB_BACKOFF_MAX, _DYNAMODB_BACKOFF_BASE * (2 ** attempt))
+    time.sleep(random.uniform(0, delay))
+
+
+def _sum_consumed_capacity(consumed: Optional[List[Dict[str, Any]]]) -> float:
+    return sum(c.get('CapacityUnits', 0) for c in consumed or [])
+
+
+def _dynamodb_run_batches(
+    batches: List[Any],
+    run_batch: Any,
+    max_concurrency: int
+) -> List[Dict[str, Any]]:
+    """在线程池中并发执行各批次，按批次顺序返回结果"""
+    indexed = list(enumerate(batches))
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        return list(executor.map(lambda ib: run_batch(*ib), indexed))
+
+
+def _dynamodb_batch_write(
+    client: Any,
+    table_name: str,
+    requests: List[Dict[str, Any]],
+    max_concurrency: int
+) -> Dict[str, Any]:
+    """
+    按 25 项一批并发执行 BatchWriteItem，UnprocessedItems 以指数退避重新提交
+
+    requests 为 [{"PutRequest": {...}} | {"DeleteRequest": {...}}]
+    """
+    batches = [requests[i:i + _DYNAMODB_WRITE_BATCH_SIZE] for i in range(0, len(requests), _DYNAMODB_WRITE_BATCH_SIZE)]
+
+    def run_batch(index: int, batch: List[Dict[str, Any]]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        pending = {table_name: batch}
+        consumed = 0.0
+        attempts = 0
+        while pending:
+            if attempts > _DYNAMODB_BATCH_MAX_RETRIES:
+                break
+            if attempts:
+                _dynamodb_backoff(attempts)
+            response = client.batch_write_item(RequestItems=pending, ReturnConsumedCapacity='TOTAL')
+            attempts += 1
+            consumed += _sum_consumed_capacity(response.get('ConsumedCapacity'))
+            pending = response.get('UnprocessedItems') or {}
+        return {
+            "batch": index,
+            "size": len(batch),
+            "attempts": attempts,
+            "unprocessed": len(pending.get(table_name, [])),
+            "consumed_capacity": consumed,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2)
+        }
+
+    started = time.perf_counter()
+    batch_results = _dynamodb_run_batches(batches, run_batch, max_concurrency)
+    return {
+        "table_name": table_name,
+        "requested": len(requests),
+        "written": len(requests) - sum(b["unprocessed"] for b in batch_results),
+        "unprocessed": sum(b["unprocessed"] for b in batch_results),
+        "consumed_capacity": sum(b["consumed_capacity"] for b in batch_results),
+        "batch_count": len(batches),
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        "batches": batch_results
+    }
+
+
+def _dynamodb_batch_get(
+    client: Any,
+    table_name: str,
+    keys: List[Dict[str, Any]],
+    max_concurrency: int
+) -> Dict[str, Any]:
+    """按 100 个键一批并发执行 BatchGetItem，UnprocessedKeys 以指数退避重新提交"""
+    batches = [keys[i:i + _DYNAMODB_GET_BATCH_SIZE] for i in range(0, len(keys), _DYNAMODB_GET_BATCH_SIZE)]
+
+    def run_batch(index: int, batch: List[Dict[str, Any]]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        pending = {table_name: {'Keys': batch}}
+        items = []
+        consumed = 0.0
+        attempts = 0
+        while pending:
+            if attempts > _DYNAMODB_BATCH_MAX_RETRIES:
+                break
+            if attempts:
+                _dynamodb_backoff(attempts)
+            response = client.batch_get_item(RequestItems=pending, ReturnConsumedCapacity='TOTAL')
+            attempts += 1
+            consumed += _sum_consumed_capacity(response.get('ConsumedCapacity'))
+            items.extend(response.get('Responses', {}).get(table_name, []))
+            pending = response.get('UnprocessedKeys') or {}
+        return {
+            "batch": index,
+            "size": len(batch),
+            "attempts": attempts,
+            "unprocessed": len(pending.get(table_name, {}).get('Keys', [])),
+            "consumed_capacity": consumed,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            "items": items
+        }
+
+    started = time.perf_counter()
+    batch_results = _dynamodb_run_batches(batches, run_batch, max_concurrency)
+    items = []
+    for b in batch_results:
+        items.extend(b.pop("items"))
+    return {
+        "table_name": table_name,
+        "items": items,
+        "count": len(items),
+        "requested": len(keys),
+        "unprocessed": sum(b["unprocessed"] for b in batch_results),
+        "consumed_capacity": sum(b["consumed_capacity"] for b in batch_results),
+        "batch_count": len(batches),
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        "batches": batch_results
+    }
+
+
+# ========== DynamoDB 分页 Query / 并行分段 Scan ==========
+# 未指定 max_items 且未写入本地文件时单次调用最多返回的项数
+_DYNAMODB_DEFAULT_MAX_ITEMS = 10000
+_DYNAMODB_DEFAULT_TOTAL_SEGMENTS = 4
+# 并行 Scan 时每个分段最多缓冲的页数
+_DYNAMODB_SCAN_QUEUE_PAGES_PER_SEGMENT = 2
+_SCAN_SEGMENT_DONE = object()
+
+
+def _dynamodb_read_kwargs(
+    table_name: str,
+    index_name: Optional[str] = None,
+    filter_expression: Optional[str] = None,
+    projection_expression: Optional[str] = None,
+    expression_attribute_names: Optional[str] = None,
+    expression_attribute_values: Optional[str] = None
+) -> Dict[str, Any]:
+    """构造 Query / Scan 共用的请求参数，JSON 字符串参数在此解析"""
+    kwargs = {'TableName': table_name}
+    if index_name:
+        kwargs['IndexName'] = index_name
+    if filter_expression:
+        kwargs['FilterExpression'] = filter_expression
+    if projection_expression:
+        kwargs['ProjectionExpression'] = projection_expression
+    if expression_attribute_names:
+        kwargs['ExpressionAttributeNames'] = json.loads(expression_attribute_names)
+    if expression_attribute_values:
+        kwargs['ExpressionAttributeValues'] = json.loads(expression_attribute_values)
+    return kwargs
+
+
+def _dynamodb_key_condition(kwargs: Dict[str, Any], key_dict: Dict[str, Any]) -> None:
+    """由主键 JSON 生成等值 KeyConditionExpression，合并进请求参数"""
+    conditions = []
+    names = kwargs.setdefault('ExpressionAttributeNames', {})
+    values = kwargs.setdefault('ExpressionAttributeValues', {})
+    for i, (attr, value) in enumerate(key_dict.items()):
+        names[f"#key{i}"] = attr
+        values[f":key{i}"] = value
+        conditions.append(f"#key{i} = :key{i}")
+    kwargs['KeyConditionExpression'] = " AND ".join(conditions)
+
+
+def _iter_dynamodb_query_pages(
+    client: Any,
+    query_kwargs: Dict[str, Any],
+    max_items: Optional[int] = None
+) -> Iterator[Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]]:
+    """
+    自动跟随 LastEvaluatedKey 的 Query 生成器，每次 yield 一页 (items, last_evaluated_key)
+
+    指定 max_items 时每页的 Limit 收缩到剩余预算，预算用完时返回的
+    last_evaluated_key 可以精确地作为 ExclusiveStartKey 继续查询。
+    """
+    kwargs = dict(query_kwargs)
+    remaining = max_items if max_items and max_items > 0 else None
+    while True:
+        if remaining is not None:
+            kwargs['Limit'] = remaining
+        response = client.query(**kwargs)
+        items = response.get('Items', [])
+        last_key = response.get('LastEvaluatedKey')
+        yield items, last_key
+        if remaining is not None:
+            remaining -= len(items)
+            if remaining <= 0:
+                return
+        if not last_key:
+            return
+        kwargs['ExclusiveStartKey'] = last_key
+
+
+def _iter_dynamodb_parallel_scan(
+    client: Any,
+    scan_kwargs: Dict[str, Any],
+    total_segments: int,
+    max_concurrency: int
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    并行分段 Scan 生成器，按页 yield 各分段读到的项（分段之间不保证顺序）
+
+    表被切分为 total_segments 个分段，由线程池并行读取，读到的页放入有界队列，
+    调用方消费多快、工作线程就读多快，内存占用与表大小无关。
+    调用方提前停止迭代（如达到预算）时，工作线程在当前请求完成后退出。
+    """
+    pages: "queue.Queue[Any]" = queue.Queue(maxsize=total_segments * _DYNAMODB_SCAN_QUEUE_PAGES_PER_SEGMENT)
+    stop = threading.Event()
+
+    def put(value: Any) -> None:
+        while not stop.is_set():
+            try:
+                pages.put(value, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def scan_segment(segment: int) -> None:
+        kwargs = dict(scan_kwargs, Segment=segment, TotalSegments=total_segments)
+        try:
+            while not stop.is_set():
+                response = client.scan(**kwargs)
+                put(response.get('Items', []))
+                last_key = response.get('LastEvaluatedKey')
+                if not last_key:
+                    break
+                kwargs['ExclusiveStartKey'] = last_key
+        except Exception as e:
+            put(e)
+        finally:
+            put(_SCAN_SEGMENT_DONE)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(total_segments, max_concurrency)))
+    try:
+        for segment in range(total_segments):
+            executor.submit(scan_segment, segment)
+        done = 0
+        while done < total_segments:
+            page = pages.get()
+            if page is _SCAN_SEGMENT_DONE:
+                done += 1
+            elif isinstance(page, Exception):
+                raise page
+            else:
+                yield page
+    finally:
+        stop.set()
+        executor.shutdown(wait=True)
+
+
+def _collect_dynamodb_items(
+    pages: Iterator[List[Dict[str, Any]]],
+    max_items: Optional[int],
+    local_file_path: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], int, bool]:
+    """
+    消费分页生成器，返回 (items, count, truncated)
+
+    指定 local_file_path 时逐项以 JSON Lines 写入文件而不在内存中保留，items 为空列表；
+    达到 max_items 后立即停止迭代。
+    """
+    items = []
+    count = 0
+    truncated = False
+    f = open(local_file_path, 'w', encoding='utf-8') if local_file_path else None
+    try:
+        for page in pages:
+            for entry in page:
+                if max_items and count >= max_items:
+                    truncated = True
+                    break
+                if f:
+                    f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+                else:
+                    items.append(entry)
+                count += 1
+            if truncated or (max_items and count >= max_items):
+                break
+    finally:
+        if f:
+            f.close()
+        close = getattr(pages, 'close', None)
+        if close:
+            close()
+    return items, count, truncated
+
+
+# ========== CloudWatch Logs 分时段并行检索 / 批量写入 ==========
+_LOGS_DEFAULT_TIME_SLICES = 8
+# 未指定 max_items 时单次调用最多返回的事件数
+_LOGS_DEFAULT_MAX_EVENTS = 10000
+# 未指定 start_time 时默认检索最近 1 小时
+_LOGS_DEFAULT_WINDOW_MS = 60 * 60 * 1000
+# PutLogEvents 限制：每批最多 10000 条、1 MiB（每条额外计 26 字节）、时间跨度不超过 24 小时
+_LOGS_PUT_MAX_EVENTS = 10000
+_LOGS_PUT_MAX_BYTES = 1048576
+_LOGS_PUT_EVENT_OVERHEAD = 26
+_LOGS_PUT_MAX_SPAN_MS = 24 * 60 * 60 * 1000
+
+
+def _iter_log_events_time_sliced(
+    client: Any,
+    filter_kwargs: Dict[str, Any],
+    start_ms: int,
+    end_ms: int,
+    time_slices: int,
+    max_concurrency: int,
+    max_events: Optional[int] = None
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    分时段并行检索日志事件的生成器，按时间先后逐个时段 yield 事件列表
+
+    [start_ms, end_ms] 被切分为 time_slices 个互不重叠的时段，每个时段由线程池
+    自动跟随 nextToken 翻页读取并按时间排序；时段按先后顺序输出，因此整体按时间有序。
+    最多同时预取 max_concurrency 个时段，每个时段最多读取 max_events 条，
+    调用方停止迭代后尚未开始的时段会被取消，进行中的时段在当前请求完成后退出。
+    """
+    time_slices = max(1, min(time_slices, end_ms - start_ms + 1))
+    step = (end_ms - start_ms + 1) // time_slices
+    bounds = []
+    for i in range(time_slices):
+        slice_start = start_ms + i * step
+        slice_end = end_ms if i == time_slices - 1 else slice_start + step - 1
+        bounds.append((slice_start, slice_end))
+    stop = threading.Event()
+
+    def fetch_slice(slice_start: int, slice_end: int) -> List[Dict[str, Any]]:
+        kwargs = dict(filter_kwargs, startTime=slice_start, endTime=slice_end)
+        events = []
+        while not stop.is_set():
+            response = client.filter_log_events(**kwargs)
+            events.extend(response.get('events', []))
+            if max_events and len(events) >= max_events:
+                break
+            token = response.get('nextToken')
+            if not token:
+                break
+            kwargs['nextToken'] = token
+        events.sort(key=lambda e: (e['timestamp'], e.get('ingestionTime', 0)))
+        return events
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(time_slices, max_concurrency)))
+    pending = deque()
+    remaining = iter(bounds)
+    try:
+        for b in remaining:
+            pending.append(executor.submit(fetch_slice, *b))
+            if len(pending) >= max_concurrency:
+                break
+        while pending:
+            events = pending.popleft().result()
+            nxt = next(remaining, None)
+            if nxt is not None:
+                pending.append(executor.submit(fetch_slice, *nxt))
+            yield events
+    finally:
+        stop.set()
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+def _logs_put_batches(events: List[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+    """按 PutLogEvents 的条数、字节数与 24 小时跨度限制切分已排序的事件"""
+    batch = []
+    batch_bytes = 0
+    for event in events:
+        size = len(event['message'].encode('utf-8')) + _LOGS_PUT_EVENT_OVERHEAD
+        if batch and (
+            len(batch) >= _LOGS_PUT_MAX_EVENTS
+            or batch_bytes + size > _LOGS_PUT_MAX_BYTES
+            or event['timestamp'] - batch[0]['timestamp'] >= _LOGS_PUT_MAX_SPAN_MS
+        ):
+            yield batch
+            batch = []
+            batch_bytes = 0
+        batch.append(event)
+        batch_bytes += size
+    if batch:
+        yield batch
+
+
+# ========== Lambda 并发扇出调用 ==========
+_LAMBDA_INVOCATION_TYPES = ("RequestResponse", "Event")
+# 每个调用结果最多保留的返回内容字节数
+_LAMBDA_PAYLOAD_PREVIEW_BYTES = 1024
+
+
+def _lambda_fan_out(
+    client: Any,
+    function_name: str,
+    payloads: List[Any],
+    invocation_type: str,
+    max_concurrency: int
+) -> Dict[str, Any]:
+    """
+    在线程池中并发调用同一函数，按输入顺序返回每次调用的结果
+
+    单次调用失败只记录在该调用的结果中，不影响其他调用；
+    返回内容只读取前 _LAMBDA_PAYLOAD_PREVIEW_BYTES 字节。
+    """
+    def invoke(index: int, payload: Any) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            response = client.invoke(
+                FunctionName=function_name,
+                InvocationType=invocation_type,
+                Payload=json.dumps(payload)
+            )
+            body = response['Payload']
+            preview = body.read(_LAMBDA_PAYLOAD_PREVIEW_BYTES + 1)
+            body.close()
+            return {
+                "index": index,
+                "success": not response.get('FunctionError'),
+                "status_code": response.get('StatusCode'),
+                "function_error": response.get('FunctionError'),
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                "payload": preview[:_LAMBDA_PAYLOAD_PREVIEW_BYTES].decode('utf-8', errors='replace'),
+                "payload_truncated": len(preview) > _LAMBDA_PAYLOAD_PREVIEW_BYTES,
+                "error": None
+            }
+        except Exception as e:
+            return {
+                "index": index,
+                "success": False,
+                "status_code": None,
+                "function_error": None,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                "payload": None,
+                "payload_truncated": False,
+                "error": str(e)
+            }
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        results = list(executor.map(lambda ip: invoke(*ip), enumerate(payloads)))
+    succeeded = sum(1 for r in results if r["success"])
+    return {
+        "function_name": function_name,
+        "invocation_type": invocation_type,
+        "count": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        "invocations": results
+    }
+
+
+# ========== 通用分页 ==========
+# 未指定 max_items 时列表类操作单次调用最多返回的条目数
+_PAGINATION_DEFAULT_MAX_ITEMS = 10000
+_PAGE_STREAM_DONE = object()
+
+
+def _prefetch_pages(pages: Any, depth: int) -> Iterator[Any]:
+    """
+    在后台线程中预取最多 depth 页，使下一页的网络请求与调用方处理当前页重叠
+
+    调用方提前停止迭代时，后台线程在当前请求完成后退出。
+    """
+    buffer: "queue.Queue[Any]" = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(value: Any) -> None:
+        while not stop.is_set():
+            try:
+                buffer.put(value, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def produce() -> None:
+        try:
+            for page in pages:
+                if stop.is_set():
+                    return
+                put(page)
+        except Exception as e:
+            put(e)
+        finally:
+            put(_PAGE_STREAM_DONE)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            page = buffer.get()
+            if page is _PAGE_STREAM_DONE:
+                return
+            if isinstance(page, Exception):
+                raise page
+            yield page
+    finally:
+        stop.set()
+        producer.join()
+
+
+class _PageStream:
+    """
+    基于 botocore paginator 的分页流，逐页迭代 API 响应
+
+    - max_items: 最多返回的条目总数，由 botocore 在页内精确截断
+    - page_size: 每次请求的页大小
+    - starting_token: 上次返回的 resume_token（也兼容服务原生的 nextToken）
+    - prefetch: 预取页数，大于 0 时在后台线程提前请求下一页
+    迭代结束后 resume_token 为继续分页的令牌，没有更多数据时为 None。
+    不支持分页的操作退化为单次调用。
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        operation: str,
+        kwargs: Optional[Dict[str, Any]] = None,
+        max_items: Optional[int] = None,
+        page_size: Optional[int] = None,
+        starting_token: Optional[str] = None,
+        prefetch: int = 0
+    ):
+        self.client = client
+        self.operation = operation
+        self.kwargs = kwargs or {}
+        self.max_items = max_items
+        self.page_size = page_size
+        self.starting_token = starting_token
+        self.prefetch = prefetch
+        self.resume_token = None
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        if not self.client.can_paginate(self.operation):
+            yield getattr(self.client, self.operation)(**self.kwargs)
+            return
+        config = {}
+        if self.max_items:
+            config['MaxItems'] = int(self.max_items)
+        if self.page_size:
+            config['PageSize'] = int(self.page_size)
+        if self.starting_token:
+            config['StartingToken'] = self.starting_token
+        page_iterator = self.client.get_paginator(self.operation).paginate(**self.kwargs, PaginationConfig=config)
+        pages = _prefetch_pages(page_iterator, self.prefetch) if self.prefetch else iter(page_iterator)
+        try:
+            for page in pages:
+                yield page
+        finally:
+            close = getattr(pages, 'close', None)
+            if close:
+                close()
+        self.resume_token = page_iterator.resume_token
+
+
+def _paginate_items(
+    client: Any,
+    operation: str,
+    result_key: str,
+    p: Dict[str, Any],
+    kwargs: Optional[Dict[str, Any]] = None,
+    transform: Any = None
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    列表类操作共用的分页：按 max_items / page_size / next_token / prefetch 参数读取全部页，
+    返回 (条目列表, next_token)
+    """
+    stream = _PageStream(
+        client,
+        operation,
+        kwargs,
+        max_items=p.get("max_items") or _PAGINATION_DEFAULT_MAX_ITEMS,
+        page_size=p.get("page_size"),
+        starting_token=p.get("next_token"),
+        prefetch=int(p.get("prefetch") or 0)
+    )
+    items = []
+    for page in stream:
+        for entry in page.get(result_key, []):
+            items.append(transform(entry) if transform else entry)
+    return items, stream.resume_token
+
+
+# ========== 只读操作 TTL 缓存 ==========
+# (规范服务名, 操作名) -> (TTL 秒, 该操作最多缓存的条目数)
+_READ_CACHE_POLICIES = {
+    ("s3", "list_buckets"): (60, 64),
+    ("lambda", "list_functions"): (60, 64),
+    ("lambda", "get_function"): (60, 256),
+    ("rds", "list_instances"): (30, 64),
+    ("rds", "describe_instance"): (30, 256),
+    ("dynamodb", "list_tables"): (60, 64),
+    ("dynamodb", "describe_table"): (30, 256),
+    ("cloudwatch_logs", "describe_log_groups"): (60, 64),
+}
+
+# 写操作 -> 需要失效的只读操作列表 [(操作名, 资源参数名)]
+# 资源参数名为 None 时失效该操作的全部缓存，否则只失效资源参数取值相同的缓存
+_READ_CACHE_INVALIDATIONS = {
+    ("s3", "create_bucket"): [("list_buckets", None)],
+    ("s3", "delete_bucket"): [("list_buckets", None)],
+    ("lambda", "delete_function"): [("list_functions", None), ("get_function", "function_name")],
+    ("rds", "delete_instance"): [("list_instances", None), ("describe_instance", "db_instance_identifier")],
+    ("dynamodb", "delete_table"): [("list_tables", None), ("describe_table", "table_name")],
+    ("dynamodb", "put_item"): [("describe_table", "table_name")],
+    ("dynamodb", "delete_item"): [("describe_table", "table_name")],
+    ("dynamodb", "batch_write_items"): [("describe_table", "table_name")],
+    ("cloudwatch_logs", "create_log_group"): [("describe_log_groups", None)],
+    ("cloudwatch_logs", "delete_log_group"): [("describe_log_groups", None)],
+}
+
+# 结果与 region 无关的只读操作（S3 桶列表是全局的），写操作后失效该账号所有 region 下的缓存
+_READ_CACHE_GLOBAL_ACTIONS = frozenset({("s3", "list_buckets")})
+
+# 缓存键中不参与区分的参数
+_READ_CACHE_IGNORED_PARAMS = frozenset(("region", "use_cache"))
+
+# (规范服务名, 操作名) -> OrderedDict[缓存键 -> (过期时间, data, 参数)]
+_READ_CACHE: Dict[Tuple[str, str], "OrderedDict[Tuple[Any, ...], Tuple[float, Any, Dict[str, Any]]]"] = {}
+# "服务.操作" -> {"hits", "misses", "invalidations"}
+_READ_CACHE_STATS: Dict[str, Dict[str, int]] = {}
+_READ_CACHE_LOCK = threading.Lock()
+_READ_CACHE_MISS = object()
+
+
+def _read_cache_stats_entry(service: str, action: str) -> Dict[str, int]:
+    return _READ_CACHE_STATS.setdefault(f"{service}.{action}", {"hits": 0, "misses": 0, "invalidations": 0})
+
+
+def _read_cache_key(
+    access_key: str,
+    secret_key: str,
+    region: str,
+    service: str,
+    action: str,
+    params: Dict[str, Any]
+) -> Tuple[Tuple[Any, ...], Dict[str, Any]]:
+    """以 (账号凭证指纹, region, 服务, 操作, 参数) 构造缓存键，同时返回参与区分的参数"""
+    args = {k: v for k, v in params.items() if v is not None and k not in _READ_CACHE_IGNORED_PARAMS}
+    args_json = json.dumps(args, sort_keys=True, default=str)
+    return (_credential_fingerprint(access_key, secret_key), region, service, action, args_json), args
+
+
+def _read_cache_get(service: str, action: str, cache_key: Tuple[Any, ...]) -> Any:
+    """命中时返回 data 的副本，未命中或已过期返回 _READ_CACHE_MISS"""
+    now = time.monotonic()
+    with _READ_CACHE_LOCK:
+        stats = _read_cache_stats_entry(service, action)
+        entries = _READ_CACHE.get((service, action))
+        entry = entries.get(cache_key) if entries else None
+        if entry is None or entry[0] <= now:
+            if entry is not None:
+                del entries[cache_key]
+            stats["misses"] += 1
+            return _READ_CACHE_MISS
+        entries.move_to_end(cache_key)
+        stats["hits"] += 1
+        return copy.deepcopy(entry[1])
+
+
+def _read_cache_put(service: str, action: str, cache_key: Tuple[Any, ...], args: Dict[str, Any], data: Any) -> None:
+    ttl, max_entries = _READ_CACHE_POLICIES[(service, action)]
+    with _READ_CACHE_LOCK:
+        entries = _READ_CACHE.setdefault((service, action), OrderedDict())
+        entries[cache_key] = (time.monotonic() + ttl, copy.deepcopy(data), args)
+        entries.move_to_end(cache_key)
+        while len(entries) > max_entries:
+            entries.popitem(last=False)
+
+
+def _read_cache_invalidate(
+    access_key: str,
+    secret_key: str,
+    region: str,
+    service: str,
+    action: str,
+    params: Dict[str, Any]
+) -> None:
+    """写操作后失效同一账号、region 下受影响的只读缓存；全局只读操作失效所有 region 的缓存"""
+    targets = _READ_CACHE_INVALIDATIONS.get((service, action))
+    if not targets:
+        return
+    fingerprint = _credential_fingerprint(access_key, secret_key)
+    with _READ_CACHE_LOCK:
+        for read_action, resource_param in targets:
+            entries = _READ_CACHE.get((service, read_action))
+            if not entries:
+                continue
+            any_region = (service, read_action) in _READ_CACHE_GLOBAL_ACTIONS
+            stale = [
+                k for k, (_, _, args) in entries.items()
+                if k[0] == fingerprint and (any_region or k[1] == region)
+                and (resource_param is None or args.get(resource_param) == params.get(resource_param))
+            ]
+            for k in stale:
+                del entries[k]
+            _read_cache_stats_entry(service, read_action)["invalidations"] += len(stale)
+
+
+def _read_cache_stats_snapshot() -> Dict[str, Any]:
+    """
+    只读缓存的命中统计，用于调整各操作的 TTL
+
+    返回:
+        {"hits": int, "misses": int, "hit_rate": float, "size": int, "actions": {"服务.操作": {...}}}
+    """
+    with _READ_CACHE_LOCK:
+        actions = {}
+        for name, stats in _READ_CACHE_STATS.items():
+            service, action = name.split(".", 1)
+            lookups = stats["hits"] + stats["misses"]
+            actions[name] = {
+                **stats,
+                "hit_rate": round(stats["hits"] / lookups, 4) if lookups else 0.0,
+                "size": len(_READ_CACHE.get((service, action), ())),
+                "ttl": _READ_CACHE_POLICIES.get((service, action), (None,))[0]
+            }
+        hits = sum(a["hits"] for a in actions.values())
+        misses = sum(a["misses"] for a in actions.values())
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "size": sum(len(e) for e in _READ_CACHE.values()),
+            "actions": actions
+        }
+
+
+def _read_cache_admin(action: str) -> Dict[str, Any]:
+    """
+    action="cache_stats" 返回只读缓存的命中统计；
+    action="cache_clear" 返回清空前的统计，然后清空缓存并清零统计
+    """
+    data = _read_cache_stats_snapshot()
+    if action == "cache_clear":
+        with _READ_CACHE_LOCK:
+            _READ_CACHE.clear()
+            _READ_CACHE_STATS.clear()
+    return {"success": True, "service": None, "action": action, "data": data, "error": None}
+
+
+# ========== 操作注册表 ==========
+# service 参数 -> 规范服务名（用于注册表与返回结果）
+_SERVICE_CANONICAL_NAMES = {
+    "s3": "s3",
+    "lambda": "lambda",
+    "rds": "rds",
+    "dynamodb": "dynamodb",
+    "cloudwatch_logs": "cloudwatch_logs",
+    "logs": "cloudwatch_logs",
+}
+_SERVICE_DISPLAY_NAMES = {
+    "s3": "S3",
+    "lambda": "Lambda",
+    "rds": "RDS",
+    "dynamodb": "DynamoDB",
+    "cloudwatch_logs": "CloudWatch Logs",
+}
+
+# (规范服务名, 操作名) -> (处理函数, 必需参数)
+# 必需参数中的元组表示"其中至少一个"
+_ACTION_REGISTRY: Dict[Tuple[str, str], Tuple[Any, Tuple[Any, ...]]] = {}
+
+
+class _ParamError(ValueError):
+    """参数校验失败，错误信息原样返回给调用方"""
+
+
+def _register_action(service: str, action: str, required: Tuple[Any, ...] = (),
+                     _registry: Dict[Tuple[str, str], Tuple[Any, Tuple[Any, ...]]] = _ACTION_REGISTRY):
+    """将处理函数注册为 (service, action) 的实现，处理函数签名为 (client, params) -> data"""
+    # 注册表通过默认参数绑定：MaxKB 以 exec(code, globals, locals) 加载代码，装饰器执行时模块级名字尚未进入 globals
+    def decorator(func):
+        _registry[(service, action)] = (func, required)
+        return func
+    return decorator
+
+
+def _missing_params(params: Dict[str, Any], required: Tuple[Any, ...]) -> Optional[str]:
+    """检查必需参数，缺失时返回与原有格式一致的错误信息"""
+    missing = False
+    names = []
+    for r in required:
+        alternatives = r if isinstance(r, tuple) else (r,)
+        names.append(" or ".join(alternatives))
+        if not any(params.get(a) for a in alternatives):
+            missing = True
+    if not missing:
+        return None
+    if len(names) == 1:
+        return f"Missing required parameter: {names[0]}"
+    return f"Missing required parameters: {', '.join(names)}"
+
+
+def _error_result(service: Optional[str], action: Optional[str], error: str) -> Dict[str, Any]:
+    return {"success": False, "service": service, "action": action, "data": {}, "error": error}
+
+
+def _resolve_operation(service: Optional[str], action: Optional[str], params: Dict[str, Any]):
+    """
+    校验一次操作并定位处理函数
+
+    返回 (规范服务名, 规范操作名, 处理函数)；校验失败时返回错误结果字典
+    """
+    if not service:
+        return _error_result(None, action, "Missing required parameter: service")
+    if not action:
+        return _error_result(service, None, "Missing required parameter: action")
+    canonical_service = _SERVICE_CANONICAL_NAMES.get(service.lower())
+    if canonical_service is None:
+        return _error_result(service, action, f"Unsupported service: {service}")
+    action_lower = action.lower()
+    entry = _ACTION_REGISTRY.get((canonical_service, action_lower))
+    if entry is None:
+        return _error_result(service, action, f"Unsupported {_SERVICE_DISPLAY_NAMES[canonical_service]} action: {action}")
+    handler_func, required = entry
+    error = _missing_params(params, required)
+    if error:
+        return _error_result(canonical_service, action, error)
+    return canonical_service, action_lower, handler_func
+
+
+def _execute_operation(
+    access_key: str,
+    secret_key: str,
+    region: str,
+    service: Optional[str],
+    action: Optional[str],
+    params: Dict[str, Any],
+    client: Any = None
+) -> Dict[str, Any]:
+    """校验并执行一次操作，返回统一格式的结果；client 为空时从缓存获取"""
+    resolved = _resolve_operation(service, action, params)
+    if isinstance(resolved, dict):
+        return resolved
+    canonical_service, canonical_action, handler_func = resolved
+
+    cache_key = None
+    if params.get("use_cache") and (canonical_service, canonical_action) in _READ_CACHE_POLICIES:
+        cache_key, cache_args = _read_cache_key(access_key, secret_key, region, canonical_service, canonical_action, params)
+        data = _read_cache_get(canonical_service, canonical_action, cache_key)
+        if data is not _READ_CACHE_MISS:
+            return {
+                "success": True,
+                "service": canonical_service,
+                "action": canonical_action,
+                "data": data,
+                "error": None
+            }
+
+    if client is None:
+        try:
+            client = _get_client(access_key, secret_key, region, _SERVICE_CLIENT_NAMES[canonical_service])
+        except Exception as e:
+            return _error_result(service, action, f"Failed to create AWS client: {str(e)}")
+
+    try:
+        data = handler_func(client, params)
+    except _ParamError as e:
+        return _error_result(canonical_service, action, str(e))
+    except Exception as e:
+        # 写操作失败时也可能已部分生效，同样失效相关缓存
+        _read_cache_invalidate(access_key, secret_key, region, canonical_service, canonical_action, params)
+        return _error_result(service, action, str(e))
+    _read_cache_invalidate(access_key, secret_key, region, canonical_service, canonical_action, params)
+    if cache_key is not None:
+        _read_cache_put(canonical_service, canonical_action, cache_key, cache_args, data)
+    return {
+        "success": True,
+        "service": canonical_service,
+        "action": canonical_action,
+        "data": data,
+        "error": None
+    }
+
+
+# ==================== S3 服务 ====================
+@_register_action("s3", "list_buckets")
+def _s3_list_buckets(client: Any, p: Dict[str, Any]) -> Dict[str, Any]:
+    buckets, token = _paginate_items(client, 'list_buckets', 'Buckets', p, transform=lambda b: b['Name'])
+    return {"buckets": buckets, "count": len(buckets), "next_token": token}
+
+
+@_register_action("s3", "list_objects", ("bucket_name",))
+def _s3_list_objects(client: Any, p: Dict[str, Any]) -> Dict[str, Any]:
+    objects = []
+    token = None
+    for page_objects, _, token in _iter_s3_object_pages(
+        client,
+        p["bucket_name"],
+        continuation_token=p.get("next_token"),
+        max_keys=p.get("max_items") or _S3_LIST_OBJECTS_DEFAULT_MAX_ITEMS,
+        page_size=p.get("page_size")
+    ):
+        objects.extend(obj['key'] for obj in page_objects)
+    return {"objects": objects, "count": len(objects), "next_token": token}
+
+
+@_register_action("s3", "list_objects_paginated", ("bucket_name",))
+def _s3_list_objects_paginated(client: Any, p: Dict[str, Any]) -> Dict[str, Any]:
+    objects = []
+    common_prefixes = []
+    token = None
+    for page_objects, page_prefixes, token in _iter_s3_object_pages(
+        client,
+        p["bucket_name"],
+        prefix=p.get("prefix"),
+        delimiter=p.get("delimiter"),
+        start_after=p.get("start_after"),
+        continuation_token=p.get("next_token"),
+        max_keys=p.get("max_keys") or _S3_DEFAULT_MAX_KEYS
+    ):
+        objects.extend(page_objects)
+        common_prefixes.extend(page_prefixes)
+    return {
+        "objects": objects,
+        "common_prefixes": common_prefixes,
+        "count": len(objects),
+        "next_token": token,
+        "is_truncated": token is not None
+    }
+
+
+@_register_action("s3", "upload_object", ("bucket_name", "object_key", ("file_content", "local_file_path")))
+def _s3_upload_object(client: Any, p: Dict[str, Any]) -> Dict[str, Any]:
+    bucket_name, object_key = p["bucket_name"], p["object_key"]
+    if p.get("local_file_path"):
+        part_size, concurrency = _resolve_transfer_options(p.get("chunk_size"), p.get("max_concurrency"))
+        result = _s3_upload_file(client, bucket_name, object_key, p["local_file_path"], part_size, concurrency)
+        return {"bucket": bucket_name, "key": object_key, **result}
+    client.put_object(Bucket=bucket_name, Key=object_key, Body=p["file_content"].encode('utf-8'))
+    return {"bucket": bucket_name, "key": object_key}
+
+
+@_register_action("s3", "download_object", ("bucket_name", "object_key"))
+def _s3_download_object(client: Any, p: Dict[str, Any]) -> Dict[str, Any]:
+    bucket_name, object_key = p["bucket_name"], p["object_key"]
+    if p.get("local_file_path"):
+        part_size, concurrency = _resolve_transfer_options(p.get("chunk_size"), p.get("max_concurrency"))
+        result = _s3_download_file(client, bucket_name, object_key, p["local_file_path"], part_size, concurrency)
+        return {"bucket": bucket_name, "key": object_key, **result}
+    body = client.get_object(Bucket=bucket_name, Key=object_key)['Body'].read()
+    try:
+        content, encoding = body.decode('utf-8'), "utf-8"
+    except UnicodeDecodeError:
+        content, encoding = base64.b64encode(body).decode('ascii'), "base64"
+    return {"bucket": bucket_name, "key": object_key, "content": content, "encoding": encoding, "size": len(body)}
+
+
+@_register_action("s3", "delete_object", ("bucket_name", "object_key"))
+def _s3_delete_object(client: Any, p: Dict[str, Any]) -> Dict[str, Any]:
+    client.delete_object(Bucket=p["bucket_name"], Key=p["object_key"])
+    return {"bucket": p["bucket_name"], "key": p["object_key"]}
+
+
+@_register_action("s3", "create_bucket", ("bucket_name",))
+def _s3_create_bucket(client: Any, p: Dict[str, Any]) -> Dict[str, Any]:
+    if p["region"] == 'us-east-1':
+        client.create_bucket(Bucket=p["bucket_name"])
+    else:
+        client.create_bucket(
+            Bucket=p["bucket_name"],
+            CreateBucketConfiguration={'LocationConstraint': p["region"]}
+        )
+    return {"bucket": p["bucket_name"]}
+
+
+@_register_action("s3", "delete_bucket", ("bucket_name",))
+def _s3_delete_bucket(client: Any, p: Dict[str, Any]) -> Dict[str, Any]:
+    client.delete_bucket(Bucket=p["bucket_name"])
+    return {"bucket": p["bucket_name"]}
+
+
+# ==================== Lambda 服务 ====================
+@_register_action("lambda", "list_functions")
+def _lambda_list_functions(client: Any, p: Dict[str, Any]) -> Dict[str, Any]:
+    functions, token = _paginate_items(
+        client, 'list_functions', 'Functions', p,
+        # 容器镜像部署的函数没有 Runtime
+        transform=lambda f: {'name': f['FunctionName'], 'runtime': f.get('Runtime')}
+    )
+    return {"functions": functions, "count": len(functions), "next_token": token}
+
+
+@_register_action("lambda", "get_function", ("function_name",))
+def _lambda_get_function(client: Any, p: Dict[str, Any]) -> Dict[str, Any]:
+    response = client.get_function(FunctionName=p["function_name"])
+    return response['Configuration']
+
+
+@_register_action("lambda", "delete_function", ("function_name",))
+def _lambda_delete_function(client: Any, p: Dict[str, Any]) -> Dict[str, Any]:
+    client.delete_function(FunctionName=p["function_name"])
+    return {"function_name": p["function_name"]}
+
+
+@_register_action("lambda", "invoke_function", ("function_name",))
+def _lambda_invoke_function(client: Any, p: Dict[str, Any]) -> Dict[str, Any]:
+    payload = {}
+    if p.get("file_content"):
+        payload = json.loads(p["file_content"])
+    response = client.invoke(FunctionName=p["function_name"], Payload=json.dumps(payload))
+    return {"payload": response['Payload'].read().decode('utf-8')}
+
+
+@_register_action("lambda", "invoke_functions", ("function_name", "file_content"))
+def _lambda_invoke_functions(client: Any, p: Dict[str, Any]) -> Dict[str, Any]:
+    payloads = json.loads(p["file_content"])
+    if not isinstance(payloads, list):
+        raise _ParamError("file_content must be a JSON array of payloads")
+    mode = p.get("invocation_type") or "RequestResponse"
+    if mode not in _LAMBDA_INVOCATION_TYPES:
+        raise _ParamError(f"Unsupported invocation_type: {mode}")
+    _, concurrency = _resolve_transfer_options(None, p.get("max_concurrency"))
+    return _lambda_fan_out(client, p["function_name"], payloads, mode, concurrency)
+
+
+# ==================== RDS 服务 ====================
+@_register_action("rds", "list_instances")
+def _rds_list_instances(client: Any, p: Dict[str, Any]) -> Dict[str, Any]:
+    instances, token = _paginate_items(
+        client, 'describe_db_instances', 'DBInstances', p,
+        transform=lambda i: {
+            'id': i['DBInstanceIdentifier'],
+            'engine': i['Engine'],
+            'status': i['DBInstanceStatus'],
+            'class': i['DBInstanceClass']
+        }
+    )
+    return {"instances": instances, "count": len(instances), "next_token": token}
+
+
+@_register_action("rds", "describe_instance", ("db_instance_identifier",))
+def _rds_describe_instance(client: Any, p: Dict[str, Any]) -> Dict[str, Any]:
+    response = client.describe_db_instances(DBInstanceIdentifier=p["db_instance_identifier"])
+    return response['DBInstances'][0]
+
+
+@_register_action("rds", "delete_instance", ("db_instance_identifier",))
+def _rds_delete_instance(client: Any, p: Dict[str, Any]) -> Dict[str, Any]:
+    client.delete_db_instance(DBInstanceIdentifier=p["db_instance_identifier"], SkipFinalSnapshot=True)
+    return {"instance_id": p["db_instance_identifier"]}
+
+
+# ==================== DynamoDB 服务 ====================
+@_register_action("dynamodb", "list_tables")
+def _dynamodb_list_tables(client: Any, p: Dict[str, Any]) -> Dict[str, Any]:
+    tables, token = _paginate_items(client, 'list_tables', 'TableNames', p)
+    return {"tables": tables, "count": len(tables), "next_token": token}
+
+
+@_register_action("dynamodb", "describe_table", ("table_name",))
+def _dynamodb_describe_table(client: Any, p: Dict[str, Any]) -> Dict[str, Any]:
+    response = client.describe_table(TableName=p["table_name"])
+    return response['Table']
+
+
+@_register_action("dynamodb", "delete_table", ("table_name",))
+def _dynamodb_delete_table(client: Any, p: Dict[str, Any]) -> Dict[str, Any]:
+    client.delete_table(TableName=p["table_name"])
+    return {"table_name": p["table_name"]}
+
+
+@_register_action("dynamodb", "put_item", ("table_name", "item"))
+def _dynamodb_put_item(client: Any, p: Dict[str, Any]) -> Dict[str, Any]:
+    client.put_item(TableName=p["table_name"], Item=json.loads(p["item"]))
+    return {"table_name": p["table_name"]}
+
+
+@_register_action("dynamodb", "get_item", ("table_name", "key"))
+def _dynamodb_get_item(client: Any, p: Dict[str, Any]) -> Dict[str, Any]:
+    response = client.get_item(TableName=p["table_name"], Key=json.loads(p["key"]))
+    return response.get('Item', {})
+
+
+@_register_action("dynamodb", "delete_item", ("table_name", "key"))
+def _dynamodb_delete_item(client: Any, p: Dict[str, Any]) -> Dict[str, Any]:
+    client.delete_item(TableName=p["table_name"], Key=json.loads(p["key"]))
+    return {"table_name": p["table_name"]}
+
+
+@_register_action("dynamodb", "batch_write_items", ("table_name", ("item", "key")))
+def _dynamodb_batch_write_items(client: Any, p: Dict[str, Any]) -> Dict[str, Any]:
+    items_list = json.loads(p["item"]) if p.get("item") else []
+    keys_list = json.loads(p["key"]) if p.get("key") else []
+    if not isinstance(items_list, list) or not isinstance(keys_list, list):
+        raise _ParamError("item and key must be JSON arrays")
+    requests = [{'PutRequest': {'Item': i}} for i in items_list] + [{'DeleteRequest': {'Key': k}} for k in keys_list]
+    _, concurrency = _resolve_transfer_options(None, p.get("max_concurrency"))
+    return _dynamodb_batch_write(client, p["table_name"], requests, concurrency)
+
+
+@_register_action("dynamodb", "batch_get_items", ("table_name", "key"))
+def _dynamodb_batch_get_items(client: Any, p: Dict[str, Any]) -> Dict[str, Any]:
+    keys_list = json.loads(p["key"])
+    if not isinstance(keys_list, list):
+        raise _ParamError("key must be a JSON array")
+    _, concurrency = _resolve_transfer_options(None, p.get("max_concurrency"))
+    return _dynamodb_batch_get(client, p["table_name"], keys_list, concurrency)
+
+
+@_register_action("dynamodb", "query", ("table_name", ("key", "key_condition_expression")))
+def _dynamodb_query(client: Any, p: Dict[str, Any]) -> Dict[str, Any]:
+    query_kwargs = _dynamodb_read_kwargs(
+        p["table_name"], p.get("index_name"), p.get("filter_expression"), p.get("projection_expression"),
+        p.get("expression_attribute_names"), p.get("expression_attribute_values")
+    )
+    if p.get("key_condition_expression"):
+        query_kwargs['KeyConditionExpression'] = p["key_condition_expression"]
+    else:
+        _dynamodb_key_condition(query_kwargs, json.loads(p["key"]))
+    if p.get("next_token"):
+        query_kwargs['ExclusiveStartKey'] = json.loads(p["next_token"])
+    local_file_path = p.get("local_file_path")
+    budget = p.get("max_items") or (None if local_file_path else _DYNAMODB_DEFAULT_MAX_ITEMS)
+    state = {'last_key': None}
+
+    def query_pages():
+        for page_items, last_key in _iter_dynamodb_query_pages(client, query_kwargs, budget):
+            state['last_key'] = last_key
+            yield page_items
+
+    items, count, _ = _collect_dynamodb_items(query_pages(), budget, local_file_path)
+    data = {
+        "items": items,
+        "count": count,
+        "next_token": json.dumps(state['last_key']) if state['last_key'] else None
+    }
+    if local_file_path:
+        data["local_file_path"] = local_file_path
+    return data
+
+
+@_register_action("dynamodb", "scan", ("table_name",))
+def _dynamodb_scan(client: Any, p: Dict[str, Any]) -> Dict[str, Any]:
+    scan_kwargs = _dynamodb_read_kwargs(
+        p["table_name"], p.get("index_name"), p.get("filter_expression"), p.get("projection_expression"),
+        p.get("expression_attribute_names"), p.get("expression_attribute_values")
+    )
+    segments = int(p["total_segments"]) if p.get("total_segments") else _DYNAMODB_DEFAULT_TOTAL_SEGMENTS
+    _, concurrency = _resolve_transfer_options(None, p.get("max_concurrency"))
+    local_file_path = p.get("local_file_path")
+    budget = p.get("max_items") or (None if local_file_path else _DYNAMODB_DEFAULT_MAX_ITEMS)
+    items, count, truncated = _collect_dynamodb_items(
+        _iter_dynamodb_parallel_scan(client, scan_kwargs, segments, concurrency),
+        budget,
+        local_file_path
+    )
+    data = {"items": items, "count": count, "total_segments": segments, "is_truncated": truncated}
+    if local_file_path:
+        data["local_file_path"] = local_file_path
+    return data
+
+
+# ==================== CloudWatch Logs 服务 ====================
+@_register_action("cloudwatch_logs", "describe_log_groups")
+def _logs_describe_log_groups(client: Any, p: Dict[str, Any]) -> Dict[str, Any]:
+    # limit 沿用为最多返回的条目数
+    groups, token = _paginate_items(
+        client, 'describe_log_groups', 'logGroups', dict(p, max_items=p.get("max_items") or p.get("limit")),
+        transform=lambda g: g['logGroupName']
+    )
+    return {"log_groups": groups, "count": len(groups), "next_token": token}
+
+
+@_register_action("cloudwatch_logs", "create_log_group", ("log_group_name",))
+def _logs_create_log_group(client: Any, p: Dict[str, Any]) -> Dict[str, Any]:
+    client.create_log_group(logGroupName=p["log_group_name"])
+    return {"log_group_name": p["log_group_name"]}
+
+
+@_register_action("cloudwatch_logs", "delete_log_group", ("log_group_name",))
+def _logs_delete_log_group(client: Any, p: Dict[str, Any]) -> Dict[str, Any]:
+    client.delete_log_group(logGroupName=p["log_group_name"])
+    return {"log_group_name": p["log_group_name"]}
+
+
+@_register_action("cloudwatch_logs", "filter_log_events", ("log_group_name",))
+def _logs_filter_log_events(client: Any, p: Dict[str, Any]) -> Dict[str, Any]:
+    kwargs = {'logGroupName': p["log_group_name"]}
+    if p.get("start_time"):
+        kwargs['startTime'] = int(p["start_time"])
+    if p.get("end_time"):
+        kwargs['endTime'] = int(p["end_time"])
+    if p.get("filter_pattern"):
+        kwargs['filterPattern'] = p["filter_pattern"]
+    if p.get("limit"):
+        kwargs['limit'] = p["limit"]
+    response = client.filter_log_events(**kwargs)
+    events = [{
+        'timestamp': e['timestamp'],
+        'message': e['message']
+    } for e in response.get('events', [])]
+    return {"events": events, "count": len(events)}
+
+
+@_register_action("cloudwatch_logs", "filter_log_events_paginated", ("log_group_name",))
+def _logs_filter_log_events_paginated(client: Any, p: Dict[str, Any]) -> Dict[str, Any]:
+    end_ms = int(p["end_time"]) if p.get("end_time") else int(time.time() * 1000)
+    start_ms = int(p["start_time"]) if p.get("start_time") else end_ms - _LOGS_DEFAULT_WINDOW_MS
+    if start_ms > end_ms:
+        raise _ParamError("start_time must not be later than end_time")
+    kwargs = {'logGroupName': p["log_group_name"]}
+    if p.get("filter_pattern"):
+        kwargs['filterPattern'] = p["filter_pattern"]
+    if p.get("limit"):
+        kwargs['limit'] = p["limit"]
+    budget = p.get("max_items") or _LOGS_DEFAULT_MAX_EVENTS
+    _, concurrency = _resolve_transfer_options(None, p.get("max_concurrency"))
+    slices = int(p["time_slices"]) if p.get("time_slices") else _LOGS_DEFAULT_TIME_SLICES
+    events = []
+    truncated = False
+    slice_iter = _iter_log_events_time_sliced(client, kwargs, start_ms, end_ms, slices, concurrency, budget)
+    try:
+        for slice_events in slice_iter:
+            for e in slice_events:
+                if len(events) >= budget:
+                    truncated = True
+                    break
+                events.append({
+                    'timestamp': e['timestamp'],
+                    'message': e['message'],
+                    'log_stream_name': e.get('logStreamName')
+                })
+            if truncated:
+                break
+    finally:
+        slice_iter.close()
+    return {"events": events, "count": len(events), "is_truncated": truncated}
+
+
+@_register_action("cloudwatch_logs", "put_log_events", ("log_group_name", "log_stream_name", "log_events"))
+def _logs_put_log_events(client: Any, p: Dict[str, Any]) -> Dict[str, Any]:
+    raw_events = json.loads(p["log_events"])
+    if not isinstance(raw_events, list):
+        raise _ParamError("log_events must be a JSON array")
+    now_ms = int(time.time() * 1000)
+    events = []
+    for e in raw_events:
+        if isinstance(e, dict):
+            events.append({'timestamp': int(e.get('timestamp') or now_ms), 'message': str(e.get('message', ''))})
+        else:
+            events.append({'timestamp': now_ms, 'message': str(e)})
+    # PutLogEvents 要求同一批事件按时间先后排列
+    events.sort(key=lambda e: e['timestamp'])
+    batch_count = 0
+    rejected = []
+    for batch in _logs_put_batches(events):
+        response = client.put_log_events(
+            logGroupName=p["log_group_name"],
+            logStreamName=p["log_stream_name"],
+            logEvents=batch
+        )
+        batch_count += 1
+        if response.get('rejectedLogEventsInfo'):
+            rejected.append(response['rejectedLogEventsInfo'])
+    return {
+        "log_group_name": p["log_group_name"],
+        "log_stream_name": p["log_stream_name"],
+        "count": len(events),
+        "batch_count": batch_count,
+        "rejected": rejected
+    }
+
+
+def _execute_batch(
+    access_key: str,
+    secret_key: str,
+    region: str,
+    operations: Any,
+    max_concurrency: Optional[int],
+    param_names: frozenset
+) -> Dict[str, Any]:
+    """
+    批量执行多个 AWS 操作（manage_aws_services 的 action="batch"）
+
+    参数:
+        operations: 操作列表（或其 JSON 字符串），每项为
+            {"service": "s3", "action": "list_objects", "params": {"bucket_name": "..."}}，
+            params 与 manage_aws_services 的同名参数一致
+        max_concurrency: 并发执行的操作数，默认 8；设为 1 时按顺序依次执行
+        param_names: 操作允许使用的参数名
+
+    执行前先校验全部操作（服务、操作名、参数名与必需参数），校验失败的操作不会执行；
+    同一服务的操作共用一个 client，各操作在线程池中并发执行，结果按输入顺序返回，
+    每项结果与 manage_aws_services 的返回格式一致。
+
+    返回:
+        {"success": bool, "service": None, "action": "batch", "data": {"results": [...], "count": int,
+         "succeeded": int, "failed": int}, "error": str}
+    """
+    if not operations:
+        return _error_result(None, "batch", "Missing required parameter: operations")
+    try:
+        ops = json.loads(operations) if isinstance(operations, str) else operations
+    except ValueError as e:
+        return _error_result(None, "batch", f"Invalid operations JSON: {e}")
+    if not isinstance(ops, list):
+        return _error_result(None, "batch", "operations must be a list")
+
+    # ========== 预先校验全部操作 ==========
+    results: List[Optional[Dict[str, Any]]] = [None] * len(ops)
+    runnable = []
+    for index, op in enumerate(ops):
+        if not isinstance(op, dict):
+            results[index] = _error_result(None, None, "Each operation must be an object with service, action and params")
+            continue
+        service, action = op.get("service"), op.get("action")
+        op_params = op.get("params") or {}
+        unknown = sorted(set(op_params) - param_names) if isinstance(op_params, dict) else None
+        if unknown is None:
+            results[index] = _error_result(service, action, "params must be an object")
+            continue
+        if unknown:
+            results[index] = _error_result(service, action, f"Unknown parameters: {', '.join(unknown)}")
+            continue
+        params = {name: None for name in param_names}
+        params.update(op_params)
+        params["region"] = region
+        resolved = _resolve_operation(service, action, params)
+        if isinstance(resolved, dict):
+            results[index] = resolved
+            continue
+        runnable.append((index, service, action, params, resolved[0]))
+
+    # ========== 按服务分组获取 client ==========
+    clients = {}
+    for index, service, action, params, canonical_service in runnable:
+        if canonical_service in clients:
+            continue
+        try:
+            clients[canonical_service] = _get_client(access_key, secret_key, region, _SERVICE_CLIENT_NAMES[canonical_service])
+        except Exception as e:
+            clients[canonical_service] = e
+
+    def run(entry: Tuple[int, str, str, Dict[str, Any], str]) -> None:
+        index, service, action, params, canonical_service = entry
+        client = clients[canonical_service]
+        if isinstance(client, Exception):
+            results[index] = _error_result(service, action, f"Failed to create AWS client: {str(client)}")
+            return
+        results[index] = _execute_operation(access_key, secret_key, region, service, action, params, client=client)
+
+    # ========== 并发执行 ==========
+    _, concurrency = _resolve_transfer_options(None, max_concurrency)
+    if runnable:
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(runnable))) as executor:
+            list(executor.map(run, runnable))
+
+    succeeded = sum(1 for r in results if r and r["success"])
+    return {
+        "success": True,
+        "service": None,
+        "action": "batch",
+        "data": {
+            "results": results,
+            "count": len(results),
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded
+        },
+        "error": None
+    }
 
 
 def manage_aws_services(
@@ -46,7 +1731,26 @@ def manage_aws_services(
     end_time: Optional[str] = None,
     filter_pattern: Optional[str] = None,
     limit: Optional[int] = None,
-    next_token: Optional[str] = None
+    next_token: Optional[str] = None,
+    prefix: Optional[str] = None,
+    delimiter: Optional[str] = None,
+    start_after: Optional[str] = None,
+    max_keys: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    max_concurrency: Optional[int] = None,
+    index_name: Optional[str] = None,
+    key_condition_expression: Optional[str] = None,
+    filter_expression: Optional[str] = None,
+    projection_expression: Optional[str] = None,
+    expression_attribute_names: Optional[str] = None,
+    total_segments: Optional[int] = None,
+    max_items: Optional[int] = None,
+    time_slices: Optional[int] = None,
+    invocation_type: Optional[str] = None,
+    use_cache: Optional[bool] = None,
+    page_size: Optional[int] = None,
+    prefetch: Optional[int] = None,
+    operations: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     AWS 综合服务管理统一入口 - 单一函数，全部参数写在入参里
@@ -56,8 +1760,9 @@ def manage_aws_services(
     **S3 (对象存储)**:
         - list_buckets: 列出所有桶
         - list_objects: 列出桶中的对象
-        - upload_object: 上传对象
-        - download_object: 下载对象
+        - list_objects_paginated: 分页列举全部对象（支持 prefix/delimiter/start_after/max_keys/next_token）
+        - upload_object: 上传对象（传 local_file_path 时从本地文件分片并行上传）
+        - download_object: 下载对象（传 local_file_path 时分段并行下载到本地文件）
         - delete_object: 删除对象
         - create_bucket: 创建桶
         - delete_bucket: 删除桶
@@ -69,6 +1774,7 @@ def manage_aws_services(
         - update_function: 更新函数
         - delete_function: 删除函数
         - invoke_function: 调用函数
+        - invoke_functions: 以 file_content 中的 payload 数组并发扇出调用（支持 RequestResponse / Event）
     
     **RDS (关系型数据库)**:
         - list_instances: 列出所有数据库实例
@@ -88,7 +1794,10 @@ def manage_aws_services(
         - get_item: 获取项
         - update_item: 更新项
         - delete_item: 删除项
-        - query: 查询
+        - query: 查询（自动跟随 LastEvaluatedKey 分页）
+        - scan: 并行分段扫描
+        - batch_write_items: 批量写入（item 为项数组，key 为待删除的主键数组）
+        - batch_get_items: 批量获取（key 为主键数组）
     
     **CloudWatch Logs (日志服务)**:
         - describe_log_groups: 描述日志组
@@ -98,403 +1807,28 @@ def manage_aws_services(
         - create_log_stream: 创建日志流
         - put_log_events: 放入日志事件
         - filter_log_events: 过滤日志事件
+        - filter_log_events_paginated: 分时段并行检索并自动翻页，按时间顺序合并
+    
+    **批量执行**:
+        - batch: 并发执行 operations（JSON 数组）中相互独立的多个操作，每项为
+          {"service": "s3", "action": "list_objects", "params": {"bucket_name": "..."}}，
+          max_concurrency 控制并发数，结果按输入顺序放在 data.results 中；此时 service 可留空
+    
+    **只读缓存**:
+        - cache_stats: 返回只读缓存的命中数、未命中数、命中率与条目数（总体及每个操作）
+        - cache_clear: 返回清空前的统计，然后清空只读缓存；两者 service 均可留空
     
     返回:
         {"success": bool, "service": str, "action": str, "data": dict, "error": str}
     """
     
-    # ========== 验证必需参数 ==========
-    if not service:
-        return {
-            "success": False,
-            "service": None,
-            "action": action,
-            "data": {},
-            "error": "Missing required parameter: service"
-        }
-    
-    if not action:
-        return {
-            "success": False,
-            "service": service,
-            "action": None,
-            "data": {},
-            "error": "Missing required parameter: action"
-        }
-    
-    # ========== 初始化 boto3 clients ==========
-    try:
-        s3_client = boto3.client(
-            's3',
-            aws_access_key_id=access_key,
-            aws_secret_access_key=secret_key,
-            region_name=region
-        )
-        lambda_client = boto3.client(
-            'lambda',
-            aws_access_key_id=access_key,
-            aws_secret_access_key=secret_key,
-            region_name=region
-        )
-        rds_client = boto3.client(
-            'rds',
-            aws_access_key_id=access_key,
-            aws_secret_access_key=secret_key,
-            region_name=region
-        )
-        dynamodb_client = boto3.client(
-            'dynamodb',
-            aws_access_key_id=access_key,
-            aws_secret_access_key=secret_key,
-            region_name=region
-        )
-        logs_client = boto3.client(
-            'logs',
-            aws_access_key_id=access_key,
-            aws_secret_access_key=secret_key,
-            region_name=region
-        )
-    except Exception as e:
-        return {
-            "success": False,
-            "service": service,
-            "action": action,
-            "data": {},
-            "error": f"Failed to create AWS clients: {str(e)}"
-        }
-    
-    # ========== 执行服务操作 ==========
-    try:
-        service_lower = service.lower()
-        action_lower = action.lower()
-        
-        # ==================== S3 服务 ====================
-        if service_lower == "s3":
-            if action_lower == "list_buckets":
-                response = s3_client.list_buckets()
-                buckets = [b['Name'] for b in response.get('Buckets', [])]
-                return {
-                    "success": True,
-                    "service": "s3",
-                    "action": "list_buckets",
-                    "data": {"buckets": buckets, "count": len(buckets)},
-                    "error": None
-                }
-            
-            elif action_lower == "list_objects":
-                if not bucket_name:
-                    return {"success": False, "service": "s3", "action": action, "data": {}, "error": "Missing required parameter: bucket_name"}
-                response = s3_client.list_objects_v2(Bucket=bucket_name)
-                objects = [obj['Key'] for obj in response.get('Contents', [])]
-                return {
-                    "success": True,
-                    "service": "s3",
-                    "action": "list_objects",
-                    "data": {"objects": objects, "count": len(objects)},
-                    "error": None
-                }
-            
-            elif action_lower == "upload_object":
-                if not bucket_name or not object_key or not file_content:
-                    return {"success": False, "service": "s3", "action": action, "data": {}, "error": "Missing required parameters: bucket_name, object_key, file_content"}
-                s3_client.put_object(Bucket=bucket_name, Key=object_key, Body=file_content.encode('utf-8'))
-                return {
-                    "success": True,
-                    "service": "s3",
-                    "action": "upload_object",
-                    "data": {"bucket": bucket_name, "key": object_key},
-                    "error": None
-                }
-            
-            elif action_lower == "delete_object":
-                if not bucket_name or not object_key:
-                    return {"success": False, "service": "s3", "action": action, "data": {}, "error": "Missing required parameters: bucket_name, object_key"}
-                s3_client.delete_object(Bucket=bucket_name, Key=object_key)
-                return {
-                    "success": True,
-                    "service": "s3",
-                    "action": "delete_object",
-                    "data": {"bucket": bucket_name, "key": object_key},
-                    "error": None
-                }
-            
-            elif action_lower == "create_bucket":
-                if not bucket_name:
-                    return {"success": False, "service": "s3", "action": action, "data": {}, "error": "Missing required parameter: bucket_name"}
-                if region == 'us-east-1':
-                    s3_client.create_bucket(Bucket=bucket_name)
-                else:
-                    s3_client.create_bucket(
-                        Bucket=bucket_name,
-                        CreateBucketConfiguration={'LocationConstraint': region}
-                    )
-                return {
-                    "success": True,
-                    "service": "s3",
-                    "action": "create_bucket",
-                    "data": {"bucket": bucket_name},
-                    "error": None
-                }
-            
-            elif action_lower == "delete_bucket":
-                if not bucket_name:
-                    return {"success": False, "service": "s3", "action": action, "data": {}, "error": "Missing required parameter: bucket_name"}
-                s3_client.delete_bucket(Bucket=bucket_name)
-                return {
-                    "success": True,
-                    "service": "s3",
-                    "action": "delete_bucket",
-                    "data": {"bucket": bucket_name},
-                    "error": None
-                }
-            
-            else:
-                return {"success": False, "service": service, "action": action, "data": {}, "error": f"Unsupported S3 action: {action}"}
-        
-        # ==================== Lambda 服务 ====================
-        elif service_lower == "lambda":
-            if action_lower == "list_functions":
-                response = lambda_client.list_functions()
-                functions = [{'name': f['FunctionName'], 'runtime': f['Runtime']} for f in response.get('Functions', [])]
-                return {
-                    "success": True,
-                    "service": "lambda",
-                    "action": "list_functions",
-                    "data": {"functions": functions, "count": len(functions)},
-                    "error": None
-                }
-            
-            elif action_lower == "get_function":
-                if not function_name:
-                    return {"success": False, "service": "lambda", "action": action, "data": {}, "error": "Missing required parameter: function_name"}
-                response = lambda_client.get_function(FunctionName=function_name)
-                return {
-                    "success": True,
-                    "service": "lambda",
-                    "action": "get_function",
-                    "data": response['Configuration'],
-                    "error": None
-                }
-            
-            elif action_lower == "delete_function":
-                if not function_name:
-                    return {"success": False, "service": "lambda", "action": action, "data": {}, "error": "Missing required parameter: function_name"}
-                lambda_client.delete_function(FunctionName=function_name)
-                return {
-                    "success": True,
-                    "service": "lambda",
-                    "action": "delete_function",
-                    "data": {"function_name": function_name},
-                    "error": None
-                }
-            
-            elif action_lower == "invoke_function":
-                if not function_name:
-                    return {"success": False, "service": "lambda", "action": action, "data": {}, "error": "Missing required parameter: function_name"}
-                payload = {}
-                if file_content:
-                    payload = json.loads(file_content)
-                response = lambda_client.invoke(FunctionName=function_name, Payload=json.dumps(payload))
-                return {
-                    "success": True,
-                    "service": "lambda",
-                    "action": "invoke_function",
-                    "data": {"payload": response['Payload'].read().decode('utf-8')},
-                    "error": None
-                }
-            
-            else:
-                return {"success": False, "service": service, "action": action, "data": {}, "error": f"Unsupported Lambda action: {action}"}
-        
-        # ==================== RDS 服务 ====================
-        elif service_lower == "rds":
-            if action_lower == "list_instances":
-                response = rds_client.describe_db_instances()
-                instances = [{
-                    'id': i['DBInstanceIdentifier'],
-                    'engine': i['Engine'],
-                    'status': i['DBInstanceStatus'],
-                    'class': i['DBInstanceClass']
-                } for i in response.get('DBInstances', [])]
-                return {
-                    "success": True,
-                    "service": "rds",
-                    "action": "list_instances",
-                    "data": {"instances": instances, "count": len(instances)},
-                    "error": None
-                }
-            
-            elif action_lower == "describe_instance":
-                if not db_instance_identifier:
-                    return {"success": False, "service": "rds", "action": action, "data": {}, "error": "Missing required parameter: db_instance_identifier"}
-                response = rds_client.describe_db_instances(DBInstanceIdentifier=db_instance_identifier)
-                return {
-                    "success": True,
-                    "service": "rds",
-                    "action": "describe_instance",
-                    "data": response['DBInstances'][0],
-                    "error": None
-                }
-            
-            elif action_lower == "delete_instance":
-                if not db_instance_identifier:
-                    return {"success": False, "service": "rds", "action": action, "data": {}, "error": "Missing required parameter: db_instance_identifier"}
-                rds_client.delete_db_instance(DBInstanceIdentifier=db_instance_identifier, SkipFinalSnapshot=True)
-                return {
-                    "success": True,
-                    "service": "rds",
-                    "action": "delete_instance",
-                    "data": {"instance_id": db_instance_identifier},
-                    "error": None
-                }
-            
-            else:
-                return {"success": False, "service": service, "action": action, "data": {}, "error": f"Unsupported RDS action: {action}"}
-        
-        # ==================== DynamoDB 服务 ====================
-        elif service_lower == "dynamodb":
-            if action_lower == "list_tables":
-                response = dynamodb_client.list_tables()
-                return {
-                    "success": True,
-                    "service": "dynamodb",
-                    "action": "list_tables",
-                    "data": {"tables": response.get('TableNames', []), "count": len(response.get('TableNames', []))},
-                    "error": None
-                }
-            
-            elif action_lower == "describe_table":
-                if not table_name:
-                    return {"success": False, "service": "dynamodb", "action": action, "data": {}, "error": "Missing required parameter: table_name"}
-                response = dynamodb_client.describe_table(TableName=table_name)
-                return {
-                    "success": True,
-                    "service": "dynamodb",
-                    "action": "describe_table",
-                    "data": response['Table'],
-                    "error": None
-                }
-            
-            elif action_lower == "put_item":
-                if not table_name or not item:
-                    return {"success": False, "service": "dynamodb", "action": action, "data": {}, "error": "Missing required parameters: table_name, item"}
-                item_dict = json.loads(item)
-                dynamodb_client.put_item(TableName=table_name, Item=item_dict)
-                return {
-                    "success": True,
-                    "service": "dynamodb",
-                    "action": "put_item",
-                    "data": {"table_name": table_name},
-                    "error": None
-                }
-            
-            elif action_lower == "get_item":
-                if not table_name or not key:
-                    return {"success": False, "service": "dynamodb", "action": action, "data": {}, "error": "Missing required parameters: table_name, key"}
-                key_dict = json.loads(key)
-                response = dynamodb_client.get_item(TableName=table_name, Key=key_dict)
-                return {
-                    "success": True,
-                    "service": "dynamodb",
-                    "action": "get_item",
-                    "data": response.get('Item', {}),
-                    "error": None
-                }
-            
-            elif action_lower == "delete_item":
-                if not table_name or not key:
-                    return {"success": False, "service": "dynamodb", "action": action, "data": {}, "error": "Missing required parameters: table_name, key"}
-                key_dict = json.loads(key)
-                dynamodb_client.delete_item(TableName=table_name, Key=key_dict)
-                return {
-                    "success": True,
-                    "service": "dynamodb",
-                    "action": "delete_item",
-                    "data": {"table_name": table_name},
-                    "error": None
-                }
-            
-            else:
-                return {"success": False, "service": service, "action": action, "data": {}, "error": f"Unsupported DynamoDB action: {action}"}
-        
-        # ==================== CloudWatch Logs 服务 ====================
-        elif service_lower == "cloudwatch_logs" or service_lower == "logs":
-            if action_lower == "describe_log_groups":
-                kwargs = {}
-                if limit:
-                    kwargs['limit'] = limit
-                if next_token:
-                    kwargs['nextToken'] = next_token
-                response = logs_client.describe_log_groups(**kwargs)
-                groups = [g['logGroupName'] for g in response.get('logGroups', [])]
-                return {
-                    "success": True,
-                    "service": "cloudwatch_logs",
-                    "action": "describe_log_groups",
-                    "data": {"log_groups": groups, "count": len(groups)},
-                    "error": None
-                }
-            
-            elif action_lower == "create_log_group":
-                if not log_group_name:
-                    return {"success": False, "service": "cloudwatch_logs", "action": action, "data": {}, "error": "Missing required parameter: log_group_name"}
-                logs_client.create_log_group(logGroupName=log_group_name)
-                return {
-                    "success": True,
-                    "service": "cloudwatch_logs",
-                    "action": "create_log_group",
-                    "data": {"log_group_name": log_group_name},
-                    "error": None
-                }
-            
-            elif action_lower == "delete_log_group":
-                if not log_group_name:
-                    return {"success": False, "service": "cloudwatch_logs", "action": action, "data": {}, "error": "Missing required parameter: log_group_name"}
-                logs_client.delete_log_group(logGroupName=log_group_name)
-                return {
-                    "success": True,
-                    "service": "cloudwatch_logs",
-                    "action": "delete_log_group",
-                    "data": {"log_group_name": log_group_name},
-                    "error": None
-                }
-            
-            elif action_lower == "filter_log_events":
-                if not log_group_name:
-                    return {"success": False, "service": "cloudwatch_logs", "action": action, "data": {}, "error": "Missing required parameter: log_group_name"}
-                kwargs = {'logGroupName': log_group_name}
-                if start_time:
-                    kwargs['startTime'] = int(start_time)
-                if end_time:
-                    kwargs['endTime'] = int(end_time)
-                if filter_pattern:
-                    kwargs['filterPattern'] = filter_pattern
-                if limit:
-                    kwargs['limit'] = limit
-                response = logs_client.filter_log_events(**kwargs)
-                events = [{
-                    'timestamp': e['timestamp'],
-                    'message': e['message']
-                } for e in response.get('events', [])]
-                return {
-                    "success": True,
-                    "service": "cloudwatch_logs",
-                    "action": "filter_log_events",
-                    "data": {"events": events, "count": len(events)},
-                    "error": None
-                }
-            
-            else:
-                return {"success": False, "service": service, "action": action, "data": {}, "error": f"Unsupported CloudWatch Logs action: {action}"}
-        
-        else:
-            return {"success": False, "service": service, "action": action, "data": {}, "error": f"Unsupported service: {service}"}
-    
-    except Exception as e:
-        return {
-            "success": False,
-            "service": service,
-            "action": action,
-            "data": {},
-            "error": str(e)
-        }
+    params = dict(locals())
+    for name in ("access_key", "secret_key", "service", "action", "operations"):
+        params.pop(name)
+    action_lower = (action or "").lower()
+    if action_lower == "batch":
+        return _execute_batch(access_key, secret_key, region, operations, max_concurrency,
+                              frozenset(params) - {"region"})
+    if action_lower in ("cache_stats", "cache_clear"):
+        return _read_cache_admin(action_lower)
+    return _execute_operation(access_key, secret_key, region, service, action, params)
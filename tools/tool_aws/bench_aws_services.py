@@ -0,0 +1,526 @@
+#!/usr/bin/env python3
+"""
+AWS 综合服务管理工具离线基准与回归脚本
+
+使用 moto 在进程内模拟 AWS（不访问网络、不需要 Docker），对 manage_aws_services 的
+每个 服务/操作 组合执行多次调用，记录：
+  - 每次调用的 p50 / p99 延迟
+  - 单次调用的内存峰值（tracemalloc）与结果序列化为 JSON 后的大小
+  - 各服务 client 的首次创建耗时与缓存命中耗时
+  - 大数据量场景：大量 S3 对象、大型 DynamoDB 表、高频写入的日志组
+  - 批量执行（action="batch"）与只读缓存（use_cache=True）
+
+工具文件按 MaxKB 的方式加载：exec 执行源码，取最后一个绑定的名称作为入口函数，
+其余名称再放入全局命名空间，因此入口之后新增的定义或加载期依赖会在这里直接暴露。
+
+同时校验每次调用的返回结果；任一调用失败，或与基线相比 p50 退化超过容差时，以退出码 1 结束，
+可直接用于 CI。
+
+依赖（仅基准脚本需要）：pip install boto3 "moto[all]"
+
+用法：
+  python3 bench_aws_services.py --quick                       # CI 用的小数据量
+  python3 bench_aws_services.py --s3-objects 100000           # 完整规模（默认值）
+  python3 bench_aws_services.py --quick --save-baseline base.json
+  python3 bench_aws_services.py --quick --baseline base.json --tolerance 1.5
+"""
+
+import argparse
+import filecmp
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+import zipfile
+
+from moto import mock_aws
+from moto.core import DEFAULT_ACCOUNT_ID
+from moto.s3.models import s3_backends
+
+TOOL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '1.0.0', 'aws_services_manager.py')
+
+
+def load_tool(path: str):
+    """按 MaxKB 执行工具代码的方式加载：返回 (模块命名空间, 入口函数)"""
+    with open(path, encoding='utf-8') as f:
+        code = compile(f.read(), path, 'exec')
+    globals_v = {'__builtins__': __builtins__, '__name__': 'aws_services_manager'}
+    locals_v = {}
+    exec(code, globals_v, locals_v)
+    _, entry = locals_v.popitem()
+    globals_v.update(locals_v)
+    return types.SimpleNamespace(**globals_v), entry
+
+
+m, manage_aws_services = load_tool(TOOL_PATH)
+
+CREDENTIALS = {'access_key': 'AKIABENCHMARK', 'secret_key': 'benchmark-secret', 'region': 'us-east-1'}
+BUCKET = 'bench-bucket'
+BIG_BUCKET = 'bench-big-bucket'
+TABLE = 'bench-table'
+BIG_TABLE = 'bench-big-table'
+LOG_GROUP = 'bench-group'
+BIG_LOG_GROUP = 'bench-busy-group'
+LOG_STREAM = 'bench-stream'
+FUNCTION = 'bench-function'
+DB_INSTANCE = 'bench-db'
+
+
+def percentile(values: list, pct: float) -> float:
+    """最近秩法计算百分位"""
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100.0 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def raw_client(service_name: str):
+    return m._get_client(CREDENTIALS['access_key'], CREDENTIALS['secret_key'], CREDENTIALS['region'], service_name)
+
+
+class Scenario:
+    """一个基准场景：对同一 服务/操作 重复调用，每次调用的参数由 params(i) 生成"""
+
+    def __init__(self, name, service, action, params, check=None, setup=None, iterations=None):
+        self.name = name
+        self.service = service
+        self.action = action
+        self.params = params
+        self.check = check
+        self.setup = setup
+        self.iterations = iterations
+
+
+# ==================== 测试数据准备 ====================
+def lambda_zip() -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as zf:
+        zf.writestr('handler.py', 'def handler(event, context):\n    return event\n')
+    return buffer.getvalue()
+
+
+def lambda_role_arn() -> str:
+    iam = m._get_boto3_session().client(
+        'iam',
+        aws_access_key_id=CREDENTIALS['access_key'],
+        aws_secret_access_key=CREDENTIALS['secret_key'],
+        region_name=CREDENTIALS['region']
+    )
+    return iam.create_role(RoleName='bench-role', AssumeRolePolicyDocument='{}')['Role']['Arn']
+
+
+def create_functions(names: list, role_arn: str) -> None:
+    client = raw_client('lambda')
+    code = lambda_zip()
+    for name in names:
+        client.create_function(
+            FunctionName=name, Runtime='python3.12', Role=role_arn,
+            Handler='handler.handler', Code={'ZipFile': code}
+        )
+
+
+def create_db_instances(names: list) -> None:
+    client = raw_client('rds')
+    for name in names:
+        client.create_db_instance(
+            DBInstanceIdentifier=name, DBInstanceClass='db.t3.micro', Engine='postgres',
+            MasterUsername='bench', MasterUserPassword='bench-password', AllocatedStorage=20
+        )
+
+
+def create_tables(names: list) -> None:
+    client = raw_client('dynamodb')
+    for name in names:
+        client.create_table(
+            TableName=name,
+            KeySchema=[{'AttributeName': 'pk', 'KeyType': 'HASH'}, {'AttributeName': 'sk', 'KeyType': 'RANGE'}],
+            AttributeDefinitions=[{'AttributeName': 'pk', 'AttributeType': 'S'}, {'AttributeName': 'sk', 'AttributeType': 'N'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+
+
+def ddb_item(i: int, partitions: int = 10) -> dict:
+    return {'pk': {'S': f"p{i % partitions}"}, 'sk': {'N': str(i)}, 'payload': {'S': 'x' * 64}}
+
+
+def seed_big_bucket(count: int) -> None:
+    """大量对象直接写入 moto 后端，避免 10 万次 PutObject 请求拖慢准备阶段"""
+    raw_client('s3').create_bucket(Bucket=BIG_BUCKET)
+    backend = s3_backends[DEFAULT_ACCOUNT_ID]['global']
+    for i in range(count):
+        backend.put_object(BIG_BUCKET, f"data/{i:07d}.json", b'{}')
+
+
+def seed_big_table(count: int) -> None:
+    create_tables([BIG_TABLE])
+    client = raw_client('dynamodb')
+    for start in range(0, count, 25):
+        client.batch_write_item(RequestItems={BIG_TABLE: [
+            {'PutRequest': {'Item': ddb_item(i)}} for i in range(start, min(start + 25, count))
+        ]})
+
+
+def seed_busy_log_group(count: int, now_ms: int) -> None:
+    client = raw_client('logs')
+    client.create_log_group(logGroupName=BIG_LOG_GROUP)
+    client.create_log_stream(logGroupName=BIG_LOG_GROUP, logStreamName=LOG_STREAM)
+    for start in range(0, count, 10000):
+        client.put_log_events(
+            logGroupName=BIG_LOG_GROUP, logStreamName=LOG_STREAM,
+            logEvents=[{'timestamp': now_ms - count + i, 'message': f"event {i}"} for i in range(start, min(start + 10000, count))]
+        )
+
+
+def seed_base_fixtures(now_ms: int) -> None:
+    s3 = raw_client('s3')
+    s3.create_bucket(Bucket=BUCKET)
+    for i in range(50):
+        s3.put_object(Bucket=BUCKET, Key=f"obj/{i:03d}.txt", Body=b'hello benchmark')
+    create_tables([TABLE])
+    ddb = raw_client('dynamodb')
+    for i in range(200):
+        ddb.put_item(TableName=TABLE, Item=ddb_item(i))
+    logs = raw_client('logs')
+    logs.create_log_group(logGroupName=LOG_GROUP)
+    logs.create_log_stream(logGroupName=LOG_GROUP, logStreamName=LOG_STREAM)
+    logs.put_log_events(
+        logGroupName=LOG_GROUP, logStreamName=LOG_STREAM,
+        logEvents=[{'timestamp': now_ms - 500 + i, 'message': f"seed {i}"} for i in range(500)]
+    )
+    create_db_instances([DB_INSTANCE])
+
+
+# ==================== 场景定义 ====================
+def build_scenarios(args: argparse.Namespace, role_arn: str, now_ms: int, upload_path: str, download_dir: str) -> list:
+    window = {'start_time': str(now_ms - 3600 * 1000), 'end_time': str(now_ms + 1000)}
+    big = args.large_iterations
+    return [
+        # ---------- S3 ----------
+        Scenario('s3.list_buckets', 's3', 'list_buckets', lambda i: {},
+                 check=lambda d: BUCKET in d['buckets']),
+        Scenario('s3.list_objects', 's3', 'list_objects', lambda i: {'bucket_name': BUCKET},
+                 check=lambda d: d['count'] == 50),
+        Scenario('s3.list_objects_paginated', 's3', 'list_objects_paginated',
+                 lambda i: {'bucket_name': BUCKET, 'prefix': 'obj/', 'max_keys': 20},
+                 check=lambda d: d['count'] == 20 and d['is_truncated']),
+        Scenario('s3.upload_object', 's3', 'upload_object',
+                 lambda i: {'bucket_name': BUCKET, 'object_key': f"up/{i}.txt", 'file_content': 'payload ' * 32}),
+        Scenario('s3.upload_object.multipart', 's3', 'upload_object',
+                 lambda i: {'bucket_name': BUCKET, 'object_key': 'up/large.bin', 'local_file_path': upload_path,
+                            'chunk_size': 5 * 1024 * 1024},
+                 check=lambda d: d.get('parts') == 3, iterations=big),
+        Scenario('s3.download_object', 's3', 'download_object',
+                 lambda i: {'bucket_name': BUCKET, 'object_key': 'obj/001.txt'},
+                 check=lambda d: d['content'] == 'hello benchmark'),
+        Scenario('s3.download_object.ranged', 's3', 'download_object',
+                 lambda i: {'bucket_name': BUCKET, 'object_key': 'up/large.bin',
+                            'local_file_path': os.path.join(download_dir, f"large-{i}.bin"), 'chunk_size': 5 * 1024 * 1024},
+                 check=lambda d: d.get('size') == os.path.getsize(upload_path), iterations=big),
+        # 过小或非正数的 chunk_size 按 5 MiB 处理，不会得到空的分段列表
+        Scenario('s3.download_object.ranged.min_chunk', 's3', 'download_object',
+                 lambda i: {'bucket_name': BUCKET, 'object_key': 'up/large.bin',
+                            'local_file_path': os.path.join(download_dir, f"large-min-{i}.bin"), 'chunk_size': -1},
+                 check=lambda d: d.get('parts') == 3 and d.get('size') == os.path.getsize(upload_path)
+                 and filecmp.cmp(d['local_file_path'], upload_path, shallow=False), iterations=big),
+        Scenario('s3.delete_object', 's3', 'delete_object',
+                 lambda i: {'bucket_name': BUCKET, 'object_key': f"up/{i}.txt"}),
+        Scenario('s3.create_bucket', 's3', 'create_bucket', lambda i: {'bucket_name': f"bench-tmp-{i}"}),
+        Scenario('s3.delete_bucket', 's3', 'delete_bucket', lambda i: {'bucket_name': f"bench-tmp-{i}"}),
+        Scenario('s3.list_objects_paginated.large', 's3', 'list_objects_paginated',
+                 lambda i: {'bucket_name': BIG_BUCKET, 'max_keys': args.s3_objects},
+                 check=lambda d: d['count'] == args.s3_objects and not d['is_truncated'], iterations=big),
+        Scenario('s3.list_objects.large', 's3', 'list_objects',
+                 lambda i: {'bucket_name': BIG_BUCKET, 'max_items': args.s3_objects, 'prefetch': 2},
+                 check=lambda d: d['count'] == args.s3_objects, iterations=big),
+
+        # ---------- Lambda ----------
+        Scenario('lambda.list_functions', 'lambda', 'list_functions', lambda i: {},
+                 check=lambda d: d['count'] >= 1),
+        Scenario('lambda.get_function', 'lambda', 'get_function', lambda i: {'function_name': FUNCTION},
+                 check=lambda d: d['FunctionName'] == FUNCTION),
+        Scenario('lambda.invoke_function', 'lambda', 'invoke_function',
+                 lambda i: {'function_name': FUNCTION, 'file_content': json.dumps({'i': i})}),
+        Scenario('lambda.invoke_functions', 'lambda', 'invoke_functions',
+                 lambda i: {'function_name': FUNCTION, 'file_content': json.dumps([{'i': n} for n in range(20)])},
+                 check=lambda d: d['succeeded'] == 20),
+        Scenario('lambda.delete_function', 'lambda', 'delete_function',
+                 lambda i: {'function_name': f"bench-delete-{i}"},
+                 setup=lambda n: create_functions([f"bench-delete-{i}" for i in range(n)], role_arn)),
+
+        # ---------- RDS ----------
+        Scenario('rds.list_instances', 'rds', 'list_instances', lambda i: {},
+                 check=lambda d: d['count'] >= 1),
+        Scenario('rds.describe_instance', 'rds', 'describe_instance',
+                 lambda i: {'db_instance_identifier': DB_INSTANCE},
+                 check=lambda d: d['DBInstanceIdentifier'] == DB_INSTANCE),
+        Scenario('rds.delete_instance', 'rds', 'delete_instance',
+                 lambda i: {'db_instance_identifier': f"bench-delete-{i}"},
+                 setup=lambda n: create_db_instances([f"bench-delete-{i}" for i in range(n)])),
+
+        # ---------- DynamoDB ----------
+        Scenario('dynamodb.list_tables', 'dynamodb', 'list_tables', lambda i: {},
+                 check=lambda d: TABLE in d['tables']),
+        Scenario('dynamodb.describe_table', 'dynamodb', 'describe_table', lambda i: {'table_name': TABLE},
+                 check=lambda d: d['TableName'] == TABLE),
+        Scenario('dynamodb.put_item', 'dynamodb', 'put_item',
+                 lambda i: {'table_name': TABLE, 'item': json.dumps(ddb_item(10000 + i))}),
+        Scenario('dynamodb.get_item', 'dynamodb', 'get_item',
+                 lambda i: {'table_name': TABLE, 'key': json.dumps({'pk': {'S': 'p1'}, 'sk': {'N': '1'}})},
+                 check=lambda d: d['sk'] == {'N': '1'}),
+        Scenario('dynamodb.delete_item', 'dynamodb', 'delete_item',
+                 lambda i: {'table_name': TABLE, 'key': json.dumps({k: v for k, v in ddb_item(10000 + i).items() if k != 'payload'})}),
+        Scenario('dynamodb.batch_write_items', 'dynamodb', 'batch_write_items',
+                 lambda i: {'table_name': TABLE, 'item': json.dumps([ddb_item(20000 + i * 100 + n) for n in range(100)])},
+                 check=lambda d: d['written'] == 100),
+        Scenario('dynamodb.batch_get_items', 'dynamodb', 'batch_get_items',
+                 lambda i: {'table_name': TABLE, 'key': json.dumps([
+                     {k: v for k, v in ddb_item(n).items() if k != 'payload'} for n in range(150)])},
+                 check=lambda d: d['count'] == 150),
+        Scenario('dynamodb.query', 'dynamodb', 'query',
+                 lambda i: {'table_name': TABLE, 'key': json.dumps({'pk': {'S': 'p3'}})},
+                 check=lambda d: d['count'] >= 20),
+        Scenario('dynamodb.scan', 'dynamodb', 'scan', lambda i: {'table_name': TABLE, 'total_segments': 2},
+                 check=lambda d: d['count'] >= 200),
+        Scenario('dynamodb.delete_table', 'dynamodb', 'delete_table',
+                 lambda i: {'table_name': f"bench-delete-{i}"},
+                 setup=lambda n: create_tables([f"bench-delete-{i}" for i in range(n)])),
+        Scenario('dynamodb.query.large', 'dynamodb', 'query',
+                 lambda i: {'table_name': BIG_TABLE, 'key': json.dumps({'pk': {'S': 'p0'}}), 'max_items': args.ddb_items},
+                 check=lambda d: d['count'] == args.ddb_items // 10, iterations=big),
+        Scenario('dynamodb.scan.large', 'dynamodb', 'scan',
+                 lambda i: {'table_name': BIG_TABLE, 'total_segments': 4, 'max_items': args.ddb_items},
+                 check=lambda d: d['count'] == args.ddb_items, iterations=big),
+
+        # ---------- CloudWatch Logs ----------
+        Scenario('logs.describe_log_groups', 'cloudwatch_logs', 'describe_log_groups', lambda i: {},
+                 check=lambda d: LOG_GROUP in d['log_groups']),
+        Scenario('logs.create_log_group', 'cloudwatch_logs', 'create_log_group',
+                 lambda i: {'log_group_name': f"bench-tmp-{i}"}),
+        Scenario('logs.delete_log_group', 'cloudwatch_logs', 'delete_log_group',
+                 lambda i: {'log_group_name': f"bench-tmp-{i}"}),
+        Scenario('logs.put_log_events', 'cloudwatch_logs', 'put_log_events',
+                 lambda i: {'log_group_name': LOG_GROUP, 'log_stream_name': LOG_STREAM,
+                            'log_events': json.dumps([{'timestamp': now_ms + i, 'message': f"put {i}"}])},
+                 check=lambda d: d['count'] == 1),
+        Scenario('logs.filter_log_events', 'cloudwatch_logs', 'filter_log_events',
+                 lambda i: dict(window, log_group_name=LOG_GROUP, limit=100),
+                 check=lambda d: d['count'] == 100),
+        Scenario('logs.filter_log_events_paginated', 'cloudwatch_logs', 'filter_log_events_paginated',
+                 lambda i: dict(window, log_group_name=LOG_GROUP, max_items=500),
+                 check=lambda d: d['count'] == 500),
+        Scenario('logs.filter_log_events_paginated.large', 'cloudwatch_logs', 'filter_log_events_paginated',
+                 lambda i: dict(window, log_group_name=BIG_LOG_GROUP, max_items=args.log_events),
+                 check=lambda d: d['count'] == args.log_events, iterations=big),
+
+        # ---------- 只读缓存 ----------
+        Scenario('s3.list_buckets.cached', 's3', 'list_buckets', lambda i: {'use_cache': True},
+                 check=lambda d: BUCKET in d['buckets']),
+        # S3 桶列表是全局的：在 us-east-1 建桶后，us-west-2 下缓存的 list_buckets 也要失效
+        Scenario('s3.list_buckets.cached.cross_region', 's3', 'list_buckets',
+                 lambda i: {'use_cache': True, 'region': 'us-west-2'},
+                 setup=lambda n: warm_then_create_bucket('bench-cross-region'),
+                 check=lambda d: 'bench-cross-region' in d['buckets']),
+        Scenario('lambda.get_function.cached', 'lambda', 'get_function',
+                 lambda i: {'function_name': FUNCTION, 'use_cache': True},
+                 check=lambda d: d['FunctionName'] == FUNCTION),
+        Scenario('dynamodb.describe_table.cached', 'dynamodb', 'describe_table',
+                 lambda i: {'table_name': TABLE, 'use_cache': True},
+                 check=lambda d: d['TableName'] == TABLE),
+        Scenario('cache_stats', '', 'cache_stats', lambda i: {},
+                 check=lambda d: d['actions'].get('dynamodb.describe_table', {}).get('hits', 0) > 0),
+
+        # ---------- 批量执行 ----------
+        Scenario('batch.mixed', '', 'batch',
+                 lambda i: {'operations': json.dumps(batch_operations(i)), 'max_concurrency': 8},
+                 check=lambda d: d['count'] == len(batch_operations(0)) and d['failed'] == 0),
+        Scenario('batch.mixed.sequential', '', 'batch',
+                 lambda i: {'operations': json.dumps(batch_operations(i)), 'max_concurrency': 1},
+                 check=lambda d: d['count'] == len(batch_operations(0)) and d['failed'] == 0),
+    ]
+
+
+def warm_then_create_bucket(bucket_name: str) -> None:
+    """先在 us-west-2 缓存桶列表，再通过工具在默认 region 建桶"""
+    manage_aws_services(service='s3', action='list_buckets', use_cache=True, **dict(CREDENTIALS, region='us-west-2'))
+    manage_aws_services(service='s3', action='create_bucket', bucket_name=bucket_name, **CREDENTIALS)
+
+
+def batch_operations(i: int) -> list:
+    """批量场景：跨四个服务的读操作与一次写入"""
+    return [
+        {'service': 's3', 'action': 'list_objects', 'params': {'bucket_name': BUCKET}},
+        {'service': 's3', 'action': 'download_object', 'params': {'bucket_name': BUCKET, 'object_key': 'obj/002.txt'}},
+        {'service': 'dynamodb', 'action': 'get_item',
+         'params': {'table_name': TABLE, 'key': json.dumps({'pk': {'S': 'p2'}, 'sk': {'N': '2'}})}},
+        {'service': 'dynamodb', 'action': 'put_item', 'params': {'table_name': TABLE, 'item': json.dumps(ddb_item(30000 + i))}},
+        {'service': 'lambda', 'action': 'get_function', 'params': {'function_name': FUNCTION}},
+        {'service': 'cloudwatch_logs', 'action': 'describe_log_groups', 'params': {}},
+    ]
+
+
+# ==================== 执行与统计 ====================
+def call(scenario: Scenario, i: int) -> dict:
+    # 场景参数可以覆盖默认的 region
+    return manage_aws_services(
+        service=scenario.service, action=scenario.action, **dict(CREDENTIALS, **scenario.params(i))
+    )
+
+
+def verify(scenario: Scenario, result: dict) -> str:
+    if not result['success']:
+        return result['error'] or 'unknown error'
+    if scenario.check and not scenario.check(result['data']):
+        return 'unexpected result data'
+    return ''
+
+
+def run_scenario(scenario: Scenario, iterations: int) -> dict:
+    count = scenario.iterations or iterations
+    # 最后一次调用单独在 tracemalloc 下执行，用于统计内存，不计入延迟
+    if scenario.setup:
+        scenario.setup(count + 1)
+    latencies = []
+    failure = ''
+    for i in range(count):
+        start = time.perf_counter()
+        result = call(scenario, i)
+        latencies.append((time.perf_counter() - start) * 1000)
+        failure = failure or verify(scenario, result)
+
+    tracemalloc.start()
+    try:
+        result = call(scenario, count)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    failure = failure or verify(scenario, result)
+    return {
+        'iterations': count,
+        'p50_ms': percentile(latencies, 50),
+        'p99_ms': percentile(latencies, 99),
+        'peak_kib': peak / 1024,
+        'result_kib': len(json.dumps(result, default=str)) / 1024,
+        'error': failure
+    }
+
+
+def measure_clients(iterations: int) -> dict:
+    """首次创建（含模型加载）与缓存命中两种情况下获取 client 的耗时"""
+    m.clear_client_cache()
+    stats = {}
+    for service, client_name in (('s3', 's3'), ('lambda', 'lambda'), ('rds', 'rds'),
+                                 ('dynamodb', 'dynamodb'), ('cloudwatch_logs', 'logs')):
+        start = time.perf_counter()
+        raw_client(client_name)
+        cold_ms = (time.perf_counter() - start) * 1000
+        warm = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            raw_client(client_name)
+            warm.append((time.perf_counter() - start) * 1000)
+        # 换一组凭证即为缓存未命中，但服务模型已在进程内加载
+        start = time.perf_counter()
+        m._get_client('AKIABENCHMARK2', 'other-secret', CREDENTIALS['region'], client_name)
+        rebuild_ms = (time.perf_counter() - start) * 1000
+        stats[service] = {'first_ms': cold_ms, 'new_credentials_ms': rebuild_ms, 'cached_p50_ms': percentile(warm, 50)}
+    return stats
+
+
+def measure_dispatch(iterations: int) -> dict:
+    """不访问 AWS 的路径：参数校验失败时的分发与结果构造开销"""
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        manage_aws_services(service='dynamodb', action='get_item', **CREDENTIALS)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {'p50_ms': percentile(latencies, 50), 'p99_ms': percentile(latencies, 99)}
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_delta_ms: float) -> list:
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        limit = previous['p50_ms'] * tolerance
+        if current['p50_ms'] > limit and current['p50_ms'] - previous['p50_ms'] > min_delta_ms:
+            regressions.append(f"{name}: p50 {previous['p50_ms']:.2f} ms -> {current['p50_ms']:.2f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='AWS 综合服务管理工具离线基准')
+    parser.add_argument('--iterations', type=int, default=30, help='普通场景每个操作的调用次数')
+    parser.add_argument('--large-iterations', type=int, default=3, help='大数据量场景的调用次数')
+    parser.add_argument('--s3-objects', type=int, default=100000, help='大桶中的对象数')
+    parser.add_argument('--ddb-items', type=int, default=20000, help='大表中的条目数')
+    parser.add_argument('--log-events', type=int, default=50000, help='高频日志组中的事件数')
+    parser.add_argument('--quick', action='store_true', help='CI 用的小数据量（5000 对象 / 2000 条目 / 5000 事件）')
+    parser.add_argument('--only', help='只运行名称包含该字符串的场景')
+    parser.add_argument('--json', help='将结果写入 JSON 文件')
+    parser.add_argument('--save-baseline', help='将本次 p50 结果保存为基线文件')
+    parser.add_argument('--baseline', help='与基线文件比较，p50 退化超过容差时退出码为 1')
+    parser.add_argument('--tolerance', type=float, default=1.5, help='允许的 p50 倍数，默认 1.5')
+    parser.add_argument('--min-delta-ms', type=float, default=2.0, help='小于该差值的退化忽略，避免噪声')
+    args = parser.parse_args()
+    if args.quick:
+        args.iterations, args.s3_objects, args.ddb_items, args.log_events = 10, 5000, 2000, 5000
+
+    work_dir = tempfile.mkdtemp(prefix='aws_bench_')
+    upload_path = os.path.join(work_dir, 'upload.bin')
+    with open(upload_path, 'wb') as f:
+        f.write(os.urandom(12 * 1024 * 1024))
+
+    with mock_aws(config={'lambda': {'use_docker': False}}):
+        clients = measure_clients(args.iterations)
+        now_ms = int(time.time() * 1000)
+        print('准备测试数据...')
+        seed_base_fixtures(now_ms)
+        role_arn = lambda_role_arn()
+        create_functions([FUNCTION], role_arn)
+        seed_big_bucket(args.s3_objects)
+        seed_big_table(args.ddb_items)
+        seed_busy_log_group(args.log_events, now_ms)
+
+        results = {}
+        for scenario in build_scenarios(args, role_arn, now_ms, upload_path, work_dir):
+            if args.only and args.only not in scenario.name:
+                continue
+            results[scenario.name] = run_scenario(scenario, args.iterations)
+            r = results[scenario.name]
+            status = f"失败：{r['error']}" if r['error'] else ''
+            print(f"  {scenario.name:<42} p50 {r['p50_ms']:9.2f} ms  p99 {r['p99_ms']:9.2f} ms  "
+                  f"峰值内存 {r['peak_kib']:9.1f} KiB  结果 {r['result_kib']:8.1f} KiB  {status}")
+        dispatch = measure_dispatch(max(args.iterations, 100))
+
+    print('client 创建耗时：')
+    for service, s in clients.items():
+        print(f"  {service:<16} 首次 {s['first_ms']:8.2f} ms  新凭证 {s['new_credentials_ms']:8.2f} ms  "
+              f"缓存命中 {s['cached_p50_ms']:8.4f} ms")
+    print(f"分发开销（参数校验失败路径）：p50 {dispatch['p50_ms']:.4f} ms  p99 {dispatch['p99_ms']:.4f} ms")
+
+    report = {'scenarios': results, 'clients': clients, 'dispatch': dispatch}
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({name: {'p50_ms': r['p50_ms']} for name, r in results.items()}, f, indent=2)
+
+    failures = [f"{name}: {r['error']}" for name, r in results.items() if r['error']]
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            failures += compare(results, json.load(f), args.tolerance, args.min_delta_ms)
+    if failures:
+        print('回归：')
+        for line in failures:
+            print(f"  {line}")
+        sys.exit(1)
+    print('全部通过')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+AWS 综合服务管理工具冷启动基准脚本
+
+每轮在全新子进程中测量：
+  - 导入 aws_services_manager 的耗时
+  - 创建第一个 client 的耗时（包含延迟导入 boto3 与加载服务模型）
+不访问网络。
+
+用法：python3 bench_cold_start.py [--rounds 5] [--service dynamodb]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+TOOL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '1.0.0')
+
+CHILD_CODE = """
+import json, sys, time
+sys.path.insert(0, %r)
+t0 = time.perf_counter()
+import aws_services_manager as m
+t1 = time.perf_counter()
+m._get_client('AKIABENCHMARK', 'secret', 'us-east-1', m._SERVICE_CLIENT_NAMES[%r])
+t2 = time.perf_counter()
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "first_client_ms": (t2 - t1) * 1000}))
+"""
+
+
+def run_round(service: str) -> dict:
+    output = subprocess.check_output([sys.executable, '-c', CHILD_CODE % (TOOL_DIR, service)])
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def report(name: str, samples: list) -> None:
+    for key in ('import_ms', 'first_client_ms'):
+        values = [s[key] for s in samples]
+        print(f"  {name:<12} {key:<16} 中位数 {statistics.median(values):8.1f} ms  "
+              f"最小 {min(values):8.1f} ms  最大 {max(values):8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='AWS 工具冷启动基准')
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--service', default='dynamodb')
+    args = parser.parse_args()
+
+    print(f"服务：{args.service}，轮数：{args.rounds}")
+    report('冷启动', [run_round(args.service) for _ in range(args.rounds)])
+
+if __name__ == '__main__':
+    main()
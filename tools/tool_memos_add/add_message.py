@@ -1,7 +1,674 @@
+import atexit
+import hashlib
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+try:
+    import fcntl
+except ImportError:
+    # Windows 下没有 fcntl，本地日志仍会写入，但不恢复其他进程遗留的日志
+    fcntl = None
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NewConnectionError
+
+# ========== HTTP 客户端 ==========
+# 进程内复用的 keep-alive 连接池，只属于本工具，不与其他工具共享状态
+_POOL_MAXSIZE = 16
+_RETRY_STATUS = frozenset({429, 502, 503, 504})
+_BACKOFF_BASE = 0.2
+_BACKOFF_MAX = 2.0
+_BASE_URL_ENV = "MAXKB_MEMOS_BASE_URL"
+_DEFAULT_BASE_URL = "https://memos.memtensor.cn/api/openmem/v1"
+
+
+class _NotSentError(requests.exceptions.ConnectionError):
+    """连接未建立，请求确定没有发出（HTTP/2 客户端使用）"""
+
+
+class _CountingHTTPAdapter(HTTPAdapter):
+    """在 urllib3 连接池新建连接时计数，用于统计 keep-alive 复用情况"""
+
+    def __init__(self, on_new_connection, **kwargs):
+        self._on_new_connection = on_new_connection
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        on_new_connection = self._on_new_connection
+
+        def counted(base):
+            def _new_conn(pool):
+                on_new_connection()
+                return base._new_conn(pool)
+            return type(base.__name__, (base,), {"_new_conn": _new_conn})
+
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": counted(HTTPConnectionPool),
+            "https": counted(HTTPSConnectionPool)
+        }
+
+
+class _MemosHttpClient:
+    """MemOS HTTP 客户端：keep-alive 连接池、连接/读取超时、带抖动的指数退避重试，可选 HTTP/2（需要 httpx 与 h2）"""
+
+    def __init__(self, http2: bool = False):
+        self.lock = threading.Lock()
+        self.stats = {"responses": 0, "retries": 0, "errors": 0, "connections_opened": 0}
+        self.http2 = False
+        self._httpx = None
+        self._session = None
+        if http2:
+            try:
+                import h2  # noqa: F401  httpx 的 HTTP/2 支持依赖 h2
+                import httpx
+                self._httpx = httpx.Client(http2=True, limits=httpx.Limits(
+                    max_connections=_POOL_MAXSIZE, max_keepalive_connections=_POOL_MAXSIZE))
+                self.http2 = True
+            except ImportError:
+                # 未安装 httpx/h2 时回退到 HTTP/1.1 keep-alive
+                pass
+        if self._httpx is None:
+            self._session = requests.Session()
+            adapter = _CountingHTTPAdapter(lambda: self._count("connections_opened"),
+                                           pool_maxsize=_POOL_MAXSIZE, max_retries=0)
+            self._session.mount("https://", adapter)
+            self._session.mount("http://", adapter)
+
+    def _count(self, name: str, value: int = 1) -> None:
+        with self.lock:
+            self.stats[name] += value
+
+    def _trace(self, event_name: str, info: dict) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            self._count("connections_opened")
+
+    def _send(self, url: str, payload: dict, headers: dict, connect_timeout: float, read_timeout: float):
+        """发送一次 POST，返回 (状态码, Retry-After, 响应体)；网络错误统一抛出 requests 异常"""
+        if self._httpx is None:
+            response = self._session.post(url, json=payload, headers=headers,
+                                          timeout=(connect_timeout, read_timeout))
+            return response.status_code, response.headers.get("Retry-After"), response.content
+
+        import httpx
+        try:
+            response = self._httpx.post(
+                url, json=payload, headers=headers, extensions={"trace": self._trace},
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout)
+            )
+        except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+            raise _NotSentError(str(e)) from e
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e)) from e
+        except httpx.HTTPError as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+        return response.status_code, response.headers.get("Retry-After"), response.content
+
+    def post_json(self, url: str, payload: dict, headers: dict, connect_timeout: float = 5,
+                  read_timeout: float = 30, max_retries: int = 2, idempotent: bool = True) -> dict:
+        """
+        POST JSON 并解析响应
+
+        幂等请求在网络错误、超时以及 429/502/503/504 时重试；非幂等请求只在连接未建立或服务端返回 429 时重试，
+        避免重复写入。不再重试时，429/502/503/504 抛出 requests.exceptions.HTTPError。
+        重试间隔为 [0, min(2s, 0.2s * 2^n)] 内的随机值，服务端给出 Retry-After 时取两者较大值（同样不超过 2 秒）。
+        """
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                status, retry_after, body = self._send(url, payload, headers, connect_timeout, read_timeout)
+            except requests.exceptions.RequestException as e:
+                self._count("errors")
+                if attempt >= max_retries or not (idempotent or _request_not_sent(e)):
+                    raise
+            else:
+                self._count("responses")
+                if status not in _RETRY_STATUS:
+                    return json.loads(body)
+                if attempt >= max_retries or not (idempotent or status == 429):
+                    # 限流或服务端暂时不可用，按网络错误处理，调用方可稍后重试
+                    raise requests.exceptions.HTTPError(f"HTTP {status}")
+            delay = random.uniform(0, min(_BACKOFF_MAX, _BACKOFF_BASE * (2 ** attempt)))
+            if retry_after:
+                try:
+                    delay = min(_BACKOFF_MAX, max(delay, float(retry_after)))
+                except ValueError:
+                    pass
+            attempt += 1
+            self._count("retries")
+            time.sleep(delay)
+
+    def close(self) -> None:
+        if self._httpx is not None:
+            self._httpx.close()
+        if self._session is not None:
+            self._session.close()
+
+
+def _request_not_sent(error: Exception) -> bool:
+    """判断请求是否确定没有发出（连接超时、DNS 解析或建连失败）"""
+    if isinstance(error, (requests.exceptions.ConnectTimeout, _NotSentError)):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+def _memos_base_url(base_url: str = "") -> str:
+    """接口地址：参数优先，其次环境变量 MAXKB_MEMOS_BASE_URL，最后为 MemOS 官方地址"""
+    return (base_url or os.environ.get(_BASE_URL_ENV) or _DEFAULT_BASE_URL).rstrip("/")
+
+
+_MEMOS_CLIENTS = {}
+_MEMOS_CLIENTS_LOCK = threading.Lock()
+
+
+def _get_memos_client(http2: bool = False) -> _MemosHttpClient:
+    with _MEMOS_CLIENTS_LOCK:
+        client = _MEMOS_CLIENTS.get(http2)
+        if client is None:
+            client = _MEMOS_CLIENTS[http2] = _MemosHttpClient(http2)
+        return client
 
 
-def add_message(user_id: str, conversation_id: str, user_message: str, assistant_message: str, access_key: str = ""):
+def get_memos_http_stats(reset: bool = False) -> dict:
+    """返回本工具连接池的统计：响应数、新建连接数、复用率、重试与网络错误次数；reset=True 时读取后清零"""
+    with _MEMOS_CLIENTS_LOCK:
+        clients = list(_MEMOS_CLIENTS.values())
+    totals = {"responses": 0, "retries": 0, "errors": 0, "connections_opened": 0}
+    for client in clients:
+        with client.lock:
+            for name in totals:
+                totals[name] += client.stats[name]
+                if reset:
+                    client.stats[name] = 0
+    totals["reuse_ratio"] = max(0.0, round(1 - totals["connections_opened"] / totals["responses"], 4)) \
+        if totals["responses"] else 0.0
+    totals["http2"] = any(client.http2 for client in clients)
+    return totals
+
+
+def close_memos_http_client() -> None:
+    """关闭本工具的 HTTP 客户端及其全部 keep-alive 连接"""
+    with _MEMOS_CLIENTS_LOCK:
+        clients = list(_MEMOS_CLIENTS.values())
+        _MEMOS_CLIENTS.clear()
+    for client in clients:
+        client.close()
+
+
+# ========== 写入代次标记 ==========
+# 每次写入成功后更新该用户的代次标记，MemOS 记忆检索工具把代次放入缓存键，写入前缓存的结果不再命中。
+# 两个工具分别加载、不共享内存，标记保存为本机临时目录下的小文件，同一主机上的其他工作进程也能看到
+_GENERATION_DIR_ENV = "MAXKB_MEMOS_GENERATION_DIR"
+
+
+def _generation_path(base_url: str, access_key: str, user_id: str) -> str:
+    """代次标记文件路径，文件名为接口地址、密钥与 user_id 的摘要；须与记忆检索工具保持一致"""
+    directory = os.environ.get(_GENERATION_DIR_ENV) or os.path.join(tempfile.gettempdir(), "maxkb_memos_generations")
+    digest = hashlib.sha256("\0".join((_memos_base_url(base_url), access_key, user_id)).encode("utf-8")).hexdigest()
+    return os.path.join(directory, digest)
+
+
+def _bump_write_generation(base_url: str, access_key: str, user_id: str) -> None:
+    path = _generation_path(base_url, access_key, user_id)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(uuid.uuid4().hex)
+        os.replace(tmp_path, path)
+    except OSError:
+        # 标记写不进去时检索缓存只能等条目过期，不影响写入结果
+        pass
+
+
+# ========== 异步批量写入（write-behind） ==========
+_JOURNAL_DIR_ENV = "MAXKB_MEMOS_JOURNAL_DIR"
+_FLUSH_MAX_MESSAGES = 20
+_FLUSH_INTERVAL = 2.0
+_FLUSH_WORKERS = 4
+_FLUSH_MAX_ATTEMPTS = 3
+_EXIT_FLUSH_TIMEOUT = 5.0
+_MAX_WRITE_HANDLES = 10000
+_WRITE_BEHIND_QUEUES = {}
+_WRITE_HANDLES = OrderedDict()
+_WRITE_BEHIND_LOCK = threading.Lock()
+
+
+class _MemosWriteError(Exception):
+    """MemOS 返回非 0 的 code，重试也不会成功"""
+
+
+def _build_messages(user_message: str, assistant_message: str) -> list:
+    messages = []
+    if user_message:
+        messages.append({"role": "user", "content": user_message})
+    if assistant_message:
+        messages.append({"role": "assistant", "content": assistant_message})
+    return messages
+
+
+def _post_messages(user_id: str, conversation_id: str, messages: list, access_key: str, options: dict) -> str:
+    """提交一次 add/message 请求并返回 task_id；业务失败抛出 _MemosWriteError，网络错误抛出 requests 异常"""
+    rep = _get_memos_client(options.get("http2", False)).post_json(
+        url=f"{_memos_base_url(options.get('base_url', ''))}/add/message",
+        payload={
+            "user_id": user_id,
+            "conversation_id": conversation_id,
+            "messages": messages
+        },
+        headers={
+            "Content-Type": "application/json",
+            "Authorization": f"Token {access_key}"
+        },
+        connect_timeout=options.get("connect_timeout", 5),
+        read_timeout=options.get("read_timeout", 30),
+        max_retries=options.get("max_retries", 2),
+        idempotent=False
+    )
+    if rep.get("code") != 0:
+        raise _MemosWriteError(rep.get("message", "未知错误"))
+    _bump_write_generation(options.get("base_url", ""), access_key, user_id)
+    return rep.get("data", {}).get("task_id", "")
+
+
+def _access_key_hash(access_key: str) -> str:
+    # 日志只保存 API 密钥的摘要，恢复时用同一密钥匹配
+    return hashlib.sha256(access_key.encode("utf-8")).hexdigest()[:16]
+
+
+class _MessageJournal:
+    """
+    本地日志：每个队列一个 JSONL 文件，入队写 add 记录、提交成功写 done 记录，每次写入后 fsync
+
+    文件持有期间加排他锁；其他进程只恢复拿得到锁的文件（即所属进程已退出）中未完成的消息。
+    """
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.path = os.path.join(directory, f"journal-{os.getpid()}-{uuid.uuid4().hex[:8]}.jsonl")
+        self.file = open(self.path, "a", encoding="utf-8")
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_EX)
+        self.pending = set()
+        self.closed = False
+        self.lock = threading.Lock()
+
+    def _append(self, record: dict) -> None:
+        if self.closed:
+            # 进程退出时日志已关闭，仍在提交的消息保留在文件中，由其他进程恢复
+            return
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def add(self, entry: dict) -> None:
+        with self.lock:
+            self._append(dict(entry, op="add"))
+            self.pending.add(entry["id"])
+
+    def done(self, entry_ids: list) -> None:
+        with self.lock:
+            self.pending.difference_update(entry_ids)
+            if self.pending or self.closed:
+                self._append({"op": "done", "ids": entry_ids})
+            else:
+                # 没有未完成的消息时清空文件，日志不会无限增长
+                self.file.truncate(0)
+                self.file.seek(0)
+
+    def recover(self, key_hash: str) -> list:
+        """取出其他已退出进程遗留的、属于该密钥的未完成消息，并从原文件中移除"""
+        if fcntl is None:
+            return []
+        recovered = []
+        for name in sorted(os.listdir(self.directory)):
+            path = os.path.join(self.directory, name)
+            if not name.startswith("journal-") or not name.endswith(".jsonl") or path == self.path:
+                continue
+            try:
+                with open(path, "r+", encoding="utf-8") as orphan:
+                    try:
+                        fcntl.flock(orphan, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except OSError:
+                        continue
+                    entries = {}
+                    for line in orphan:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            # 崩溃时写了一半的最后一行
+                            continue
+                        if record.get("op") == "add":
+                            entries[record["id"]] = record
+                        elif record.get("op") == "done":
+                            for entry_id in record.get("ids", []):
+                                entries.pop(entry_id, None)
+                    remaining = [e for e in entries.values() if e.get("key_hash") != key_hash]
+                    recovered.extend(e for e in entries.values() if e.get("key_hash") == key_hash)
+                    if not remaining:
+                        os.remove(path)
+                        continue
+                    orphan.seek(0)
+                    orphan.truncate()
+                    orphan.write("".join(json.dumps(e, ensure_ascii=False) + "\n" for e in remaining))
+                    orphan.flush()
+                    os.fsync(orphan.fileno())
+            except OSError:
+                continue
+        return recovered
+
+    def close(self) -> None:
+        with self.lock:
+            self.closed = True
+            self.file.close()
+            if not self.pending:
+                try:
+                    os.remove(self.path)
+                except OSError:
+                    pass
+
+
+class _PendingBatch:
+    """同一 access_key/user_id/conversation_id 下等待提交的连续消息"""
+
+    def __init__(self, max_messages: int, interval: float, options: dict):
+        self.messages = []
+        self.entry_ids = []
+        self.futures = []
+        self.created = time.monotonic()
+        self.not_before = 0.0
+        self.attempts = 0
+        # 为 True 时不再等待凑批，只遵守重试退避
+        self.due = False
+        self.max_messages = max_messages
+        self.interval = interval
+        self.options = options
+
+    def extend(self, other: "_PendingBatch") -> None:
+        self.messages.extend(other.messages)
+        self.entry_ids.extend(other.entry_ids)
+        self.futures.extend(other.futures)
+        self.due = self.due or other.due
+
+
+class _QueuedWrite(Future):
+    """写入队列中一条消息的 Future，handle 为写入句柄（即日志中的消息 id），可传给 add_message 的 flush_handle"""
+
+    def __init__(self, handle: str, queue: "_WriteBehindQueue"):
+        super().__init__()
+        self.handle = handle
+        self.queue = queue
+
+
+class _WriteBehindQueue:
+    """
+    按 (access_key, user_id, conversation_id) 聚合消息，由固定数量的后台线程在达到条数或时间阈值时合并提交
+
+    同一会话同时最多一个请求在途，提交失败的消息放回队首，因此消息顺序与调用顺序一致；
+    网络错误重试耗尽的批次挂起，同一会话之后的消息留在队列中，等挂起的批次重新提交时排在它后面一起提交。
+    """
+
+    def __init__(self, journal_dir: str = ""):
+        self.cond = threading.Condition()
+        self.pending = {}
+        self.inflight = set()
+        # 网络错误重试耗尽的批次，同一密钥的下一次调用、催促提交或 flush 时放回队首重新提交
+        self.parked = {}
+        self.recovered_keys = set()
+        self.journal = _MessageJournal(journal_dir) if journal_dir else None
+        # 每个线程同时只提交一个批次，线程数即在途请求上限
+        for i in range(_FLUSH_WORKERS):
+            threading.Thread(target=self._run, name=f"memos-write-behind-{i}", daemon=True).start()
+
+    def enqueue(self, user_id: str, conversation_id: str, messages: list, access_key: str,
+                max_messages: int, interval: float, options: dict) -> "_QueuedWrite":
+        if self.journal is not None:
+            self._recover(access_key, max_messages, interval, options)
+        self._replay_parked(lambda key: key[0] == access_key)
+        return self._enqueue({"id": uuid.uuid4().hex, "key_hash": _access_key_hash(access_key),
+                              "base_url": _memos_base_url(options.get("base_url", "")),
+                              "user_id": user_id, "conversation_id": conversation_id, "messages": messages},
+                             access_key, max_messages, interval, options)
+
+    def _enqueue(self, entry: dict, access_key: str, max_messages: int, interval: float,
+                 options: dict) -> "_QueuedWrite":
+        future = _QueuedWrite(entry["id"], self)
+        _register_write_handle(future)
+        if self.journal is not None:
+            self.journal.add(entry)
+        # 恢复的消息提交到原来的接口地址
+        base_url = entry.get("base_url") or _memos_base_url()
+        key = (access_key, base_url, entry["user_id"], entry["conversation_id"])
+        with self.cond:
+            batch = self.pending.get(key)
+            if batch is None:
+                batch = self.pending[key] = _PendingBatch(max_messages, interval, dict(options, base_url=base_url))
+            batch.messages.extend(entry["messages"])
+            batch.entry_ids.append(entry["id"])
+            batch.futures.append(future)
+            self.cond.notify_all()
+        return future
+
+    def _recover(self, access_key: str, max_messages: int, interval: float, options: dict) -> None:
+        key_hash = _access_key_hash(access_key)
+        with self.cond:
+            if key_hash in self.recovered_keys:
+                return
+            self.recovered_keys.add(key_hash)
+        for entry in self.journal.recover(key_hash):
+            self._enqueue(entry, access_key, max_messages, interval, options)
+
+    def _replay_parked(self, match) -> None:
+        """把 match(key) 为真的挂起批次放回队首重新提交，原 Future 已返回错误，成功后只更新日志"""
+        with self.cond:
+            for key in [k for k in self.parked if match(k)]:
+                self._unpark(key)
+            self.cond.notify_all()
+
+    def _unpark(self, key: tuple) -> None:
+        """在持有 cond 时调用：挂起的批次与之后入队的同一会话消息合并，挂起的在前"""
+        batch = self.parked.pop(key)
+        batch.attempts = 0
+        batch.not_before = 0.0
+        later = self.pending.pop(key, None)
+        if later is not None:
+            batch.extend(later)
+        self.pending[key] = batch
+
+    def expedite(self, handle: str = None) -> None:
+        """让包含该句柄的批次（未指定时为全部批次）不再等待凑批，尽快由后台线程提交；会话挂起时先放回挂起的批次"""
+        with self.cond:
+            for key in list(self.pending):
+                if handle is None or handle in self.pending[key].entry_ids:
+                    if key in self.parked:
+                        self._unpark(key)
+                    self.pending[key].due = True
+            self.cond.notify_all()
+
+    def _take_ready(self):
+        """在持有 cond 时调用：取出一个可以提交的批次，或返回需要等待的秒数"""
+        now = time.monotonic()
+        wait = None
+        for key, batch in self.pending.items():
+            if key in self.inflight or key in self.parked:
+                continue
+            if batch.due or len(batch.messages) >= batch.max_messages:
+                ready_at = batch.not_before
+            else:
+                ready_at = max(batch.not_before, batch.created + batch.interval)
+            if ready_at <= now:
+                self.inflight.add(key)
+                return key, self.pending.pop(key), None
+            wait = ready_at - now if wait is None else min(wait, ready_at - now)
+        return None, None, wait
+
+    def _run(self) -> None:
+        while True:
+            with self.cond:
+                while True:
+                    key, batch, wait = self._take_ready()
+                    if key is not None:
+                        break
+                    self.cond.wait(wait)
+            self._flush(key, batch)
+
+    def _flush(self, key: tuple, batch: "_PendingBatch") -> None:
+        access_key, _, user_id, conversation_id = key
+        error = None
+        try:
+            task_id = _post_messages(user_id, conversation_id, batch.messages, access_key, batch.options)
+        except _MemosWriteError as e:
+            # 业务错误（如密钥无效）重试无意义，丢弃并从日志中移除
+            error = e
+            batch.attempts = _FLUSH_MAX_ATTEMPTS
+        except Exception as e:
+            error = e
+            batch.attempts += 1
+
+        futures = batch.futures
+        with self.cond:
+            self.inflight.discard(key)
+            if error is not None and batch.attempts < _FLUSH_MAX_ATTEMPTS:
+                batch.not_before = time.monotonic() + batch.interval
+                later = self.pending.pop(key, None)
+                if later is not None:
+                    batch.extend(later)
+                self.pending[key] = batch
+                self.cond.notify_all()
+                return
+            if error is not None and not isinstance(error, _MemosWriteError):
+                # 网络错误重试耗尽：在放开在途标记的同一临界区内挂起，其他线程不会抢先提交同一会话之后的消息；
+                # 日志记录同时保留，进程重启后从日志恢复
+                batch.futures = []
+                earlier = self.parked.pop(key, None)
+                if earlier is not None:
+                    earlier.extend(batch)
+                    batch = earlier
+                self.parked[key] = batch
+            self.cond.notify_all()
+
+        if (error is None or isinstance(error, _MemosWriteError)) and self.journal is not None:
+            self.journal.done(batch.entry_ids)
+        for future in futures:
+            if error is None:
+                future.set_result(task_id)
+            else:
+                future.set_exception(error)
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        让后台线程立即提交全部待写消息（含挂起的批次，各重新提交一轮）并等待完成，不在当前线程发起请求
+
+        超时或仍有批次因重试耗尽而挂起时返回 False。
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self._replay_parked(lambda key: True)
+        with self.cond:
+            while self.inflight or any(key not in self.parked for key in self.pending):
+                # 重试放回队列的批次同样不再等待凑批
+                for batch in self.pending.values():
+                    if not batch.due:
+                        batch.due = True
+                        self.cond.notify_all()
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.cond.wait(remaining)
+            return not self.parked
+
+
+def _register_write_handle(future: "_QueuedWrite") -> None:
+    with _WRITE_BEHIND_LOCK:
+        _WRITE_HANDLES[future.handle] = future
+        while len(_WRITE_HANDLES) > _MAX_WRITE_HANDLES:
+            _WRITE_HANDLES.popitem(last=False)
+
+
+def _get_write_behind_queue(journal_dir: str) -> _WriteBehindQueue:
+    with _WRITE_BEHIND_LOCK:
+        queue = _WRITE_BEHIND_QUEUES.get(journal_dir)
+        if queue is None:
+            queue = _WRITE_BEHIND_QUEUES[journal_dir] = _WriteBehindQueue(journal_dir)
+        return queue
+
+
+def enqueue_message(user_id: str, conversation_id: str, user_message: str, assistant_message: str,
+                    access_key: str = "", flush_max_messages: int = _FLUSH_MAX_MESSAGES,
+                    flush_interval: float = _FLUSH_INTERVAL, journal_dir: str = None, **options) -> "Future":
+    """
+    将一轮对话加入写入队列并立即返回 Future，Future 在批次提交成功后解析为 MemOS task_id，handle 属性为写入句柄
+
+    同一 user_id/conversation_id 的连续消息合并为一个 messages 数组，累计 flush_max_messages 条或
+    最早一条等待 flush_interval 秒后提交。journal_dir（默认取环境变量 MAXKB_MEMOS_JOURNAL_DIR）非空时
+    消息先写入本地日志，进程崩溃后由同一 access_key 的下一次调用恢复提交。
+    options 可包含 connect_timeout、read_timeout、max_retries、http2、base_url，与 add_message 相同。
+    """
+    messages = _build_messages(user_message, assistant_message)
+    if not messages:
+        raise ValueError("消息内容不能为空")
+    if journal_dir is None:
+        journal_dir = os.environ.get(_JOURNAL_DIR_ENV, "")
+    return _get_write_behind_queue(journal_dir).enqueue(
+        user_id, conversation_id, messages, access_key, max(1, flush_max_messages), max(0.0, flush_interval), options
+    )
+
+
+def wait_message_handle(handle: str, timeout: float = None) -> str:
+    """
+    提交写入句柄所在的批次并最多等待 timeout 秒，返回 MemOS task_id
+
+    句柄未知（不属于当前进程或已被淘汰）时抛出 KeyError，超时抛出 concurrent.futures.TimeoutError，
+    提交失败时抛出与同步写入相同的异常。
+    """
+    with _WRITE_BEHIND_LOCK:
+        future = _WRITE_HANDLES.get(handle)
+    if future is None:
+        raise KeyError(handle)
+    if not future.done():
+        future.queue.expedite(handle)
+    return future.result(timeout)
+
+
+def flush_message_queue(timeout: float = None) -> bool:
+    """立即提交全部队列中的消息（含重试耗尽后挂起的批次）并等待完成；超时或仍有批次挂起时返回 False"""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    with _WRITE_BEHIND_LOCK:
+        queues = list(_WRITE_BEHIND_QUEUES.values())
+    for queue in queues:
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        if not queue.flush(remaining):
+            return False
+    return True
+
+
+@atexit.register
+def _flush_on_exit() -> None:
+    # 只等待后台线程最多 _EXIT_FLUSH_TIMEOUT 秒，未完成的消息保留在日志中，不阻塞进程退出
+    flush_message_queue(_EXIT_FLUSH_TIMEOUT)
+    with _WRITE_BEHIND_LOCK:
+        queues = list(_WRITE_BEHIND_QUEUES.values())
+    for queue in queues:
+        if queue.journal is not None:
+            queue.journal.close()
+
+
+def add_message(user_id: str, conversation_id: str, user_message: str, assistant_message: str, access_key: str = "",
+                connect_timeout: float = 5, read_timeout: float = 30, max_retries: int = 2, http2: bool = False,
+                write_behind: bool = False, flush_max_messages: int = _FLUSH_MAX_MESSAGES,
+                flush_interval: float = _FLUSH_INTERVAL, journal_dir: str = None, base_url: str = "",
+                flush_handle: str = "", return_http_stats: bool = False):
     """
     MemOS 消息添加
 
@@ -11,43 +678,53 @@ def add_message(user_id: str, conversation_id: str, user_message: str, assistant
     - user_message: string, 必填, 用户消息内容（对应 messages[].content）
     - assistant_message: string, 必填, 助手消息内容（对应 messages[].content）
     - access_key: string, 必填, API密钥
+    - connect_timeout: number, 可选, 建立连接超时（秒，默认5）
+    - read_timeout: number, 可选, 等待响应超时（秒，默认30）
+    - max_retries: number, 可选, 最大重试次数（默认2），写入请求只在连接未建立或限流时重试
+    - http2: boolean, 可选, 是否使用 HTTP/2（需要安装 httpx[http2]，未安装时回退到 HTTP/1.1）
+    - write_behind: boolean, 可选, 是否异步批量写入（默认否），开启后消息加入队列立即返回写入句柄，由后台线程合并提交
+    - flush_max_messages: number, 可选, 异步写入时单个会话累计多少条消息立即提交（默认20）
+    - flush_interval: number, 可选, 异步写入时消息最长等待秒数（默认2）
+    - journal_dir: string, 可选, 异步写入的本地日志目录（默认取环境变量 MAXKB_MEMOS_JOURNAL_DIR，为空则不落盘）
+    - base_url: string, 可选, MemOS 接口地址（默认取环境变量 MAXKB_MEMOS_BASE_URL，未设置时为官方地址）
+    - flush_handle: string, 可选, 异步写入返回的写入句柄；传入时不添加消息，而是提交该句柄所在批次并
+      最多等待 read_timeout 秒，返回 MemOS 任务ID
+    - return_http_stats: boolean, 可选, 为真时不添加消息，返回本工具连接池统计的 JSON（同 get_memos_http_stats）
 
     原始API messages数组字段：
     - role: string, 必填, 消息角色（user/assistant/system/tool）
     - content: string, 必填, 消息内容文本
     - chat_time: string, 可选, 对话时间
     """
-    http_session = requests.Session()
     try:
-        messages = []
-        if user_message:
-            messages.append({"role": "user", "content": user_message})
-        if assistant_message:
-            messages.append({"role": "assistant", "content": assistant_message})
+        if return_http_stats:
+            return json.dumps(get_memos_http_stats(), ensure_ascii=False)
+
+        if flush_handle:
+            try:
+                task_id = wait_message_handle(flush_handle, read_timeout)
+            except KeyError:
+                return f"错误：未找到写入句柄 {flush_handle}（句柄只在写入它的进程内有效）"
+            except FutureTimeoutError:
+                return f"信息：消息仍在写入队列中，句柄: {flush_handle}"
+            return f"信息：消息添加成功，任务ID: {task_id}"
+
+        messages = _build_messages(user_message, assistant_message)
 
         if not messages:
             return "错误：消息内容不能为空"
 
-        data = {
-            "user_id": user_id,
-            "conversation_id": conversation_id,
-            "messages": messages
-        }
+        options = {"connect_timeout": connect_timeout, "read_timeout": read_timeout,
+                   "max_retries": max_retries, "http2": http2, "base_url": base_url}
+        if write_behind:
+            future = enqueue_message(user_id, conversation_id, user_message, assistant_message, access_key,
+                                     flush_max_messages, flush_interval, journal_dir, **options)
+            return f"信息：消息已加入写入队列，将在后台合并提交，句柄: {future.handle}"
 
-        rep = http_session.post(
-            url="https://memos.memtensor.cn/api/openmem/v1/add/message",
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": f"Token {access_key}"
-            },
-            json=data
-        ).json()
-
-        if rep.get("code") == 0:
-            task_id = rep.get("data", {}).get("task_id", "")
-            return f"信息：消息添加成功，任务ID: {task_id}"
-        else:
-            return f"错误：消息添加失败：{rep.get('message', '未知错误')}"
+        task_id = _post_messages(user_id, conversation_id, messages, access_key, options)
+        return f"信息：消息添加成功，任务ID: {task_id}"
+    except _MemosWriteError as e:
+        return f"错误：消息添加失败：{e}"
     except requests.exceptions.RequestException as e:
         return f"错误：添加消息时发生网络错误: {e}"
     except Exception as e:
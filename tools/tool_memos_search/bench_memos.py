@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+MemOS 记忆添加 / 记忆检索工具离线压测脚本
+
+在子进程中启动本地 MemOS 替身服务（memos_standin_server.py），按递增的并发数驱动 search_memory 与 add_message，
+报告每一档的吞吐量、延迟百分位、失败数与服务端接受的连接数，全程不访问网络。
+
+客户端模式：
+  legacy        每次调用新建 requests 会话（连接不复用），与改造前的工具代码相同
+  pooled        复用连接池，不使用检索缓存
+  cached        复用连接池 + 检索缓存
+  write_behind  复用连接池 + 检索缓存 + 异步批量写入（吞吐按调用阶段计算，每档结束时排空队列的耗时单独列出）
+
+操作：search（只检索）、add（只写入）、turn（一轮对话：先检索再写入，模拟智能体的一次回复）。
+最后一列按「每个会话每 --turn-interval 秒调用一次」折算单个进程可支撑的会话数。
+
+用法：
+  python3 bench_memos.py
+  python3 bench_memos.py --op turn --modes legacy,write_behind --levels 1,8,32 --latency-ms 40 --jitter-ms 20
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+TOOL_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(TOOL_DIR), 'tool_memos_add'))
+sys.path.insert(0, TOOL_DIR)
+
+import add_message as memos_add  # noqa: E402
+import search_memory as memos_search  # noqa: E402
+from add_message import add_message, flush_message_queue  # noqa: E402
+from search_memory import search_memory, clear_search_cache  # noqa: E402
+
+ACCESS_KEY = "bench-key"
+
+
+def close_clients() -> None:
+    """两个工具各自持有连接池，分别关闭"""
+    memos_add.close_memos_http_client()
+    memos_search.close_memos_http_client()
+
+
+MODES = ('legacy', 'pooled', 'cached', 'write_behind')
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def start_standin(args: argparse.Namespace):
+    command = [
+        sys.executable, os.path.join(TOOL_DIR, 'memos_standin_server.py'), '--port', '0',
+        '--latency-ms', str(args.latency_ms), '--jitter-ms', str(args.jitter_ms),
+        '--error-rate', str(args.error_rate), '--access-key', ACCESS_KEY
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    # 启动输出形如「MemOS 替身服务已启动：http://127.0.0.1:xxxxx/api/openmem/v1（Ctrl+C 退出）」
+    base_url = line[line.index('http'):].split('（')[0].strip()
+    return process, base_url
+
+
+def server_stats(base_url: str, reset: bool = False) -> dict:
+    root = base_url.split('/api/')[0]
+    with urllib.request.urlopen(f"{root}/_stats{'?reset=1' if reset else ''}", timeout=5) as response:
+        return json.loads(response.read())
+
+
+def legacy_post(url: str, payload: dict) -> dict:
+    """改造前的请求方式：每次调用新建会话，请求结束后连接随之关闭"""
+    response = requests.post(url, json=payload, headers={
+        "Content-Type": "application/json",
+        "Authorization": f"Token {ACCESS_KEY}"
+    }, timeout=30)
+    response.raise_for_status()
+    return response.json()
+
+
+def make_call(mode: str, op: str, args: argparse.Namespace, base_url: str):
+    """返回执行一次操作的函数，函数返回是否成功"""
+    def search(i: int) -> bool:
+        user_id = f"bench-user-{i % args.sessions}"
+        query = f"话题{(i // args.sessions) % args.distinct_queries} 偏好"
+        if mode == 'legacy':
+            rep = legacy_post(f"{base_url}/search/memory", {
+                "user_id": user_id, "query": query, "include_preference": True, "memory_limit_number": 6
+            })
+            return rep.get("code") == 0
+        result = search_memory(user_id, query, access_key=ACCESS_KEY, base_url=base_url,
+                               cache_ttl=0 if mode == 'pooled' else 60)
+        return not result.startswith("错误：")
+
+    def add(i: int) -> bool:
+        user_id = f"bench-user-{i % args.sessions}"
+        user_message = f"话题{i % args.distinct_queries} 我喜欢第 {i} 个选项"
+        if mode == 'legacy':
+            rep = legacy_post(f"{base_url}/add/message", {
+                "user_id": user_id, "conversation_id": "bench",
+                "messages": [{"role": "user", "content": user_message},
+                             {"role": "assistant", "content": "好的"}]
+            })
+            return rep.get("code") == 0
+        result = add_message(user_id, "bench", user_message, "好的", access_key=ACCESS_KEY, base_url=base_url,
+                             write_behind=mode == 'write_behind')
+        return result.startswith("信息：")
+
+    if op == 'search':
+        return search
+    if op == 'add':
+        return add
+    return lambda i: search(i) & add(i)
+
+
+def run_level(mode: str, concurrency: int, args: argparse.Namespace, base_url: str) -> dict:
+    call = make_call(mode, args.op, args, base_url)
+    clear_search_cache()
+    server_stats(base_url, reset=True)
+
+    def one(i: int):
+        t0 = time.perf_counter()
+        try:
+            success = call(i)
+        except requests.exceptions.RequestException:
+            success = False
+        return (time.perf_counter() - t0) * 1000, success
+
+    latencies = []
+    failures = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for latency, success in executor.map(one, range(args.requests)):
+            latencies.append(latency)
+            failures += 0 if success else 1
+    elapsed = time.perf_counter() - start
+    drain_ms = 0.0
+    if mode == 'write_behind':
+        failures += 0 if flush_message_queue(timeout=60) else 1
+        drain_ms = (time.perf_counter() - start - elapsed) * 1000
+
+    stats = server_stats(base_url)
+    throughput = args.requests / elapsed
+    return {
+        'mode': mode,
+        'concurrency': concurrency,
+        'throughput': throughput,
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'p99_ms': percentile(latencies, 99),
+        'failures': failures,
+        'drain_ms': drain_ms,
+        # 读取统计的请求本身占用一个连接
+        'connections': stats.get('connections', 1) - 1,
+        'server_requests': stats.get('search_memory', 0) + stats.get('add_message', 0),
+        'sessions': int(throughput * args.turn_interval)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='MemOS 工具离线压测')
+    parser.add_argument('--op', choices=('search', 'add', 'turn'), default='turn')
+    parser.add_argument('--modes', default=','.join(MODES), help='逗号分隔的客户端模式')
+    parser.add_argument('--levels', default='1,4,16,32', help='逗号分隔的并发档位')
+    parser.add_argument('--requests', type=int, default=400, help='每一档的调用次数')
+    parser.add_argument('--sessions', type=int, default=50, help='模拟的用户（会话）数')
+    parser.add_argument('--distinct-queries', type=int, default=4, help='每个用户轮换的不同查询数')
+    parser.add_argument('--turn-interval', type=float, default=10, help='折算会话数时每个会话的调用间隔（秒）')
+    parser.add_argument('--latency-ms', type=float, default=20, help='替身服务固定延迟')
+    parser.add_argument('--jitter-ms', type=float, default=10, help='替身服务额外随机延迟上限')
+    parser.add_argument('--error-rate', type=float, default=0)
+    args = parser.parse_args()
+    modes = [m.strip() for m in args.modes.split(',') if m.strip()]
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        parser.error(f"未知模式：{', '.join(sorted(unknown))}")
+
+    process, base_url = start_standin(args)
+    try:
+        print(f"替身服务：{base_url}  操作：{args.op}  每档调用数：{args.requests}  会话数：{args.sessions}  "
+              f"延迟：{args.latency_ms}+{args.jitter_ms} ms")
+        print(f"{'模式':<13} {'并发':>6} {'吞吐(次/s)':>11} {'p50(ms)':>10} {'p95(ms)':>10} {'p99(ms)':>10} "
+              f"{'失败':>6} {'排空(ms)':>9} {'连接':>6} {'服务端请求':>10} {'可支撑会话':>10}")
+        for mode in modes:
+            for level in [int(x) for x in args.levels.split(',') if x.strip()]:
+                close_clients()
+                r = run_level(mode, level, args, base_url)
+                print(f"{r['mode']:<13} {r['concurrency']:>6} {r['throughput']:>11.1f} {r['p50_ms']:>10.2f} "
+                      f"{r['p95_ms']:>10.2f} {r['p99_ms']:>10.2f} {r['failures']:>6} {r['drain_ms']:>9.1f} {r['connections']:>6} "
+                      f"{r['server_requests']:>10} {r['sessions']:>10}")
+    finally:
+        close_clients()
+        process.terminate()
+        process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+本地 MemOS 替身服务，用于离线测试与压测 add_message / search_memory
+
+实现的接口与 MemOS 云服务一致（路径前缀 /api/openmem/v1）：
+  - POST /add/message：按 user_id 保存消息，返回 {"code": 0, "data": {"task_id": ...}}
+  - POST /search/memory：按查询词与已保存消息的重合程度排序，返回 memory_detail_list；
+    用户消息中表达喜好的内容（含「喜欢」「偏好」「prefer」「like」）同时作为 preference_detail_list 返回
+  - 启动时指定了 access_key 则校验 Authorization: Token <access_key>，不一致时返回 code 401
+  - 可配置固定延迟、随机抖动与返回 503 的概率；fail_next(n) 使接下来 n 个请求返回 503
+  - GET /_stats 返回各接口的请求数与服务端接受的 TCP 连接数，GET /_stats?reset=1 读取后清零
+
+用法：
+  python3 memos_standin_server.py --port 8766 --latency-ms 30 --jitter-ms 10 --error-rate 0.01
+  然后设置环境变量 MAXKB_MEMOS_BASE_URL=http://127.0.0.1:8766/api/openmem/v1，或在调用工具时传入 base_url
+
+也可在代码中启动：server, base_url = start_server(latency_ms=10)，用完调用 server.shutdown()
+"""
+
+import argparse
+import json
+import random
+import re
+import socket
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+API_PREFIX = "/api/openmem/v1"
+PREFERENCE_MARKERS = ("喜欢", "偏好", "prefer", "like")
+
+
+def query_terms(text: str) -> set:
+    """切分查询词：英文与数字按单词，中文按单字"""
+    return set(re.findall(r"[a-z0-9]+|[一-鿿]", text.casefold()))
+
+
+class StandinState:
+    """替身服务的配置与运行时状态"""
+
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0, access_key: str = ""):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.access_key = access_key
+        self.memories: Dict[str, List[Dict[str, str]]] = {}
+        self.counters: Dict[str, int] = {}
+        self.failures_pending = 0
+        self.lock = threading.Lock()
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def stats(self, reset: bool = False) -> Dict[str, int]:
+        with self.lock:
+            counters = dict(self.counters)
+            if reset:
+                self.counters.clear()
+        return counters
+
+    def fail_next(self, count: int) -> None:
+        """接下来 count 个业务请求返回 503"""
+        with self.lock:
+            self.failures_pending = count
+
+    def should_fail(self) -> bool:
+        with self.lock:
+            if self.failures_pending > 0:
+                self.failures_pending -= 1
+                return True
+        return bool(self.error_rate) and random.random() < self.error_rate
+
+    def add(self, user_id: str, conversation_id: str, messages: List[Dict[str, str]]) -> None:
+        with self.lock:
+            stored = self.memories.setdefault(user_id, [])
+            for message in messages:
+                stored.append({"role": message.get("role", ""), "content": message.get("content", ""),
+                               "conversation_id": conversation_id})
+
+    def search(self, user_id: str, query: str, limit: int) -> Dict[str, list]:
+        terms = query_terms(query)
+        with self.lock:
+            stored = list(self.memories.get(user_id, []))
+        scored = []
+        for index, message in enumerate(stored):
+            overlap = len(terms & query_terms(message["content"]))
+            if overlap:
+                scored.append((-overlap, -index, message))
+        scored.sort(key=lambda item: item[:2])
+        memories = [{
+            "memory_key": message["content"][:24],
+            "memory_value": message["content"],
+            "relativity": round(-overlap / max(1, len(terms)), 4)
+        } for overlap, _, message in scored[:max(0, limit)]]
+        preferences = [{"preference": message["content"]} for _, _, message in scored[:max(0, limit)]
+                       if message["role"] == "user"
+                       and any(marker in message["content"].casefold() for marker in PREFERENCE_MARKERS)]
+        return {"memory_detail_list": memories, "preference_detail_list": preferences}
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # 带缓冲写出，响应头与响应体合并发送（handle_one_request 结束时统一 flush）
+    wbufsize = -1
+    state: StandinState = None
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+    def setup(self) -> None:
+        super().setup()
+        # 关闭 Nagle，避免小响应被延迟确认拖慢
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.state.count("connections")
+
+    def do_GET(self) -> None:
+        parsed = urlparse(self.path)
+        if parsed.path != "/_stats":
+            self.send_body(404, "text/plain", b"")
+            return
+        reset = parse_qs(parsed.query).get("reset", ["0"])[0] not in ("", "0", "false")
+        self.send_json(self.state.stats(reset))
+
+    def do_POST(self) -> None:
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        except ValueError:
+            self.send_body(400, "text/plain", b"")
+            return
+        path = urlparse(self.path).path
+        if path not in (API_PREFIX + "/add/message", API_PREFIX + "/search/memory"):
+            self.send_body(404, "text/plain", b"")
+            return
+        name = path.rsplit("/", 2)[-2] + "_" + path.rsplit("/", 1)[-1]
+        self.state.count(name)
+
+        delay = self.state.latency_ms + random.uniform(0, self.state.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+        if self.state.should_fail():
+            self.state.count(name + ".503")
+            self.send_body(503, "text/plain", b"")
+            return
+
+        if self.state.access_key and self.headers.get("Authorization", "") != f"Token {self.state.access_key}":
+            self.send_json({"code": 401, "message": "Invalid access key", "data": None})
+            return
+        if not body.get("user_id"):
+            self.send_json({"code": 400, "message": "user_id is required", "data": None})
+            return
+
+        if name == "add_message":
+            messages = body.get("messages") or []
+            if not messages:
+                self.send_json({"code": 400, "message": "messages is required", "data": None})
+                return
+            self.state.add(body["user_id"], body.get("conversation_id", ""), messages)
+            self.state.count("messages", len(messages))
+            self.send_json({"code": 0, "message": "ok", "data": {"task_id": uuid.uuid4().hex}})
+        else:
+            data = self.state.search(body["user_id"], body.get("query", ""), int(body.get("memory_limit_number", 6)))
+            if not body.get("include_preference", True):
+                data["preference_detail_list"] = []
+            self.send_json({"code": 0, "message": "ok", "data": data})
+
+    def send_json(self, payload: Dict[str, Any]) -> None:
+        self.send_body(200, "application/json", json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+
+    def send_body(self, status: int, content_type: str, body: bytes, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_server(host: str = "127.0.0.1", port: int = 0, **options: Any) -> Tuple[ThreadingHTTPServer, str]:
+    """在后台线程启动替身服务，返回 (server, base_url)；server.state 可用于查看计数、注入失败"""
+    state = StandinState(**options)
+    handler = type("BoundStandinHandler", (StandinHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.state = state
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}{API_PREFIX}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="本地 MemOS 替身服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency-ms", type=float, default=0, help="每个请求的固定延迟")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="额外随机延迟上限")
+    parser.add_argument("--error-rate", type=float, default=0, help="返回 503 的概率")
+    parser.add_argument("--access-key", default="", help="校验的 access_key，为空则接受任意值")
+    args = parser.parse_args()
+    server, base_url = start_server(
+        args.host, args.port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, access_key=args.access_key
+    )
+    print(f"MemOS 替身服务已启动：{base_url}（Ctrl+C 退出）", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
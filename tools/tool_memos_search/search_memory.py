@@ -1,7 +1,492 @@
+import hashlib
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NewConnectionError
+
+# ========== HTTP 客户端 ==========
+# 进程内复用的 keep-alive 连接池，只属于本工具，不与其他工具共享状态
+_POOL_MAXSIZE = 16
+_RETRY_STATUS = frozenset({429, 502, 503, 504})
+_BACKOFF_BASE = 0.2
+_BACKOFF_MAX = 2.0
+_BASE_URL_ENV = "MAXKB_MEMOS_BASE_URL"
+_DEFAULT_BASE_URL = "https://memos.memtensor.cn/api/openmem/v1"
+
+
+class _NotSentError(requests.exceptions.ConnectionError):
+    """连接未建立，请求确定没有发出（HTTP/2 客户端使用）"""
+
+
+class _CountingHTTPAdapter(HTTPAdapter):
+    """在 urllib3 连接池新建连接时计数，用于统计 keep-alive 复用情况"""
+
+    def __init__(self, on_new_connection, **kwargs):
+        self._on_new_connection = on_new_connection
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        on_new_connection = self._on_new_connection
+
+        def counted(base):
+            def _new_conn(pool):
+                on_new_connection()
+                return base._new_conn(pool)
+            return type(base.__name__, (base,), {"_new_conn": _new_conn})
+
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": counted(HTTPConnectionPool),
+            "https": counted(HTTPSConnectionPool)
+        }
+
+
+class _MemosHttpClient:
+    """MemOS HTTP 客户端：keep-alive 连接池、连接/读取超时、带抖动的指数退避重试，可选 HTTP/2（需要 httpx 与 h2）"""
+
+    def __init__(self, http2: bool = False):
+        self.lock = threading.Lock()
+        self.stats = {"responses": 0, "retries": 0, "errors": 0, "connections_opened": 0}
+        self.http2 = False
+        self._httpx = None
+        self._session = None
+        if http2:
+            try:
+                import h2  # noqa: F401  httpx 的 HTTP/2 支持依赖 h2
+                import httpx
+                self._httpx = httpx.Client(http2=True, limits=httpx.Limits(
+                    max_connections=_POOL_MAXSIZE, max_keepalive_connections=_POOL_MAXSIZE))
+                self.http2 = True
+            except ImportError:
+                # 未安装 httpx/h2 时回退到 HTTP/1.1 keep-alive
+                pass
+        if self._httpx is None:
+            self._session = requests.Session()
+            adapter = _CountingHTTPAdapter(lambda: self._count("connections_opened"),
+                                           pool_maxsize=_POOL_MAXSIZE, max_retries=0)
+            self._session.mount("https://", adapter)
+            self._session.mount("http://", adapter)
+
+    def _count(self, name: str, value: int = 1) -> None:
+        with self.lock:
+            self.stats[name] += value
+
+    def _trace(self, event_name: str, info: dict) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            self._count("connections_opened")
+
+    def _send(self, url: str, payload: dict, headers: dict, connect_timeout: float, read_timeout: float):
+        """发送一次 POST，返回 (状态码, Retry-After, 响应体)；网络错误统一抛出 requests 异常"""
+        if self._httpx is None:
+            response = self._session.post(url, json=payload, headers=headers,
+                                          timeout=(connect_timeout, read_timeout))
+            return response.status_code, response.headers.get("Retry-After"), response.content
+
+        import httpx
+        try:
+            response = self._httpx.post(
+                url, json=payload, headers=headers, extensions={"trace": self._trace},
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout)
+            )
+        except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+            raise _NotSentError(str(e)) from e
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e)) from e
+        except httpx.HTTPError as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+        return response.status_code, response.headers.get("Retry-After"), response.content
+
+    def post_json(self, url: str, payload: dict, headers: dict, connect_timeout: float = 5,
+                  read_timeout: float = 30, max_retries: int = 2, idempotent: bool = True) -> dict:
+        """
+        POST JSON 并解析响应
+
+        幂等请求在网络错误、超时以及 429/502/503/504 时重试；非幂等请求只在连接未建立或服务端返回 429 时重试，
+        避免重复写入。不再重试时，429/502/503/504 抛出 requests.exceptions.HTTPError。
+        重试间隔为 [0, min(2s, 0.2s * 2^n)] 内的随机值，服务端给出 Retry-After 时取两者较大值（同样不超过 2 秒）。
+        """
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                status, retry_after, body = self._send(url, payload, headers, connect_timeout, read_timeout)
+            except requests.exceptions.RequestException as e:
+                self._count("errors")
+                if attempt >= max_retries or not (idempotent or _request_not_sent(e)):
+                    raise
+            else:
+                self._count("responses")
+                if status not in _RETRY_STATUS:
+                    return json.loads(body)
+                if attempt >= max_retries or not (idempotent or status == 429):
+                    # 限流或服务端暂时不可用，按网络错误处理，调用方可稍后重试
+                    raise requests.exceptions.HTTPError(f"HTTP {status}")
+            delay = random.uniform(0, min(_BACKOFF_MAX, _BACKOFF_BASE * (2 ** attempt)))
+            if retry_after:
+                try:
+                    delay = min(_BACKOFF_MAX, max(delay, float(retry_after)))
+                except ValueError:
+                    pass
+            attempt += 1
+            self._count("retries")
+            time.sleep(delay)
+
+    def close(self) -> None:
+        if self._httpx is not None:
+            self._httpx.close()
+        if self._session is not None:
+            self._session.close()
+
+
+def _request_not_sent(error: Exception) -> bool:
+    """判断请求是否确定没有发出（连接超时、DNS 解析或建连失败）"""
+    if isinstance(error, (requests.exceptions.ConnectTimeout, _NotSentError)):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
 
+def _memos_base_url(base_url: str = "") -> str:
+    """接口地址：参数优先，其次环境变量 MAXKB_MEMOS_BASE_URL，最后为 MemOS 官方地址"""
+    return (base_url or os.environ.get(_BASE_URL_ENV) or _DEFAULT_BASE_URL).rstrip("/")
 
-def search_memory(user_id: str, query: str, conversation_id: str = "", memory_limit_number: int = 6, access_key: str = ""):
+
+_MEMOS_CLIENTS = {}
+_MEMOS_CLIENTS_LOCK = threading.Lock()
+
+
+def _get_memos_client(http2: bool = False) -> _MemosHttpClient:
+    with _MEMOS_CLIENTS_LOCK:
+        client = _MEMOS_CLIENTS.get(http2)
+        if client is None:
+            client = _MEMOS_CLIENTS[http2] = _MemosHttpClient(http2)
+        return client
+
+
+def get_memos_http_stats(reset: bool = False) -> dict:
+    """返回本工具连接池的统计：响应数、新建连接数、复用率、重试与网络错误次数；reset=True 时读取后清零"""
+    with _MEMOS_CLIENTS_LOCK:
+        clients = list(_MEMOS_CLIENTS.values())
+    totals = {"responses": 0, "retries": 0, "errors": 0, "connections_opened": 0}
+    for client in clients:
+        with client.lock:
+            for name in totals:
+                totals[name] += client.stats[name]
+                if reset:
+                    client.stats[name] = 0
+    totals["reuse_ratio"] = max(0.0, round(1 - totals["connections_opened"] / totals["responses"], 4)) \
+        if totals["responses"] else 0.0
+    totals["http2"] = any(client.http2 for client in clients)
+    return totals
+
+
+def close_memos_http_client() -> None:
+    """关闭本工具的 HTTP 客户端及其全部 keep-alive 连接"""
+    with _MEMOS_CLIENTS_LOCK:
+        clients = list(_MEMOS_CLIENTS.values())
+        _MEMOS_CLIENTS.clear()
+    for client in clients:
+        client.close()
+
+
+# ========== 检索结果缓存 ==========
+# 默认不缓存，需要调用方按场景显式开启；开启后 MemOS 记忆添加工具写入成功时，该用户的缓存条目随之失效
+_SEARCH_CACHE_TTL = 0
+_GENERATION_DIR_ENV = "MAXKB_MEMOS_GENERATION_DIR"
+_SEARCH_CACHE_MAX_ENTRIES = 512
+_QUERY_TRAILING_PUNCTUATION = "?!.~。…"
+
+
+class _SearchCache:
+    """
+    格式化后检索结果的 LRU 缓存，条目带过期时间
+
+    键的前两项为用户范围 (接口地址, 密钥摘要, user_id) 与该用户的写入代次；代次变化时删除该用户旧代次的全部条目。
+    """
+
+    def __init__(self, max_entries: int):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.generations = {}
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "misses": 0, "stale": 0, "evictions": 0}
+
+    def _observe_generation(self, scope: tuple, generation: str) -> None:
+        """在持有 lock 时调用"""
+        if self.generations.get(scope, generation) != generation:
+            stale = [k for k in self.entries if k[0] == scope and k[1] != generation]
+            for k in stale:
+                del self.entries[k]
+            self.stats["stale"] += len(stale)
+        self.generations[scope] = generation
+        if len(self.generations) > self.max_entries:
+            scopes = {k[0] for k in self.entries}
+            self.generations = {s: g for s, g in self.generations.items() if s in scopes}
+
+    def get(self, key: tuple):
+        now = time.monotonic()
+        with self.lock:
+            self._observe_generation(key[0], key[1])
+            entry = self.entries.get(key)
+            if entry is not None:
+                expires, text = entry
+                if expires > now:
+                    self.entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return text
+                del self.entries[key]
+                self.stats["stale"] += 1
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key: tuple, text: str, ttl: float) -> None:
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, text)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+
+_SEARCH_CACHE = None
+_SEARCH_CACHE_LOCK = threading.Lock()
+
+
+def _get_search_cache() -> _SearchCache:
+    global _SEARCH_CACHE
+    with _SEARCH_CACHE_LOCK:
+        if _SEARCH_CACHE is None:
+            _SEARCH_CACHE = _SearchCache(_SEARCH_CACHE_MAX_ENTRIES)
+        return _SEARCH_CACHE
+
+
+def _access_key_hash(access_key: str) -> str:
+    # 缓存键只保存 API 密钥的摘要，不在内存中长期保留明文
+    return hashlib.sha256(access_key.encode("utf-8")).hexdigest()
+
+
+def _read_write_generation(base_url: str, access_key: str, user_id: str) -> str:
+    """读取 MemOS 记忆添加工具维护的该用户写入代次，从未写入过时为空字符串；路径规则须与记忆添加工具保持一致"""
+    directory = os.environ.get(_GENERATION_DIR_ENV) or os.path.join(tempfile.gettempdir(), "maxkb_memos_generations")
+    digest = hashlib.sha256("\0".join((_memos_base_url(base_url), access_key, user_id)).encode("utf-8")).hexdigest()
+    try:
+        with open(os.path.join(directory, digest), encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return ""
+
+
+def _cache_key_prefix(base_url: str, access_key: str, user_id: str) -> tuple:
+    """缓存键的前两项：用户范围与写入代次；在发出检索请求前读取，请求期间的写入会使本次结果在下次检索时失效"""
+    scope = (_memos_base_url(base_url), _access_key_hash(access_key), user_id)
+    return scope, _read_write_generation(base_url, access_key, user_id)
+
+
+def _normalize_query(query: str) -> str:
+    """全角转半角、忽略大小写、合并空白并去掉末尾的问号句号等标点"""
+    text = " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+    return text.rstrip(_QUERY_TRAILING_PUNCTUATION).rstrip()
+
+
+def get_search_cache_stats(reset: bool = False) -> dict:
+    """返回检索缓存的命中、未命中、失效（过期或该用户有新写入）、LRU 淘汰次数、当前条目数与命中率；reset=True 时读取后清零"""
+    cache = _get_search_cache()
+    with cache.lock:
+        stats = dict(cache.stats, entries=len(cache.entries))
+        if reset:
+            cache.stats = dict.fromkeys(cache.stats, 0)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+    return stats
+
+
+def clear_search_cache() -> None:
+    """清空检索缓存"""
+    cache = _get_search_cache()
+    with cache.lock:
+        cache.entries.clear()
+        cache.generations.clear()
+
+
+def _format_search_result(data: dict) -> str:
+    result_parts = []
+    memory_list = data.get("memory_detail_list", [])
+    preference_list = data.get("preference_detail_list", [])
+
+    if memory_list:
+        result_parts.append("【事实记忆】")
+        for mem in memory_list:
+            result_parts.append(f"- {mem.get('memory_key', '')}: {mem.get('memory_value', '')}")
+
+    if preference_list:
+        result_parts.append("【偏好记忆】")
+        for pref in preference_list:
+            result_parts.append(f"- {pref.get('preference', '')}")
+
+    if result_parts:
+        return "\n".join(result_parts)
+    else:
+        return "未找到相关记忆"
+
+
+# ========== 多查询并发检索 ==========
+_MULTI_QUERY_MAX = 8
+_MULTI_QUERY_CONCURRENCY = 4
+_MULTI_DEFAULT_MAX_ITEMS = 12
+# 倒数排名融合（RRF）常数：条目得分为各子查询中 1 / (k + 名次) 之和
+_RRF_K = 60
+
+
+class _MemosSearchError(Exception):
+    """MemOS 返回非 0 的 code"""
+
+
+def _search_request(user_id: str, query: str, conversation_id: str, memory_limit_number: int, access_key: str,
+                    options: dict) -> dict:
+    """发送一次 search/memory 请求并返回 data；业务失败抛出 _MemosSearchError，网络错误抛出 requests 异常"""
+    data = {
+        "user_id": user_id,
+        "query": query,
+        "include_preference": True,
+        "memory_limit_number": memory_limit_number
+    }
+    if conversation_id:
+        data["conversation_id"] = conversation_id
+
+    rep = _get_memos_client(options.get("http2", False)).post_json(
+        url=f"{_memos_base_url(options.get('base_url', ''))}/search/memory",
+        payload=data,
+        headers={
+            "Content-Type": "application/json",
+            "Authorization": f"Token {access_key}"
+        },
+        connect_timeout=options.get("connect_timeout", 5),
+        read_timeout=options.get("read_timeout", 30),
+        max_retries=options.get("max_retries", 2)
+    )
+    if rep.get("code") != 0:
+        raise _MemosSearchError(rep.get("message", "未知错误"))
+    return rep.get("data", {})
+
+
+def _search_error_text(error: Exception) -> str:
+    if isinstance(error, _MemosSearchError):
+        return f"错误：记忆检索失败：{error}"
+    if isinstance(error, requests.exceptions.RequestException):
+        return f"错误：记忆检索时发生网络错误: {error}"
+    return f"错误：处理记忆检索响应时发生错误: {error}"
+
+
+def _merge_search_results(results: list, max_items: int) -> dict:
+    """
+    合并多个子查询的检索结果
+
+    事实记忆按 memory_key、偏好记忆按偏好文本去重（忽略大小写与空白），重复条目保留最先出现的一份。
+    排序使用倒数排名融合：被多个子查询召回、名次靠前的条目得分高；得分相同时保持首次出现的顺序。
+    事实与偏好统一排序后取前 max_items 条，再按类别分别输出。
+    """
+    merged = {}
+    for data in results:
+        for kind, field, text_field in (("memory", "memory_detail_list", "memory_key"),
+                                        ("preference", "preference_detail_list", "preference")):
+            for rank, item in enumerate(data.get(field) or []):
+                dedupe_key = " ".join(str(item.get(text_field, "")).casefold().split())
+                if not dedupe_key:
+                    continue
+                score = 1.0 / (_RRF_K + rank + 1)
+                entry = merged.get((kind, dedupe_key))
+                if entry is None:
+                    merged[(kind, dedupe_key)] = [score, len(merged), kind, item]
+                else:
+                    entry[0] += score
+
+    ranked = sorted(merged.values(), key=lambda entry: (-entry[0], entry[1]))[:max(0, max_items)]
+    return {
+        "memory_detail_list": [item for _, _, kind, item in ranked if kind == "memory"],
+        "preference_detail_list": [item for _, _, kind, item in ranked if kind == "preference"]
+    }
+
+
+def _split_queries(queries) -> list:
+    """接受列表或按行分隔的字符串，去掉空查询与规范化后重复的查询，最多保留 8 个"""
+    if isinstance(queries, str):
+        queries = queries.splitlines()
+    unique = {}
+    for query in queries or []:
+        query = str(query).strip()
+        if query:
+            unique.setdefault(_normalize_query(query), query)
+    return list(unique.values())[:_MULTI_QUERY_MAX]
+
+
+def search_memory_multi(user_id: str, queries, conversation_id: str = "", memory_limit_number: int = 6,
+                        access_key: str = "", max_items: int = _MULTI_DEFAULT_MAX_ITEMS,
+                        max_concurrency: int = _MULTI_QUERY_CONCURRENCY, connect_timeout: float = 5,
+                        read_timeout: float = 30, max_retries: int = 2, http2: bool = False,
+                        cache_ttl: float = _SEARCH_CACHE_TTL, base_url: str = "") -> str:
+    """
+    多查询记忆检索：并发检索多个子问题，合并、去重、排序后返回一段格式化文本
+
+    - queries: list 或按行分隔的 string, 必填, 子查询（去重后最多 8 个）
+    - max_items: number, 可选, 合并后事实记忆与偏好记忆的总条数上限（默认12）
+    - max_concurrency: number, 可选, 同时发出的检索请求数（默认4）
+    其余参数与 search_memory 相同。子查询并发发送，总耗时约等于最慢的一次检索。
+    部分子查询失败时返回其余子查询的合并结果（不写入缓存）；全部失败时返回第一个错误。
+    """
+    query_list = _split_queries(queries)
+    if not query_list:
+        return "错误：查询内容不能为空"
+
+    cache_key = None
+    if cache_ttl > 0:
+        cache = _get_search_cache()
+        cache_key = _cache_key_prefix(base_url, access_key, user_id) + (
+            "multi", conversation_id, tuple(_normalize_query(q) for q in query_list), memory_limit_number, max_items)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    options = {"connect_timeout": connect_timeout, "read_timeout": read_timeout,
+               "max_retries": max_retries, "http2": http2, "base_url": base_url}
+
+    def run(query: str):
+        try:
+            return _search_request(user_id, query, conversation_id, memory_limit_number, access_key, options), None
+        except Exception as e:
+            return None, e
+
+    workers = max(1, min(len(query_list), max_concurrency))
+    if workers == 1:
+        outcomes = [run(query) for query in query_list]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            outcomes = list(executor.map(run, query_list))
+
+    results = [data for data, error in outcomes if error is None]
+    errors = [error for _, error in outcomes if error is not None]
+    if not results:
+        return _search_error_text(errors[0])
+
+    text = _format_search_result(_merge_search_results(results, max_items))
+    if cache_key is not None and not errors:
+        cache.put(cache_key, text, cache_ttl)
+    return text
+
+
+def search_memory(user_id: str, query: str, conversation_id: str = "", memory_limit_number: int = 6, access_key: str = "",
+                  connect_timeout: float = 5, read_timeout: float = 30, max_retries: int = 2, http2: bool = False,
+                  cache_ttl: float = _SEARCH_CACHE_TTL, sub_queries: str = "", max_items: int = _MULTI_DEFAULT_MAX_ITEMS,
+                  base_url: str = "", return_http_stats: bool = False, return_cache_stats: bool = False):
     """
     MemOS 记忆检索
 
@@ -11,48 +496,51 @@ def search_memory(user_id: str, query: str, conversation_id: str = "", memory_li
     - conversation_id: string, 可选, 会话唯一标识符
     - memory_limit_number: number, 可选, 事实记忆返回条数（默认6，最大25）
     - access_key: string, 必填, API密钥
+    - connect_timeout: number, 可选, 建立连接超时（秒，默认5）
+    - read_timeout: number, 可选, 等待响应超时（秒，默认30）
+    - max_retries: number, 可选, 网络错误、超时或 429/502/503/504 时的最大重试次数（默认2）
+    - http2: boolean, 可选, 是否使用 HTTP/2（需要安装 httpx[http2]，未安装时回退到 HTTP/1.1）
+    - cache_ttl: number, 可选, 检索结果缓存秒数（默认0，不使用缓存），MemOS 记忆添加工具写入该用户的消息后缓存立即失效
+    - sub_queries: string, 可选, 按行分隔的补充子查询，非空时与 query 一起并发检索并合并结果（见 search_memory_multi）
+    - max_items: number, 可选, 使用 sub_queries 时合并结果的总条数上限（默认12）
+    - base_url: string, 可选, MemOS 接口地址（默认取环境变量 MAXKB_MEMOS_BASE_URL，未设置时为官方地址）
+    - return_http_stats: boolean, 可选, 为真时不检索，返回本工具连接池统计的 JSON（同 get_memos_http_stats）
+    - return_cache_stats: boolean, 可选, 为真时不检索，返回检索缓存统计的 JSON（同 get_search_cache_stats）；
+      与 return_http_stats 同时为真时返回 {"http": ..., "cache": ...}
     """
-    http_session = requests.Session()
+    if return_http_stats and return_cache_stats:
+        return json.dumps({"http": get_memos_http_stats(), "cache": get_search_cache_stats()}, ensure_ascii=False)
+    if return_http_stats:
+        return json.dumps(get_memos_http_stats(), ensure_ascii=False)
+    if return_cache_stats:
+        return json.dumps(get_search_cache_stats(), ensure_ascii=False)
+    if sub_queries:
+        return search_memory_multi(
+            user_id, [query] + _split_queries(sub_queries), conversation_id, memory_limit_number, access_key,
+            max_items, connect_timeout=connect_timeout, read_timeout=read_timeout, max_retries=max_retries,
+            http2=http2, cache_ttl=cache_ttl, base_url=base_url
+        )
+
     try:
-        data = {
-            "user_id": user_id,
-            "query": query,
-            "include_preference": True,
-            "memory_limit_number": memory_limit_number
-        }
-        if conversation_id:
-            data["conversation_id"] = conversation_id
-
-        rep = http_session.post(
-            url="https://memos.memtensor.cn/api/openmem/v1/search/memory",
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": f"Token {access_key}"
-            },
-            json=data
-        ).json()
-
-        if rep.get("code") == 0:
-            result_parts = []
-            memory_list = rep.get("data", {}).get("memory_detail_list", [])
-            preference_list = rep.get("data", {}).get("preference_detail_list", [])
-
-            if memory_list:
-                result_parts.append("【事实记忆】")
-                for mem in memory_list:
-                    result_parts.append(f"- {mem.get('memory_key', '')}: {mem.get('memory_value', '')}")
-
-            if preference_list:
-                result_parts.append("【偏好记忆】")
-                for pref in preference_list:
-                    result_parts.append(f"- {pref.get('preference', '')}")
-
-            if result_parts:
-                return "\n".join(result_parts)
-            else:
-                return "未找到相关记忆"
-        else:
-            return f"错误：记忆检索失败：{rep.get('message', '未知错误')}"
+        cache_key = None
+        if cache_ttl > 0:
+            cache = _get_search_cache()
+            cache_key = _cache_key_prefix(base_url, access_key, user_id) + (
+                conversation_id, _normalize_query(query), memory_limit_number)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        text = _format_search_result(_search_request(
+            user_id, query, conversation_id, memory_limit_number, access_key,
+            {"connect_timeout": connect_timeout, "read_timeout": read_timeout, "max_retries": max_retries, "http2": http2,
+             "base_url": base_url}
+        ))
+        if cache_key is not None:
+            cache.put(cache_key, text, cache_ttl)
+        return text
+    except _MemosSearchError as e:
+        return f"错误：记忆检索失败：{e}"
     except requests.exceptions.RequestException as e:
         return f"错误：记忆检索时发生网络错误: {e}"
     except Exception as e:
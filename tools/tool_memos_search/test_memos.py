@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+MemOS 记忆添加 / 记忆检索工具测试脚本
+
+在本地启动 MemOS 替身服务（memos_standin_server.py）后运行，不访问网络，结果可重复。
+可以直接 python3 运行，也可以用 pytest 运行。
+需要验证线上服务时，设置环境变量 MEMOS_LIVE_ACCESS_KEY 为 MemOS 的 access_key。
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+TOOL_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(TOOL_DIR), 'tool_memos_add'))
+sys.path.insert(0, TOOL_DIR)
+sys.path.insert(0, os.path.dirname(TOOL_DIR))
+
+import add_message as memos_add  # noqa: E402
+import search_memory as memos_search  # noqa: E402
+from add_message import add_message, flush_message_queue  # noqa: E402
+from search_memory import (search_memory, get_memos_http_stats, close_memos_http_client,  # noqa: E402
+                           clear_search_cache, get_search_cache_stats)
+from memos_standin_server import start_server  # noqa: E402
+from testkit import check, fixture, run_tests, skip  # noqa: E402
+
+ACCESS_KEY = "standin-key"
+
+
+@fixture()
+def standin():
+    server, base_url = start_server(access_key=ACCESS_KEY)
+    print(f"替身服务：{base_url}\n")
+    yield server, base_url
+    close_memos_http_client()
+    memos_add.close_memos_http_client()
+    server.shutdown()
+
+
+@fixture()
+def server(standin):
+    return standin[0]
+
+
+@fixture()
+def base_url(standin):
+    return standin[1]
+
+
+@fixture()
+def access_key():
+    if not os.environ.get("MEMOS_LIVE_ACCESS_KEY"):
+        skip("未设置 MEMOS_LIVE_ACCESS_KEY")
+    return os.environ["MEMOS_LIVE_ACCESS_KEY"]
+
+
+def test_add_and_search(server, base_url):
+    """添加后检索"""
+    result = add_message("u1", "c1", "我喜欢喝乌龙茶", "好的，记住了", access_key=ACCESS_KEY, base_url=base_url)
+    check("添加成功", result.startswith("信息：消息添加成功"), result)
+    result = search_memory("u1", "乌龙茶", access_key=ACCESS_KEY, base_url=base_url, cache_ttl=0)
+    check("检索到事实记忆", "【事实记忆】" in result and "乌龙茶" in result, result.replace("\n", " | "))
+    check("检索到偏好记忆", "【偏好记忆】\n- 我喜欢喝乌龙茶" in result)
+    result = search_memory("u-nobody", "乌龙茶", access_key=ACCESS_KEY, base_url=base_url, cache_ttl=0)
+    check("其他用户无结果", result == "未找到相关记忆", result)
+    result = search_memory("u1", "乌龙茶", access_key="wrong-key", base_url=base_url, cache_ttl=0)
+    check("access_key 错误时返回业务错误", result.startswith("错误："), result)
+
+
+def test_endpoint_from_env(server, base_url):
+    """环境变量 MAXKB_MEMOS_BASE_URL"""
+    os.environ["MAXKB_MEMOS_BASE_URL"] = base_url + "/"
+    try:
+        before = server.state.stats().get("add_message", 0)
+        result = add_message("u2", "c1", "hello env", "", access_key=ACCESS_KEY)
+        check("未传 base_url 时使用环境变量", result.startswith("信息：消息添加成功"), result)
+        check("请求到达替身服务", server.state.stats().get("add_message", 0) == before + 1)
+    finally:
+        del os.environ["MAXKB_MEMOS_BASE_URL"]
+
+
+def test_connection_reuse(server, base_url):
+    """连接复用"""
+    close_memos_http_client()
+    memos_add.close_memos_http_client()
+    server.state.stats(reset=True)
+    for i in range(10):
+        search_memory("u1", f"乌龙茶 {i}", access_key=ACCESS_KEY, base_url=base_url, cache_ttl=0)
+        add_message("u3", "c1", f"message {i}", "", access_key=ACCESS_KEY, base_url=base_url)
+    connections = server.state.stats()["connections"]
+    check("20 次调用只建立 2 个连接（每个工具各一个）", connections == 2, connections)
+    stats = json.loads(search_memory("", "", return_http_stats=True))
+    check("入口返回检索工具统计", stats["responses"] == 10 and stats["connections_opened"] == 1, stats)
+    stats = json.loads(add_message("", "", "", "", return_http_stats=True))
+    check("入口返回添加工具统计", stats["responses"] == 10 and stats["connections_opened"] == 1, stats)
+    check("检索工具统计一致", get_memos_http_stats(reset=True)["connections_opened"] == 1)
+    check("添加工具统计一致", memos_add.get_memos_http_stats(reset=True)["connections_opened"] == 1)
+
+
+def test_search_cache(server, base_url):
+    """检索缓存与写入后失效"""
+    clear_search_cache()
+    server.state.stats(reset=True)
+    search_memory("u4", "咖啡", access_key=ACCESS_KEY, base_url=base_url)
+    search_memory("u4", "咖啡", access_key=ACCESS_KEY, base_url=base_url)
+    check("默认不使用缓存", server.state.stats(reset=True)["search_memory"] == 2
+          and get_search_cache_stats(reset=True)["entries"] == 0)
+    first = search_memory("u4", "咖啡", access_key=ACCESS_KEY, base_url=base_url, cache_ttl=60)
+    second = search_memory("u4", " 咖啡？", access_key=ACCESS_KEY, base_url=base_url, cache_ttl=60)
+    check("相同查询命中缓存", first == second and server.state.stats()["search_memory"] == 1)
+    search_memory("u4b", "咖啡", access_key=ACCESS_KEY, base_url=base_url, cache_ttl=60)
+    keys = list(memos_search._get_search_cache().entries)
+    check("缓存键不含明文 access_key", keys and all(ACCESS_KEY not in repr(key) for key in keys), keys)
+
+    add_message("u4", "c1", "我喜欢咖啡", "", access_key=ACCESS_KEY, base_url=base_url)
+    third = search_memory("u4", "咖啡", access_key=ACCESS_KEY, base_url=base_url, cache_ttl=60)
+    check("写入后立即检索到新记忆", "我喜欢咖啡" in third and server.state.stats()["search_memory"] == 3,
+          third.replace("\n", " | "))
+    search_memory("u4b", "咖啡", access_key=ACCESS_KEY, base_url=base_url, cache_ttl=60)
+    check("其他用户的缓存不受影响", server.state.stats()["search_memory"] == 3)
+
+    add_message("u4", "c1", "也喜欢拿铁", "", access_key=ACCESS_KEY, base_url=base_url, write_behind=True,
+                flush_interval=0, journal_dir="")
+    check("异步写入提交完成", flush_message_queue(timeout=10))
+    search_memory("u4", "咖啡", access_key=ACCESS_KEY, base_url=base_url, cache_ttl=60)
+    check("异步写入后同样失效", server.state.stats()["search_memory"] == 4, server.state.stats()["search_memory"])
+    stats = json.loads(search_memory("", "", return_cache_stats=True))
+    check("入口返回缓存统计", stats["hits"] == 2 and stats["stale"] == 2 and stats["entries"] == 2, stats)
+    check("缓存统计一致", get_search_cache_stats(reset=True)["hits"] == 2)
+
+
+def test_write_behind(server, base_url):
+    """异步批量写入"""
+    journal_dir = tempfile.mkdtemp(prefix="memos_journal_")
+    try:
+        server.state.stats(reset=True)
+        handles = []
+        for i in range(5):
+            result = add_message("u5", "c1", f"第 {i} 轮提问", f"第 {i} 轮回答", access_key=ACCESS_KEY,
+                                 base_url=base_url, write_behind=True, flush_interval=5, journal_dir=journal_dir)
+            check(f"第 {i} 轮立即返回句柄", result.startswith("信息：消息已加入写入队列") and "句柄: " in result, result)
+            handles.append(result.rsplit("句柄: ", 1)[1])
+        start = time.perf_counter()
+        result = add_message("", "", "", "", access_key=ACCESS_KEY, flush_handle=handles[0], read_timeout=3)
+        check("句柄解析为任务ID且无需等待 flush_interval",
+              result.startswith("信息：消息添加成功，任务ID: ") and time.perf_counter() - start < 3, result)
+        result = add_message("", "", "", "", access_key=ACCESS_KEY, flush_handle=handles[4])
+        check("同一批次的句柄共享任务ID", result.startswith("信息：消息添加成功") and result.endswith(
+            add_message("", "", "", "", access_key=ACCESS_KEY, flush_handle=handles[0]).rsplit(" ", 1)[1]), result)
+        result = add_message("", "", "", "", access_key=ACCESS_KEY, flush_handle="unknown")
+        check("未知句柄返回错误", result.startswith("错误：未找到写入句柄"), result)
+        check("全部提交完成", flush_message_queue(timeout=10))
+        stats = server.state.stats()
+        check("5 轮合并为 1 次请求", stats.get("add_message") == 1 and stats.get("messages") == 10, stats)
+        stored = [m["content"] for m in server.state.memories["u5"]]
+        check("保持对话顺序", stored[:3] == ["第 0 轮提问", "第 0 轮回答", "第 1 轮提问"], stored[:3])
+
+        # 重试耗尽的消息留在日志中，同一密钥的下一次调用时重新提交
+        server.state.fail_next(3)
+        result = add_message("u5b", "c1", "先写入的消息", "", access_key=ACCESS_KEY, base_url=base_url,
+                             write_behind=True, flush_interval=0.05, max_retries=0, journal_dir=journal_dir)
+        handle = result.rsplit("句柄: ", 1)[1]
+        result = add_message("", "", "", "", access_key=ACCESS_KEY, flush_handle=handle, read_timeout=5)
+        check("重试耗尽时句柄返回网络错误", result.startswith("错误：添加消息时发生网络错误"), result)
+        add_message("u5b", "c1", "后写入的消息", "", access_key=ACCESS_KEY, base_url=base_url,
+                    write_behind=True, flush_interval=0.05, journal_dir=journal_dir)
+        check("重新提交完成", flush_message_queue(timeout=10))
+        stored = [m["content"] for m in server.state.memories.get("u5b", [])]
+        check("进程内重新提交且保持顺序", stored == ["先写入的消息", "后写入的消息"], stored)
+    finally:
+        shutil.rmtree(journal_dir, ignore_errors=True)
+
+
+def test_write_behind_ordering(server, base_url):
+    """重试耗尽时的写入顺序"""
+    # 不落盘：重试耗尽的批次挂起在内存中，同一会话之后的消息不会越过它先提交
+    options = dict(access_key=ACCESS_KEY, base_url=base_url, write_behind=True, flush_interval=0.05,
+                   max_retries=0, journal_dir="")
+    before = server.state.stats().get("add_message", 0)
+    server.state.fail_next(3)
+    server.state.latency_ms = 200
+    try:
+        result = add_message("u5c", "c1", "第一条", "", **options)
+        first = result.rsplit("句柄: ", 1)[1]
+        deadline = time.monotonic() + 5
+        # 第 3 次（最后一次）提交发出后、失败返回前写入第二条
+        while server.state.stats().get("add_message", 0) < before + 3 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        add_message("u5c", "c1", "第二条", "", **options)
+        result = add_message("", "", "", "", access_key=ACCESS_KEY, flush_handle=first, read_timeout=5)
+        check("第一条重试耗尽后句柄返回网络错误", result.startswith("错误：添加消息时发生网络错误"), result)
+        time.sleep(0.4)
+    finally:
+        server.state.latency_ms = 0
+    check("第二条不越过挂起的第一条提交", not server.state.memories.get("u5c"), server.state.memories.get("u5c"))
+    add_message("u5c", "c1", "第三条", "", **options)
+    check("挂起的批次重新提交完成", flush_message_queue(timeout=10))
+    stored = [m["content"] for m in server.state.memories.get("u5c", [])]
+    check("未落盘的消息也不丢失且保持顺序", stored == ["第一条", "第二条", "第三条"], stored)
+
+
+def test_multi_query(server, base_url):
+    """多查询并发检索"""
+    add_message("u6", "c1", "我喜欢爬山", "", access_key=ACCESS_KEY, base_url=base_url)
+    add_message("u6", "c1", "住在杭州", "", access_key=ACCESS_KEY, base_url=base_url)
+    server.state.stats(reset=True)
+    result = search_memory("u6", "", sub_queries="爬山\n杭州\n爬山", access_key=ACCESS_KEY, base_url=base_url,
+                           cache_ttl=0)
+    check("子查询去重后并发发送", server.state.stats()["search_memory"] == 2, server.state.stats())
+    check("合并两个子查询的结果", "我喜欢爬山" in result and "住在杭州" in result, result.replace("\n", " | "))
+
+    clear_search_cache()
+    forward = search_memory("u6", "爬山", sub_queries="杭州", access_key=ACCESS_KEY, base_url=base_url, cache_ttl=60)
+    backward = search_memory("u6", "杭州", sub_queries="爬山", access_key=ACCESS_KEY, base_url=base_url, cache_ttl=60)
+    check("子查询顺序不同时分别缓存", forward != backward and backward == search_memory(
+        "u6", "杭州", sub_queries="爬山", access_key=ACCESS_KEY, base_url=base_url, cache_ttl=0),
+        backward.replace("\n", " | "))
+    clear_search_cache()
+
+
+def test_retry_and_timeout(server, base_url):
+    """503 重试与超时"""
+    server.state.fail_next(1)
+    result = search_memory("u1", "乌龙茶", access_key=ACCESS_KEY, base_url=base_url, cache_ttl=0)
+    check("503 后重试成功", "乌龙茶" in result, result.replace("\n", " | "))
+    server.state.fail_next(2)
+    result = add_message("u7", "c1", "hi", "", access_key=ACCESS_KEY, base_url=base_url, max_retries=1)
+    check("持续 503 时返回网络错误", result.startswith("错误：添加消息时发生网络错误"), result)
+    server.state.fail_next(0)
+
+    server.state.latency_ms = 500
+    try:
+        start = time.perf_counter()
+        result = search_memory("u1", "乌龙茶", access_key=ACCESS_KEY, base_url=base_url, cache_ttl=0,
+                               read_timeout=0.1, max_retries=0)
+        elapsed = time.perf_counter() - start
+        check("读超时返回错误", result.startswith("错误："), result)
+        check("按 read_timeout 及时返回", elapsed < 0.4, f"{elapsed:.2f}s")
+    finally:
+        server.state.latency_ms = 0
+
+
+def test_live_service(access_key):
+    """线上服务"""
+    result = search_memory("maxkb-test", "测试", access_key=access_key, cache_ttl=0)
+    check("线上检索成功", not result.startswith("错误："), result)
+
+
+if __name__ == "__main__":
+    run_tests("MemOS 工具测试", [
+        test_add_and_search, test_endpoint_from_env, test_connection_reuse, test_search_cache, test_write_behind,
+        test_write_behind_ordering, test_multi_query, test_retry_and_timeout, test_live_service
+    ])
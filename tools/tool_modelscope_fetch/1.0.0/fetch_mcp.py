@@ -1,9 +1,19 @@
 """
 MaxKB Tools - ModelScope Fetch MCP 客户端（精简版）
 专为 MaxKB sandbox 设计，通过 HTTP 调用 ModelScope 云端 MCP 服务
+同一进程内复用已握手的 MCP 会话与 keep-alive 连接，会话过期时自动重新握手
+可选返回各阶段耗时明细，并在进程内汇总 p50/p95/p99 指标（metrics_action="metrics" 或 get_fetch_metrics）
+传入 urls 时批量抓取多个 URL，共用一个 MCP 会话并发请求；long_document=True 时分段并发读取长文档
 
 外部参数:
     url: str - 要抓取的网页 URL
+    urls: str/list - 批量抓取的 URL 列表或按行分隔的 URL（可选，提供时忽略 url）
+    max_concurrency: int - 批量抓取的并发数（可选，默认 4，最大 32）
+    per_host_rate: float - 批量抓取时每个目标域名每秒最多请求数（可选，默认 0 不限速）
+    long_document: bool - 长文档模式，按 max_length 分段并发抓取后拼接（可选，默认 False）
+    max_chunks: int - 长文档模式最多读取的段数（可选，默认 20）
+    return_chunks: bool - 长文档模式下返回按顺序排列的分段列表而不拼接（可选，默认 False）
+    metrics_action: str - 不抓取，改为执行管理操作：metrics / reset_metrics / clear_cache / clear_sessions（可选）
     custom_name: str - 自定义文档名称（可选）
     max_length: int - 最大字符数限制（可选，默认 10000）
     ignore_robots: bool - 是否忽略 robots.txt（可选，默认 True）
@@ -21,171 +31,1373 @@ MaxKB Tools - ModelScope Fetch MCP 客户端（精简版）
         "document_name": str,
         "content": str,  # Markdown 内容
         "content_length": int,
-        "source_url": str
+        "source_url": str,
+        "ttfb_ms": float  # tools/call 发出到收到响应头的耗时
     }
 """
+from __future__ import annotations
+
 
 import requests
-from typing import Dict, Any, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, List, Tuple, Iterator, Callable
+from collections import OrderedDict, deque
+from urllib.parse import urlparse, urlsplit, urlunsplit, parse_qsl, urlencode
+import hashlib
+import itertools
+import json
+import os
 import re
+import threading
+import time
 
 
-def fetch_mcp_server(
+# ========== 分阶段计时 ==========
+# 每次抓取在当前线程上记录各阶段耗时：initialize、notification、tool_call、parse。
+# 连接建立耗时通过自定义 urllib3 连接类记录：connect_ms 为 DNS 解析 + TCP 建连，
+# tls_ms 为 TLS 握手；复用 keep-alive 连接时两者为 0。
+_TIMING = threading.local()
+_METRICS_MAX_SAMPLES = 2048
+_METRICS_PERCENTILES = (50, 95, 99)
+
+
+@contextmanager
+def _timed_phase(name: str, network: bool = True) -> Iterator[Optional[Dict[str, float]]]:
+    """在当前抓取的计时记录中累加一个阶段的耗时；未开始计时时什么也不做"""
+    phases = getattr(_TIMING, "phases", None)
+    if phases is None:
+        yield None
+        return
+    entry = phases.setdefault(name, {"connect_ms": 0.0, "tls_ms": 0.0, "total_ms": 0.0} if network else {"total_ms": 0.0})
+    previous = getattr(_TIMING, "current", None)
+    _TIMING.current = entry
+    start = time.perf_counter()
+    try:
+        yield entry
+    finally:
+        entry["total_ms"] += (time.perf_counter() - start) * 1000
+        _TIMING.current = previous
+
+
+def _record_connect(key: str, start: float) -> None:
+    entry = getattr(_TIMING, "current", None)
+    if entry is not None:
+        entry[key] = entry.get(key, 0.0) + (time.perf_counter() - start) * 1000
+
+
+class _ConnectTimingMixin:
+    """记录新建连接的耗时，connect() 的总耗时减去 _new_conn() 即为 TLS 握手耗时"""
+
+    def _new_conn(self):
+        start = time.perf_counter()
+        try:
+            return super()._new_conn()
+        finally:
+            _record_connect("connect_ms", start)
+
+    def connect(self):
+        entry = getattr(_TIMING, "current", None)
+        connect_before = entry.get("connect_ms", 0.0) if entry is not None else 0.0
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            if entry is not None:
+                setup_ms = (time.perf_counter() - start) * 1000
+                entry["tls_ms"] += max(0.0, setup_ms - (entry.get("connect_ms", 0.0) - connect_before))
+
+
+class _TimedHTTPConnection(_ConnectTimingMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_ConnectTimingMixin, HTTPSConnection):
+    pass
+
+
+# MaxKB 以 exec(code, globals, locals) 执行工具代码，类体内看不到同级定义的名字，因此在模块层用 type() 创建连接池类
+_TimedHTTPConnectionPool = type("_TimedHTTPConnectionPool", (HTTPConnectionPool,), {"ConnectionCls": _TimedHTTPConnection})
+_TimedHTTPSConnectionPool = type("_TimedHTTPSConnectionPool", (HTTPSConnectionPool,),
+                                 {"ConnectionCls": _TimedHTTPSConnection})
+
+
+class _TimedHTTPAdapter(HTTPAdapter):
+    """使用可计时连接类的 HTTPAdapter"""
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool
+        }
+
+
+def _start_timing() -> float:
+    _TIMING.phases = {}
+    _TIMING.current = None
+    return time.perf_counter()
+
+
+def _finish_timing(
+    start: float,
     url: str,
-    custom_name: str = "",
-    max_length: int = 10000,
-    ignore_robots: bool = True,
-    mcp_server_url: str = "https://mcp.api-inference.modelscope.net/b13c348780054e/mcp",
-    api_key: str = "",
-    protocol_version: str = "2024-11-05",
-    client_name: str = "maxkb",
-    client_version: str = "1.0",
-    timeout_init: int = 30,
-    timeout_call: int = 60
+    result: Dict[str, Any],
+    return_timing: bool,
+    metrics_callback: Optional[Callable[[Dict[str, Any]], None]]
 ) -> Dict[str, Any]:
+    """结束本次计时：写入指标注册表、调用 metrics_callback，按需把明细放入结果"""
+    phases = getattr(_TIMING, "phases", None) or {}
+    _TIMING.phases = None
+    _TIMING.current = None
+    timing = {
+        "url": url,
+        "domain": urlparse(url).netloc.lower(),
+        "success": bool(result.get("success")),
+        "from_cache": bool(result.get("from_cache")),
+        "total_ms": round((time.perf_counter() - start) * 1000, 3),
+        "phases": {name: {k: round(v, 3) if isinstance(v, float) else v for k, v in entry.items()}
+                   for name, entry in phases.items()}
+    }
+    _fetch_metrics().observe(timing)
+    if metrics_callback is not None:
+        try:
+            metrics_callback(timing)
+        except Exception:
+            # 指标回调出错不影响抓取结果
+            pass
+    if return_timing:
+        result["timing"] = timing
+    return result
+
+
+class _FetchMetrics:
     """
-    获取网页内容并转换为 Markdown
-    
-    Args:
-        url: 目标网页 URL
-        custom_name: 自定义文档名称
-        max_length: 最大字符数限制
-        ignore_robots: 是否忽略 robots.txt 限制
-        mcp_server_url: ModelScope MCP 服务器 URL
-        api_key: API 密钥（如果需要认证）
-        protocol_version: MCP 协议版本
-        client_name: 客户端名称
-        client_version: 客户端版本
-        timeout_init: Initialize 超时时间（秒）
-        timeout_call: Tool Call 超时时间（秒）
-        
-    Returns:
-        包含 Markdown 内容的字典
+    进程内抓取指标：计数器 + 按 阶段/域名 保存最近的耗时样本（有界），用于计算 p50/p95/p99
     """
-    
-    # ModelScope MCP Server 配置（可通过参数自定义）
-    server_url = mcp_server_url
-    
-    try:
-        # 步骤 1: Initialize
-        session = requests.Session()
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, str], int] = {}
+        self._samples: Dict[Tuple[str, str], deque] = {}
+
+    def _add_sample(self, phase: str, domain: str, value: float) -> None:
+        samples = self._samples.get((phase, domain))
+        if samples is None:
+            samples = self._samples[(phase, domain)] = deque(maxlen=_METRICS_MAX_SAMPLES)
+        samples.append(value)
+
+    def observe(self, timing: Dict[str, Any]) -> None:
+        domain = timing["domain"]
+        outcome = "cache_hit" if timing["from_cache"] else ("success" if timing["success"] else "failure")
+        with self._lock:
+            self._counters[(outcome, domain)] = self._counters.get((outcome, domain), 0) + 1
+            self._add_sample("total", domain, timing["total_ms"])
+            for phase, entry in timing["phases"].items():
+                self._add_sample(phase, domain, entry["total_ms"])
+                if "ttfb_ms" in entry:
+                    self._add_sample(f"{phase}.ttfb", domain, entry["ttfb_ms"])
+
+    def snapshot(self, reset: bool = False) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            samples = {key: list(values) for key, values in self._samples.items()}
+            if reset:
+                self._counters.clear()
+                self._samples.clear()
+        domains: Dict[str, Any] = {}
+        for (outcome, domain), count in counters.items():
+            domains.setdefault(domain, {"counters": {}, "phases": {}})["counters"][outcome] = count
+        for (phase, domain), values in samples.items():
+            values.sort()
+            stats = {"count": len(values)}
+            for pct in _METRICS_PERCENTILES:
+                stats[f"p{pct}_ms"] = round(values[min(len(values) - 1, int(len(values) * pct / 100))], 3)
+            domains.setdefault(domain, {"counters": {}, "phases": {}})["phases"][phase] = stats
+        return {"domains": domains}
+
+
+_FETCH_METRICS: Optional[_FetchMetrics] = None
+_FETCH_METRICS_LOCK = threading.Lock()
+
+
+def _fetch_metrics() -> _FetchMetrics:
+    # 首次使用时创建：MaxKB 以 exec(code, globals, locals) 加载代码，加载期间模块级名字尚未进入 globals
+    global _FETCH_METRICS
+    with _FETCH_METRICS_LOCK:
+        if _FETCH_METRICS is None:
+            _FETCH_METRICS = _FetchMetrics()
+        return _FETCH_METRICS
+
+
+def get_fetch_metrics(reset: bool = False) -> Dict[str, Any]:
+    """
+    返回进程内抓取指标
+
+    返回:
+        {"domains": {"example.com": {"counters": {"success": 10, "failure": 1, "cache_hit": 3},
+                                     "phases": {"tool_call": {"count": 11, "p50_ms": ..., "p95_ms": ..., "p99_ms": ...}, ...}}}}
+        样本为每个 阶段/域名 最近 2048 次
+    """
+    return _fetch_metrics().snapshot(reset)
+
+
+def _metrics_admin(action: str, cache_dir: str) -> Dict[str, Any]:
+    """执行 fetch_mcp_server 的 metrics_action 管理操作"""
+    if action in ("metrics", "reset_metrics"):
+        return {"success": True, "action": action, "metrics": get_fetch_metrics(reset=action == "reset_metrics")}
+    if action == "clear_cache":
+        return {"success": True, "action": action, "removed": clear_fetch_cache(cache_dir)}
+    if action == "clear_sessions":
+        return {"success": True, "action": action, "closed": clear_mcp_session_pool()}
+    return {"success": False, "error": f"Unknown metrics_action: {action}"}
+
+
+# ========== MCP 会话池 ==========
+# 进程内复用已完成握手的 MCP 会话（mcp-session-id + keep-alive 连接），
+# 按 (mcp_server_url, api_key, protocol_version) 分组，后续抓取只需一次 tools/call 请求
+_SESSION_IDLE_TTL = 300
+_SESSION_POOL_MAX_IDLE = 8
+_SESSION_POOL: Dict[Tuple[str, str, str], List["_McpSession"]] = {}
+_SESSION_POOL_LOCK = threading.Lock()
+
+
+class _McpInitError(Exception):
+    """握手失败，result 为直接返回给调用方的错误字典"""
+
+    def __init__(self, result: Dict[str, Any]):
+        super().__init__(result.get("error"))
+        self.result = result
+
+
+class _McpSession:
+    """
+    一个已初始化的 MCP 会话
+
+    批量抓取时多个线程可在同一会话上并发发送 tools/call，各请求使用不同的 JSON-RPC id，
+    底层连接池按并发数扩容；会话过期时由 reinitialize 在锁内重新握手，只执行一次。
+    """
+
+    def __init__(self, server_url: str, api_key: str, protocol_version: str):
+        self.server_url = server_url
+        self.protocol_version = protocol_version
+        self.http = requests.Session()
+        self.set_max_connections(1)
+        self.headers = {
+            "Content-Type": "application/json",
+            "Accept": "text/event-stream,application/json"
+        }
+        # 如果提供了 API 密钥，添加认证头
+        if api_key:
+            self.headers["Authorization"] = f"Bearer {api_key}"
+        self.session_id = None
+        self.last_used = time.monotonic()
+        # 同一会话内的 JSON-RPC 请求 id 递增且不重复
+        self._ids = itertools.count(1)
+        self._init_lock = threading.Lock()
+
+    def set_max_connections(self, count: int) -> None:
+        """按并发数调整 keep-alive 连接池大小（requests 默认每个主机最多保留 10 个连接）"""
+        adapter = _TimedHTTPAdapter(pool_connections=1, pool_maxsize=max(count, 10))
+        self.http.mount("https://", adapter)
+        self.http.mount("http://", adapter)
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def initialize(self, client_name: str, client_version: str, timeout: int) -> None:
         init_payload = {
             "jsonrpc": "2.0",
-            "id": 1,
+            "id": self.next_id(),
             "method": "initialize",
             "params": {
-                "protocolVersion": protocol_version,
+                "protocolVersion": self.protocol_version,
                 "capabilities": {},
                 "clientInfo": {"name": client_name, "version": client_version}
             }
         }
-        
-        headers = {
-            "Content-Type": "application/json",
-            "Accept": "text/event-stream,application/json"
-        }
-        
-        # 如果提供了 API 密钥，添加认证头
-        if api_key:
-            headers["Authorization"] = f"Bearer {api_key}"
-        
-        response = session.post(server_url, headers=headers, json=init_payload, timeout=timeout_init)
+        with _timed_phase("initialize") as phase:
+            response = self.http.post(self.server_url, headers=self.headers, json=init_payload, timeout=timeout)
+            if phase is not None:
+                phase["ttfb_ms"] = response.elapsed.total_seconds() * 1000
+                phase["bytes"] = len(response.content)
         if response.status_code != 200:
-            return {
+            raise _McpInitError({
                 "success": False,
                 "error": f"Initialize failed: {response.status_code}",
                 "details": response.text[:200]
-            }
+            })
         
         # 获取 Session ID
-        session_id = response.headers.get('mcp-session-id')
-        if not session_id:
-            return {"success": False, "error": "No session-id returned"}
+        self.session_id = response.headers.get('mcp-session-id')
+        if not self.session_id:
+            raise _McpInitError({"success": False, "error": "No session-id returned"})
         
-        # 步骤 2: Initialized notification
+        # Initialized notification
         init_notification = {"jsonrpc": "2.0", "method": "notifications/initialized"}
-        session.post(server_url, headers={**headers, "mcp-session-id": session_id}, 
-                    json=init_notification, timeout=10)
-        
-        # 步骤 3: Call fetch tool
-        fetch_params = {
-            "url": url,
-            "max_length": max_length
-        }
-        
-        if ignore_robots:
-            fetch_params["args"] = ["--ignore-robots-txt"]
-        
+        with _timed_phase("notification") as phase:
+            response = self.http.post(self.server_url, headers=self.session_headers(), json=init_notification, timeout=10)
+            if phase is not None:
+                phase["ttfb_ms"] = response.elapsed.total_seconds() * 1000
+
+    def reinitialize(self, stale_session_id: str, client_name: str, client_version: str, timeout: int) -> None:
+        """会话过期后重新握手；并发调用时只有第一个发现过期的线程真正执行"""
+        with self._init_lock:
+            if self.session_id == stale_session_id:
+                self.initialize(client_name, client_version, timeout)
+
+    def session_headers(self) -> Dict[str, str]:
+        return {**self.headers, "mcp-session-id": self.session_id}
+
+    def call_tool(self, name: str, arguments: Dict[str, Any], timeout: int) -> Tuple[int, requests.Response, float]:
+        """
+        发送 tools/call 并在收到响应头后立即返回 (请求 id, 响应, 首字节耗时毫秒)
+
+        响应体以流式读取，调用方负责关闭响应。
+        """
+        headers = self.session_headers()
+        request_id = self.next_id()
         tool_payload = {
             "jsonrpc": "2.0",
-            "id": 2,
+            "id": request_id,
             "method": "tools/call",
             "params": {
-                "name": "fetch",
-                "arguments": fetch_params
+                "name": name,
+                "arguments": arguments
             }
         }
+        start = time.perf_counter()
+        response = self.http.post(self.server_url, headers=headers, json=tool_payload, timeout=timeout, stream=True)
+        return request_id, response, (time.perf_counter() - start) * 1000
+
+    def close(self) -> None:
+        self.http.close()
+
+
+def _create_session(pool_key: Tuple[str, str, str], client_name: str, client_version: str, timeout: int) -> _McpSession:
+    session = _McpSession(*pool_key)
+    try:
+        session.initialize(client_name, client_version, timeout)
+    except Exception:
+        session.close()
+        raise
+    return session
+
+
+def _acquire_session(
+    pool_key: Tuple[str, str, str],
+    client_name: str,
+    client_version: str,
+    timeout: int
+) -> _McpSession:
+    """取出一个空闲会话，没有则新建并握手；空闲超时的会话直接关闭"""
+    now = time.monotonic()
+    expired = []
+    session = None
+    with _SESSION_POOL_LOCK:
+        idle = _SESSION_POOL.get(pool_key, [])
+        while idle:
+            candidate = idle.pop()
+            if now - candidate.last_used <= _SESSION_IDLE_TTL:
+                session = candidate
+                break
+            expired.append(candidate)
+    for candidate in expired:
+        candidate.close()
+    if session is not None:
+        return session
+    return _create_session(pool_key, client_name, client_version, timeout)
+
+
+def _release_session(pool_key: Tuple[str, str, str], session: _McpSession) -> None:
+    session.last_used = time.monotonic()
+    with _SESSION_POOL_LOCK:
+        idle = _SESSION_POOL.setdefault(pool_key, [])
+        if len(idle) < _SESSION_POOL_MAX_IDLE:
+            idle.append(session)
+            return
+    session.close()
+
+
+def _is_session_expired(response: requests.Response) -> bool:
+    """MCP 规范要求服务端对失效的 mcp-session-id 返回 404，部分实现返回 400 并提示 session"""
+    if response.status_code == 404:
+        return True
+    return response.status_code == 400 and "session" in response.text.lower()
+
+
+# ========== 流式读取响应 ==========
+_RESPONSE_CHUNK_SIZE = 8192
+# JSON 转义后一个字符最多占 6 字节（\uXXXX），另留 64 KiB 给标题、截断提示等字段
+_RESPONSE_BYTES_PER_CHAR = 6
+_RESPONSE_BYTES_SLACK = 64 * 1024
+
+
+class _ResponseTooLarge(Exception):
+    """响应体超过 max_length 对应的读取上限，partial 为停止读取前已缓冲的字节"""
+
+    def __init__(self, message: str, partial: bytes):
+        super().__init__(message)
+        self.partial = partial
+
+
+def _response_byte_limit(max_length: int) -> int:
+    return max(int(max_length or 0), 0) * _RESPONSE_BYTES_PER_CHAR + _RESPONSE_BYTES_SLACK
+
+
+def _iter_response_lines(response: requests.Response, byte_limit: int) -> Iterator[bytes]:
+    """按行读取响应体，单行超过 byte_limit 时停止读取，保证缓冲区有界"""
+    pending = bytearray()
+    for chunk in response.iter_content(chunk_size=_RESPONSE_CHUNK_SIZE):
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end < 0:
+                pending += chunk[start:]
+                break
+            pending += chunk[start:end]
+            yield bytes(pending).rstrip(b"\r")
+            pending = bytearray()
+            start = end + 1
+        if len(pending) > byte_limit:
+            raise _ResponseTooLarge(f"Response line exceeds {byte_limit} bytes", bytes(pending))
+    if pending:
+        yield bytes(pending).rstrip(b"\r")
+
+
+def _iter_sse_events(response: requests.Response, byte_limit: int) -> Iterator[str]:
+    """增量解析 text/event-stream，逐个产出事件的 data（多行 data 以换行拼接）"""
+    data_lines: List[bytes] = []
+    size = 0
+    for line in _iter_response_lines(response, byte_limit):
+        if not line:
+            # 空行表示一个事件结束
+            if data_lines:
+                yield b"\n".join(data_lines).decode("utf-8")
+            data_lines, size = [], 0
+            continue
+        if line.startswith(b":"):
+            continue
+        field, _, value = line.partition(b":")
+        if field != b"data":
+            continue
+        if value.startswith(b" "):
+            value = value[1:]
+        size += len(value)
+        data_lines.append(value)
+        if size > byte_limit:
+            raise _ResponseTooLarge(f"SSE event exceeds {byte_limit} bytes", b"\n".join(data_lines))
+    if data_lines:
+        yield b"\n".join(data_lines).decode("utf-8")
+
+
+def _read_rpc_response(response: requests.Response, request_id: int, byte_limit: int) -> Dict[str, Any]:
+    """
+    从 tools/call 响应中读取与 request_id 对应的 JSON-RPC 消息
+
+    SSE 响应逐个事件解析，跳过进度通知等其他消息，找到结果后立即停止读取；
+    JSON 响应按块读取，超过 byte_limit 时停止。
+    """
+    content_type = response.headers.get("Content-Type", "")
+    if "text/event-stream" in content_type:
+        for data in _iter_sse_events(response, byte_limit):
+            try:
+                message = json.loads(data)
+            except ValueError:
+                continue
+            for item in (message if isinstance(message, list) else [message]):
+                if isinstance(item, dict) and item.get("id") == request_id and ("result" in item or "error" in item):
+                    return item
+        raise ValueError(f"SSE stream ended without a response for request id {request_id}")
+
+    body = bytearray()
+    for chunk in response.iter_content(chunk_size=_RESPONSE_CHUNK_SIZE):
+        body += chunk
+        if len(body) > byte_limit:
+            raise _ResponseTooLarge(f"Response body exceeds {byte_limit} bytes", bytes(body))
+    return json.loads(body.decode("utf-8"))
+
+
+# 已缓冲的 JSON 中第一个 "text" 字段的起始位置，以及其后可完整解码的字符串前缀
+_PARTIAL_TEXT_FIELD = re.compile(rb'"text"\s*:\s*"')
+_PARTIAL_JSON_STRING = re.compile(r'(?:[^"\\]|\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4}))*')
+
+
+def _truncated_rpc_message(partial: bytes, request_id: int, max_length: int, start_index: int) -> Dict[str, Any]:
+    """
+    服务端未遵守 max_length、响应超过读取上限时，从已缓冲的部分响应中取出正文前 max_length 个字符，
+    附加与 fetch 工具相同的截断提示，构造成正常的 tools/call 结果
+    """
+    match = _PARTIAL_TEXT_FIELD.search(partial)
+    if not match:
+        return {"id": request_id, "error": {"message": "Response exceeds max_length limit"}}
+    raw = partial[match.end():].decode("utf-8", "ignore")
+    text = json.loads('"' + _PARTIAL_JSON_STRING.match(raw).group(0) + '"')
+    prefix = _CONTENTS_PREFIX.match(text)
+    prefix = prefix.group(0) if prefix else ""
+    body = text[len(prefix):len(prefix) + max(int(max_length or 0), 0)]
+    text = prefix + body + _TRUNCATION_MARKER.format(int(start_index or 0) + len(body))
+    return {"id": request_id, "result": {"content": [{"type": "text", "text": text}]}}
+
+
+def clear_mcp_session_pool() -> int:
+    """关闭并清空会话池，返回关闭的会话数"""
+    with _SESSION_POOL_LOCK:
+        sessions = [s for idle in _SESSION_POOL.values() for s in idle]
+        _SESSION_POOL.clear()
+    for session in sessions:
+        session.close()
+    return len(sessions)
+
+
+# ========== 磁盘缓存 ==========
+# 以「规范化 URL + max_length + ignore_robots」的 sha256 作为文件名保存抓取结果，
+# 写入先落临时文件再原子替换，多个沙箱进程可共用同一目录；文件 mtime 记录最近使用时间，
+# 总大小超过上限时按最近最少使用淘汰。进程内另有一层以 (inode, 大小) 校验的内存副本，
+# 命中时只需一次 stat。
+# 每个缓存目录的总大小在进程内累计估算：首次写入时扫描一次目录，之后每次写入只加上文件大小的变化，
+# 估算值超过上限时才重新扫描目录并淘汰，扫描结果同时校正估算值（其他进程的写入在下次扫描时计入）。
+_CACHE_DIR_ENV = "MAXKB_FETCH_CACHE_DIR"
+_CACHE_DEFAULT_TTL = 3600
+_CACHE_DEFAULT_MAX_MB = 256
+_CACHE_MEMORY_ENTRIES = 256
+_CACHE_MEMORY: "OrderedDict[str, Tuple[Tuple[int, int], Dict[str, Any]]]" = OrderedDict()
+_CACHE_MEMORY_LOCK = threading.Lock()
+_CACHE_SIZE_ESTIMATES: Dict[str, int] = {}
+_CACHE_SIZE_LOCK = threading.Lock()
+
+
+def _normalize_url(url: str) -> str:
+    """规范化 URL：协议与域名小写、去掉默认端口和片段、查询参数排序"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and not ((scheme == "http" and parts.port == 80) or (scheme == "https" and parts.port == 443)):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+
+def _cache_key(url: str, max_length: int, ignore_robots: bool, start_index: int = 0) -> str:
+    raw = json.dumps([_normalize_url(url), int(max_length), bool(ignore_robots), int(start_index or 0)])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _cache_path(cache_dir: str, key: str) -> str:
+    return os.path.join(cache_dir, key[:2], f"{key}.json")
+
+
+def _cache_get(cache_dir: str, key: str) -> Optional[Dict[str, Any]]:
+    """读取未过期的缓存条目，并把文件 mtime 更新为当前时间（LRU）"""
+    path = _cache_path(cache_dir, key)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    signature = (stat.st_ino, stat.st_size)
+    with _CACHE_MEMORY_LOCK:
+        cached = _CACHE_MEMORY.get(key)
+        if cached and cached[0] == signature:
+            _CACHE_MEMORY.move_to_end(key)
+            entry = cached[1]
+        else:
+            entry = None
+    if entry is None:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        _cache_remember(key, signature, entry)
+    if entry.get("expires_at", 0) < time.time():
+        _cache_remove(path, key)
+        return None
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return entry
+
+
+def _cache_remember(key: str, signature: Tuple[int, int], entry: Dict[str, Any]) -> None:
+    with _CACHE_MEMORY_LOCK:
+        _CACHE_MEMORY[key] = (signature, entry)
+        _CACHE_MEMORY.move_to_end(key)
+        while len(_CACHE_MEMORY) > _CACHE_MEMORY_ENTRIES:
+            _CACHE_MEMORY.popitem(last=False)
+
+
+def _cache_remove(path: str, key: str) -> None:
+    with _CACHE_MEMORY_LOCK:
+        _CACHE_MEMORY.pop(key, None)
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _cache_put(cache_dir: str, key: str, entry: Dict[str, Any], max_bytes: int) -> None:
+    path = _cache_path(cache_dir, key)
+    try:
+        previous_size = os.stat(path).st_size
+    except OSError:
+        previous_size = 0
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        stat = os.stat(path)
+    except OSError:
+        return
+    _cache_remember(key, (stat.st_ino, stat.st_size), entry)
+    with _CACHE_SIZE_LOCK:
+        total = _CACHE_SIZE_ESTIMATES.get(cache_dir)
+        if total is not None:
+            total += stat.st_size - previous_size
+            _CACHE_SIZE_ESTIMATES[cache_dir] = total
+    if total is None or total > max_bytes:
+        total = _cache_evict(cache_dir, max_bytes)
+        with _CACHE_SIZE_LOCK:
+            _CACHE_SIZE_ESTIMATES[cache_dir] = total
+
+
+def _cache_evict(cache_dir: str, max_bytes: int) -> int:
+    """扫描目录，总大小超过上限时按 mtime 从旧到新删除，直到降到上限的 90%；返回扫描后的总大小"""
+    files = []
+    total = 0
+    for root, _, names in os.walk(cache_dir):
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path, name[:-len(".json")]))
+            total += stat.st_size
+    if total <= max_bytes:
+        return total
+    target = max_bytes * 0.9
+    for _, size, path, key in sorted(files):
+        if total <= target:
+            break
+        _cache_remove(path, key)
+        total -= size
+    return total
+
+
+def _cache_entry(result: Dict[str, Any], url: str, max_length: int, ignore_robots: bool, ttl: int) -> Dict[str, Any]:
+    now = time.time()
+    return {
+        "url": url,
+        "max_length": max_length,
+        "ignore_robots": ignore_robots,
+        "title": result["title"],
+        # 缓存不带自定义名称的文档名，命中时再按本次的 custom_name 决定
+        "document_name": _document_name(url, result["title"]),
+        "content": result["content"],
+        "created_at": now,
+        "expires_at": now + ttl
+    }
+
+
+def _result_from_cache(entry: Dict[str, Any], url: str, custom_name: str) -> Dict[str, Any]:
+    content = entry["content"]
+    return {
+        "success": True,
+        "document_name": custom_name or entry["document_name"],
+        "content": content,
+        "content_length": len(content),
+        "source_url": url,
+        "title": entry["title"],
+        "from_cache": True
+    }
+
+
+def clear_fetch_cache(cache_dir: str = "") -> int:
+    """删除磁盘缓存目录中的全部条目，返回删除的条目数"""
+    cache_dir = cache_dir or os.environ.get(_CACHE_DIR_ENV, "")
+    removed = 0
+    if cache_dir:
+        for root, _, names in os.walk(cache_dir):
+            for name in names:
+                if name.endswith(".json"):
+                    _cache_remove(os.path.join(root, name), name[:-len(".json")])
+                    removed += 1
+    with _CACHE_MEMORY_LOCK:
+        _CACHE_MEMORY.clear()
+    with _CACHE_SIZE_LOCK:
+        _CACHE_SIZE_ESTIMATES.pop(cache_dir, None)
+    return removed
+
+
+def _fetch_single(
+    url: str,
+    custom_name: str,
+    max_length: int,
+    ignore_robots: bool,
+    mcp_server_url: str,
+    api_key: str,
+    protocol_version: str,
+    client_name: str,
+    client_version: str,
+    timeout_init: int,
+    timeout_call: int,
+    cache_dir: str,
+    cache_ttl: int,
+    cache_max_mb: int,
+    force_refresh: bool,
+    start_index: int
+) -> Dict[str, Any]:
+    """fetch_mcp_server 的实际流程：查缓存 → 取会话 → tools/call → 写缓存"""
+    cache_dir = cache_dir or os.environ.get(_CACHE_DIR_ENV, "")
+    cache_key = _cache_key(url, max_length, ignore_robots, start_index) if cache_dir else None
+    if cache_key and not force_refresh:
+        entry = _cache_get(cache_dir, cache_key)
+        if entry is not None:
+            return _result_from_cache(entry, url, custom_name)
+    
+    pool_key = (mcp_server_url, api_key, protocol_version)
+    
+    session = None
+    # 只有正常完成的会话放回会话池，过期重连失败或请求异常的会话一律关闭
+    broken = True
+    try:
+        # 步骤 1-2: 从会话池取出已握手的会话，没有则 Initialize 并发送 Initialized 通知
+        session = _acquire_session(pool_key, client_name, client_version, timeout_init)
         
-        response = session.post(
-            server_url,
-            headers={**headers, "mcp-session-id": session_id},
-            json=tool_payload,
-            timeout=timeout_call
+        # 步骤 3: Call fetch tool
+        result = _fetch_with_session(
+            session, url, custom_name, max_length, ignore_robots,
+            client_name, client_version, timeout_init, timeout_call, start_index
         )
-        
+        broken = result.pop("_session_broken", False)
+    except _McpInitError as e:
+        return e.result
+    except Exception as e:
+        return _request_error(e)
+    finally:
+        if session is not None:
+            if broken:
+                session.close()
+            else:
+                _release_session(pool_key, session)
+    
+    if cache_key and result["success"]:
+        _cache_put(cache_dir, cache_key, _cache_entry(result, url, max_length, ignore_robots, cache_ttl),
+                   cache_max_mb * 1024 * 1024)
+    return result
+
+
+def _request_error(e: Exception) -> Dict[str, Any]:
+    return {
+        "success": False,
+        "error": f"Request error: {str(e)}",
+        "details": str(e)[:200]
+    }
+
+
+def _fetch_with_session(
+    session: _McpSession,
+    url: str,
+    custom_name: str,
+    max_length: int,
+    ignore_robots: bool,
+    client_name: str,
+    client_version: str,
+    timeout_init: int,
+    timeout_call: int,
+    start_index: int = 0
+) -> Dict[str, Any]:
+    """
+    在已握手的会话上抓取一个 URL（从 start_index 个字符开始），返回结果字典
+
+    会话过期时重新握手并重试一次；tools/call 返回非 200 时结果中带 _session_broken 标记，
+    调用方据此丢弃会话而不是放回会话池。
+    """
+    fetch_params = {
+        "url": url,
+        "max_length": max_length
+    }
+    
+    if start_index:
+        fetch_params["start_index"] = start_index
+    
+    if ignore_robots:
+        fetch_params["args"] = ["--ignore-robots-txt"]
+    
+    session_id = session.session_id
+    with _timed_phase("tool_call"):
+        request_id, response, ttfb_ms = session.call_tool("fetch", fetch_params, timeout_call)
+    if _is_session_expired(response):
+        # 服务端会话已过期：重新握手并重试一次
+        response.close()
+        session.reinitialize(session_id, client_name, client_version, timeout_init)
+        with _timed_phase("tool_call"):
+            request_id, response, ttfb_ms = session.call_tool("fetch", fetch_params, timeout_call)
+    
+    try:
         if response.status_code != 200:
             return {
                 "success": False,
                 "error": f"Tool call failed: {response.status_code}",
-                "details": response.text[:200]
+                "details": response.text[:200],
+                "_session_broken": True
             }
         
-        # 解析响应
-        result = response.json()
-        if "error" in result:
-            return {
-                "success": False,
-                "error": result["error"].get("message", "Unknown error")
-            }
-        
-        # 提取内容
-        result_data = result.get("result", {})
-        content_data = result_data.get("content", {})
-        
-        # 处理列表格式的 content
-        if isinstance(content_data, list) and len(content_data) > 0:
-            text_content = ""
-            for item in content_data:
-                if isinstance(item, dict) and item.get("type") == "text":
-                    text_content += item.get("text", "")
-            fetched_content = text_content
-        else:
-            fetched_content = content_data.get("content", "") if isinstance(content_data, dict) else str(content_data)
-        
-        # 提取标题
-        fetched_title = result_data.get("title", "")
-        if not fetched_title:
-            # 从内容中提取第一个标题
-            match = re.search(r'^#\s+(.+)$', fetched_content, re.MULTILINE)
-            if match:
-                fetched_title = match.group(1)
-        
-        # 构建文档名称
-        from urllib.parse import urlparse
-        domain = urlparse(url).netloc
-        document_name = custom_name if custom_name else (f"{fetched_title} [{domain}]" if fetched_title else f"Web Content [{domain}]")
-        
+        # 边读边解析，找到结果或超出读取上限即停止
+        with _timed_phase("tool_call") as phase:
+            read_start = time.perf_counter()
+            try:
+                message = _read_rpc_response(response, request_id, _response_byte_limit(max_length))
+            except _ResponseTooLarge as e:
+                # 超出读取上限时不再继续读取，按 max_length 截断已收到的正文
+                message = _truncated_rpc_message(e.partial, request_id, max_length, start_index)
+            finally:
+                if phase is not None:
+                    phase["ttfb_ms"] = ttfb_ms
+                    phase["body_ms"] = (time.perf_counter() - read_start) * 1000
+                    phase["bytes"] = response.raw.tell()
+    finally:
+        response.close()
+    
+    with _timed_phase("parse", network=False):
+        result = _parse_fetch_response(message, url, custom_name)
+    result["ttfb_ms"] = round(ttfb_ms, 2)
+    return result
+
+
+def _document_name(url: str, title: str, custom_name: str = "") -> str:
+    """构建文档名称：优先自定义名称，其次「标题 [域名]」，无标题时为「Web Content [域名]」"""
+    if custom_name:
+        return custom_name
+    domain = urlparse(url).netloc
+    return f"{title} [{domain}]" if title else f"Web Content [{domain}]"
+
+
+def _parse_fetch_response(result: Dict[str, Any], url: str, custom_name: str) -> Dict[str, Any]:
+    """将 tools/call 的 JSON-RPC 响应转换为工具返回格式"""
+    if "error" in result:
         return {
-            "success": True,
-            "document_name": document_name,
-            "content": fetched_content,
-            "content_length": len(fetched_content),
-            "source_url": url
+            "success": False,
+            "error": result["error"].get("message", "Unknown error")
         }
-        
+    
+    # 提取内容
+    result_data = result.get("result", {})
+    content_data = result_data.get("content", {})
+    
+    # 处理列表格式的 content
+    if isinstance(content_data, list) and len(content_data) > 0:
+        text_content = ""
+        for item in content_data:
+            if isinstance(item, dict) and item.get("type") == "text":
+                text_content += item.get("text", "")
+        fetched_content = text_content
+    else:
+        fetched_content = content_data.get("content", "") if isinstance(content_data, dict) else str(content_data)
+    
+    # 提取标题
+    fetched_title = result_data.get("title", "")
+    if not fetched_title:
+        # 从内容中提取第一个标题
+        match = re.search(r'^#\s+(.+)$', fetched_content, re.MULTILINE)
+        if match:
+            fetched_title = match.group(1)
+    
+    return {
+        "success": True,
+        "document_name": _document_name(url, fetched_title, custom_name),
+        "content": fetched_content,
+        "content_length": len(fetched_content),
+        "source_url": url,
+        "title": fetched_title,
+        "from_cache": False
+    }
+
+
+# ========== 批量抓取 ==========
+_BATCH_DEFAULT_CONCURRENCY = 4
+_BATCH_MAX_CONCURRENCY = 32
+
+
+class _HostRateLimiter:
+    """按目标网站域名限速：同一域名两次请求的开始时间至少间隔 1 / rate 秒"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str) -> None:
+        if not self.interval:
+            return
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def _parse_urls(urls: Any) -> List[str]:
+    """urls 可以是列表、JSON 数组字符串或按行分隔的字符串，去掉空行与首尾空白"""
+    if isinstance(urls, str):
+        text = urls.strip()
+        if text.startswith("["):
+            try:
+                urls = json.loads(text)
+            except ValueError:
+                pass
+        if isinstance(urls, str):
+            urls = text.splitlines()
+    return [str(u).strip() for u in urls or [] if str(u).strip()]
+
+
+def _iter_fetch_batch(
+    urls: List[str],
+    max_concurrency: int = _BATCH_DEFAULT_CONCURRENCY,
+    per_host_rate: float = 0,
+    custom_names: Optional[List[str]] = None,
+    max_length: int = 10000,
+    ignore_robots: bool = True,
+    mcp_server_url: str = "https://mcp.api-inference.modelscope.net/b13c348780054e/mcp",
+    api_key: str = "",
+    protocol_version: str = "2024-11-05",
+    client_name: str = "maxkb",
+    client_version: str = "1.0",
+    timeout_init: int = 30,
+    timeout_call: int = 60,
+    cache_dir: str = "",
+    cache_ttl: int = _CACHE_DEFAULT_TTL,
+    cache_max_mb: int = _CACHE_DEFAULT_MAX_MB,
+    force_refresh: bool = False,
+    return_timing: bool = False,
+    metrics_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    批量抓取多个 URL，按完成顺序逐个产出结果
+
+    所有请求共用一个已握手的 MCP 会话，并发发送 tools/call，每项结果与 fetch_mcp_server
+    的返回格式一致，并额外带有 index（在 urls 中的位置）；单个 URL 慢或失败不会阻塞其他 URL。
+
+    Args:
+        urls: 目标网页 URL 列表
+        max_concurrency: 同时进行的抓取数，默认 4，最大 32
+        per_host_rate: 每个目标域名每秒最多发起的请求数，0 表示不限速
+        custom_names: 与 urls 一一对应的自定义文档名称（可选）
+        其余参数与 fetch_mcp_server 相同
+    """
+    if not urls:
+        return
+    names = list(custom_names or [])
+    names += [""] * (len(urls) - len(names))
+    cache_dir = cache_dir or os.environ.get(_CACHE_DIR_ENV, "")
+    
+    # 缓存命中的 URL 立即产出，其余 URL 再并发抓取
+    pending = []
+    for index, url in enumerate(urls):
+        entry = None
+        timing_start = _start_timing()
+        if cache_dir and not force_refresh:
+            entry = _cache_get(cache_dir, _cache_key(url, max_length, ignore_robots))
+        if entry is not None:
+            result = _result_from_cache(entry, url, names[index])
+            yield {**_finish_timing(timing_start, url, result, return_timing, metrics_callback), "index": index}
+        else:
+            _TIMING.phases = None
+            pending.append(index)
+    if not pending:
+        return
+    
+    pool_key = (mcp_server_url, api_key, protocol_version)
+    try:
+        session = _acquire_session(pool_key, client_name, client_version, timeout_init)
+    except _McpInitError as e:
+        for index in pending:
+            yield {**e.result, "index": index, "source_url": urls[index]}
+        return
+    except Exception as e:
+        for index in pending:
+            yield {**_request_error(e), "index": index, "source_url": urls[index]}
+        return
+    
+    concurrency = max(1, min(int(max_concurrency or 1), _BATCH_MAX_CONCURRENCY, len(pending)))
+    session.set_max_connections(concurrency)
+    limiter = _HostRateLimiter(per_host_rate)
+    state = {"broken": False}
+
+    def fetch_one(index: int) -> Dict[str, Any]:
+        url = urls[index]
+        limiter.wait(url)
+        timing_start = _start_timing()
+        try:
+            result = _fetch_with_session(
+                session, url, names[index], max_length, ignore_robots,
+                client_name, client_version, timeout_init, timeout_call
+            )
+        except _McpInitError as e:
+            # 过期后重新握手失败，共享会话已不可用
+            result = {**e.result, "_session_broken": True}
+        except Exception as e:
+            result = _request_error(e)
+        if result.pop("_session_broken", False):
+            state["broken"] = True
+        if cache_dir and result["success"]:
+            _cache_put(cache_dir, _cache_key(url, max_length, ignore_robots),
+                       _cache_entry(result, url, max_length, ignore_robots, cache_ttl), cache_max_mb * 1024 * 1024)
+        result = _finish_timing(timing_start, url, result, return_timing, metrics_callback)
+        result["index"] = index
+        return result
+
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    futures = [executor.submit(fetch_one, index) for index in pending]
+    try:
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        # 调用方提前停止迭代时取消尚未开始的抓取
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=True)
+        if state["broken"]:
+            session.close()
+        else:
+            _release_session(pool_key, session)
+
+
+def _fetch_batch(
+    urls: List[str],
+    max_concurrency: int = _BATCH_DEFAULT_CONCURRENCY,
+    per_host_rate: float = 0,
+    **kwargs: Any
+) -> Dict[str, Any]:
+    """
+    批量抓取多个 URL（fetch_mcp_server 的 urls 模式），结果按输入顺序返回
+
+    参数同 _iter_fetch_batch。
+
+    Returns:
+        {"success": True, "results": [...], "count": int, "succeeded": int, "failed": int}
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(urls)
+    for result in _iter_fetch_batch(urls, max_concurrency, per_host_rate, **kwargs):
+        results[result["index"]] = result
+    succeeded = sum(1 for r in results if r and r["success"])
+    return {
+        "success": True,
+        "results": results,
+        "count": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded
+    }
+
+
+# ========== 长文档分段抓取 ==========
+# fetch 工具在内容超过 max_length 时于末尾附加截断提示，并给出下一段的 start_index；
+# 超出文档末尾的 start_index 会返回 No more content 提示
+_TRUNCATION_HINT = re.compile(
+    r'\n\n<error>Content truncated\. Call the fetch tool with a start_index of (\d+) to get more content\.</error>\s*$'
+)
+_TRUNCATION_MARKER = "\n\n<error>Content truncated. Call the fetch tool with a start_index of {} to get more content.</error>"
+_NO_MORE_CONTENT = "<error>No more content available.</error>"
+_CONTENTS_PREFIX = re.compile(r'^Contents of [^\n]*:\n')
+# 长文档模式默认最多读取的窗口数（每个窗口 max_length 个字符）
+_LONG_DEFAULT_MAX_CHUNKS = 20
+
+
+def _split_window(content: str) -> Tuple[str, Optional[int], bool]:
+    """
+    拆出一段内容，返回 (正文, 下一段 start_index 或 None, 是否已无更多内容)
+
+    去掉每段开头的「Contents of <url>:」和末尾的截断提示，保证各段首尾相接即为原文。
+    """
+    if content.strip() == _NO_MORE_CONTENT or content.rstrip().endswith(_NO_MORE_CONTENT):
+        return "", None, True
+    next_start = None
+    match = _TRUNCATION_HINT.search(content)
+    if match:
+        next_start = int(match.group(1))
+        content = content[:match.start()]
+    content = _CONTENTS_PREFIX.sub("", content, count=1)
+    return content, next_start, False
+
+
+def _iter_fetch_chunks(
+    url: str,
+    total_length: int,
+    window_length: int,
+    max_concurrency: int = _BATCH_DEFAULT_CONCURRENCY,
+    custom_name: str = "",
+    ignore_robots: bool = True,
+    mcp_server_url: str = "https://mcp.api-inference.modelscope.net/b13c348780054e/mcp",
+    api_key: str = "",
+    protocol_version: str = "2024-11-05",
+    client_name: str = "maxkb",
+    client_version: str = "1.0",
+    timeout_init: int = 30,
+    timeout_call: int = 60
+) -> Iterator[Dict[str, Any]]:
+    """
+    分段抓取长文档，按顺序逐段产出，每段可直接作为一个知识库分块
+
+    先抓取第一段，若内容被截断，则按 window_length 把 total_length 以内的其余窗口并发请求，
+    再按 start_index 顺序产出；遇到最后一段（无截断提示）后取消其余窗口。
+
+    Args:
+        url: 目标网页 URL
+        total_length: 最多读取的总字符数
+        window_length: 每段的字符数（即每次 tools/call 的 max_length）
+        max_concurrency: 同时请求的窗口数，默认 4，最大 32
+        其余参数与 fetch_mcp_server 相同
+
+    每段结果:
+        {"success": True, "index": int, "start_index": int, "content": str, "content_length": int,
+         "document_name": str, "source_url": str, "is_last": bool, "next_start_index": int | None}
+        is_last 为 True 且 next_start_index 不为空时，表示因 total_length 限制而提前结束
+    """
+    window_length = max(1, int(window_length))
+    total_length = max(1, int(total_length))
+    pool_key = (mcp_server_url, api_key, protocol_version)
+    try:
+        session = _acquire_session(pool_key, client_name, client_version, timeout_init)
+    except _McpInitError as e:
+        yield {**e.result, "index": 0, "start_index": 0, "source_url": url}
+        return
     except Exception as e:
+        yield {**_request_error(e), "index": 0, "start_index": 0, "source_url": url}
+        return
+
+    state = {"broken": False}
+
+    def fetch_window(start: int, length: int) -> Dict[str, Any]:
+        try:
+            result = _fetch_with_session(
+                session, url, custom_name, length, ignore_robots,
+                client_name, client_version, timeout_init, timeout_call, start
+            )
+        except _McpInitError as e:
+            # 过期后重新握手失败，共享会话已不可用
+            result = {**e.result, "_session_broken": True}
+        except Exception as e:
+            result = _request_error(e)
+        if result.pop("_session_broken", False):
+            state["broken"] = True
+        return result
+
+    def chunk(index: int, start: int, content: str, next_start: Optional[int], is_last: bool) -> Dict[str, Any]:
         return {
-            "success": False,
-            "error": f"Request error: {str(e)}",
-            "details": str(e)[:200]
+            "success": True,
+            "index": index,
+            "start_index": start,
+            "content": content,
+            "content_length": len(content),
+            "document_name": f"{base_name} (part {index + 1})",
+            "source_url": url,
+            "is_last": is_last,
+            "next_start_index": next_start
         }
+
+    executor = None
+    futures = []
+    try:
+        # 第一段：确定文档名称以及文档是否超过一个窗口
+        first = fetch_window(0, min(window_length, total_length))
+        if not first["success"]:
+            yield {**first, "index": 0, "start_index": 0}
+            return
+        base_name = first["document_name"]
+        content, next_start, _ = _split_window(first["content"])
+        if next_start is None or next_start >= total_length:
+            yield chunk(0, 0, content, next_start, True)
+            return
+        yield chunk(0, 0, content, next_start, False)
+
+        # 其余窗口并发请求，按顺序产出
+        starts = list(range(next_start, total_length, window_length))
+        concurrency = max(1, min(int(max_concurrency or 1), _BATCH_MAX_CONCURRENCY, len(starts)))
+        session.set_max_connections(concurrency)
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        futures = [executor.submit(fetch_window, start, min(window_length, total_length - start)) for start in starts]
+        for index, (start, future) in enumerate(zip(starts, futures), 1):
+            result = future.result()
+            if not result["success"]:
+                yield {**result, "index": index, "start_index": start}
+                return
+            content, next_start, exhausted = _split_window(result["content"])
+            if exhausted:
+                # 上一段恰好读到文档末尾，之后已无内容
+                yield chunk(index, start, "", None, True)
+                return
+            is_last = next_start is None or index == len(starts)
+            yield chunk(index, start, content, next_start, is_last)
+            if is_last:
+                return
+    finally:
+        # 提前结束时取消尚未开始的窗口
+        for future in futures:
+            future.cancel()
+        if executor is not None:
+            executor.shutdown(wait=True)
+        if state["broken"]:
+            session.close()
+        else:
+            _release_session(pool_key, session)
+
+
+def _fetch_long(url: str, return_chunks: bool = False, **kwargs: Any) -> Dict[str, Any]:
+    """
+    抓取长文档并按顺序拼接为一个结果（fetch_mcp_server 的 long_document 模式）
+
+    return_chunks 为 True 时不拼接，改为返回分段列表；其余参数同 _iter_fetch_chunks。
+    返回格式与 fetch_mcp_server 相同，另含：
+        window_count: 实际读取的窗口数
+        truncated: 是否因 total_length 限制未读完
+        next_start_index: 未读完时下一段的 start_index，可用于继续读取
+        chunks: 仅 return_chunks 时提供，按顺序排列的分段，每项含 index、start_index、end_index、
+                content、content_length 与 document_name，此时不含 content 与 content_length
+    """
+    parts = []
+    last = None
+    for part in _iter_fetch_chunks(url, **kwargs):
+        if not part["success"]:
+            return {key: value for key, value in part.items() if key not in ("index", "start_index")}
+        parts.append(part)
+        last = part
+    # 去掉分段名称中的「 (part N)」后缀
+    document_name = last["document_name"][:-len(f" (part {last['index'] + 1})")]
+    result = {"success": True, "document_name": document_name}
+    if return_chunks:
+        result["chunks"] = [{
+            "index": part["index"],
+            "start_index": part["start_index"],
+            "end_index": part["start_index"] + part["content_length"],
+            "content": part["content"],
+            "content_length": part["content_length"],
+            "document_name": part["document_name"]
+        } for part in parts]
+    else:
+        content = "".join(part["content"] for part in parts)
+        result["content"] = content
+        result["content_length"] = len(content)
+    result.update({
+        "source_url": url,
+        "window_count": len(parts),
+        "truncated": last["next_start_index"] is not None,
+        "next_start_index": last["next_start_index"]
+    })
+    return result
+
+
+def fetch_mcp_server(
+    url: str = "",
+    custom_name: str = "",
+    max_length: int = 10000,
+    ignore_robots: bool = True,
+    mcp_server_url: str = "https://mcp.api-inference.modelscope.net/b13c348780054e/mcp",
+    api_key: str = "",
+    protocol_version: str = "2024-11-05",
+    client_name: str = "maxkb",
+    client_version: str = "1.0",
+    timeout_init: int = 30,
+    timeout_call: int = 60,
+    cache_dir: str = "",
+    cache_ttl: int = _CACHE_DEFAULT_TTL,
+    cache_max_mb: int = _CACHE_DEFAULT_MAX_MB,
+    force_refresh: bool = False,
+    start_index: int = 0,
+    return_timing: bool = False,
+    metrics_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+    urls: Any = None,
+    max_concurrency: int = _BATCH_DEFAULT_CONCURRENCY,
+    per_host_rate: float = 0,
+    long_document: bool = False,
+    max_chunks: int = _LONG_DEFAULT_MAX_CHUNKS,
+    return_chunks: bool = False,
+    metrics_action: str = ""
+) -> Dict[str, Any]:
+    """
+    获取网页内容并转换为 Markdown
+    
+    Args:
+        url: 目标网页 URL
+        custom_name: 自定义文档名称
+        max_length: 最大字符数限制
+        ignore_robots: 是否忽略 robots.txt 限制
+        mcp_server_url: ModelScope MCP 服务器 URL
+        api_key: API 密钥（如果需要认证）
+        protocol_version: MCP 协议版本
+        client_name: 客户端名称
+        client_version: 客户端版本
+        timeout_init: Initialize 超时时间（秒）
+        timeout_call: Tool Call 超时时间（秒）
+        cache_dir: 磁盘缓存目录，为空时读取环境变量 MAXKB_FETCH_CACHE_DIR，都为空则不缓存
+        cache_ttl: 缓存有效期（秒）
+        cache_max_mb: 缓存目录总大小上限（MB），超出后按最近最少使用淘汰
+        force_refresh: 忽略已有缓存重新抓取，并用新结果覆盖缓存
+        start_index: 从第几个字符开始返回内容，用于读取被截断的后续部分
+        return_timing: 在结果中附带 timing（各阶段耗时明细）
+        metrics_callback: 每次抓取结束后以 timing 字典为参数调用，用于对接外部监控
+        urls: 批量抓取的 URL 列表（列表、JSON 数组或按行分隔的字符串），提供时忽略 url 与 custom_name
+        max_concurrency: 批量抓取时同时进行的抓取数，默认 4，最大 32
+        per_host_rate: 批量抓取时每个目标域名每秒最多发起的请求数，0 表示不限速
+        long_document: 长文档模式：以 max_length 为窗口并发抓取各段并按顺序拼接为完整正文（不使用磁盘缓存，忽略 start_index）
+        max_chunks: 长文档模式最多读取的窗口数，默认 20，即最多 max_length * max_chunks 个字符
+        return_chunks: 长文档模式下不拼接正文，改为返回按顺序排列的分段列表 chunks（含各段的起止位置）
+        metrics_action: 提供时不抓取，改为执行管理操作并返回 {"success": True, "action": ..., ...}：
+            metrics: 返回进程内抓取指标 metrics（同 get_fetch_metrics）
+            reset_metrics: 返回指标后清零
+            clear_cache: 清空 cache_dir 指向的磁盘缓存，返回删除的条目数 removed
+            clear_sessions: 关闭 MCP 会话池中的全部会话，返回关闭的会话数 closed
+        
+    Returns:
+        包含 Markdown 内容的字典；批量抓取时为
+        {"success": True, "results": [...], "count": int, "succeeded": int, "failed": int}，
+        results 按输入顺序排列，每项与单个抓取的返回格式相同并带有 index；
+        长文档模式另含 window_count、truncated（是否因 max_chunks 未读完）与 next_start_index，
+        return_chunks 时以 chunks 代替 content 与 content_length
+    """
+    
+    if metrics_action:
+        return _metrics_admin(metrics_action.strip().lower(), cache_dir)
+    if urls and long_document:
+        return {"success": False, "error": "long_document cannot be combined with urls"}
+    if return_chunks and not long_document:
+        return {"success": False, "error": "return_chunks requires long_document"}
+    if urls:
+        url_list = _parse_urls(urls)
+        if not url_list:
+            return {"success": False, "error": "No valid URL in urls"}
+        return _fetch_batch(
+            url_list, max_concurrency, per_host_rate, max_length=max_length, ignore_robots=ignore_robots,
+            mcp_server_url=mcp_server_url, api_key=api_key, protocol_version=protocol_version,
+            client_name=client_name, client_version=client_version, timeout_init=timeout_init,
+            timeout_call=timeout_call, cache_dir=cache_dir, cache_ttl=cache_ttl, cache_max_mb=cache_max_mb,
+            force_refresh=force_refresh, return_timing=return_timing, metrics_callback=metrics_callback
+        )
+    if not url:
+        return {"success": False, "error": "Missing required parameter: url"}
+    
+    timing_start = _start_timing()
+    if long_document:
+        result = _fetch_long(
+            url, return_chunks=return_chunks, total_length=max(1, int(max_length)) * max(1, int(max_chunks or 1)), window_length=max_length,
+            max_concurrency=max_concurrency, custom_name=custom_name, ignore_robots=ignore_robots,
+            mcp_server_url=mcp_server_url, api_key=api_key, protocol_version=protocol_version,
+            client_name=client_name, client_version=client_version, timeout_init=timeout_init,
+            timeout_call=timeout_call
+        )
+        return _finish_timing(timing_start, url, result, return_timing, metrics_callback)
+    result = _fetch_single(
+        url, custom_name, max_length, ignore_robots, mcp_server_url, api_key, protocol_version,
+        client_name, client_version, timeout_init, timeout_call, cache_dir, cache_ttl, cache_max_mb,
+        force_refresh, start_index
+    )
+    return _finish_timing(timing_start, url, result, return_timing, metrics_callback)
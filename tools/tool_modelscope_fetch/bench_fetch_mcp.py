@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+ModelScope Fetch MCP 工具离线压测脚本
+
+在子进程中启动本地 MCP 替身服务（mcp_standin_server.py），按递增的并发数驱动 fetch_mcp_server，
+报告每一档的吞吐量、延迟百分位、失败数与握手次数，全程不访问网络。
+
+用法：
+  python3 bench_fetch_mcp.py
+  python3 bench_fetch_mcp.py --levels 1,4,16,64 --requests 400 --latency-ms 50 --jitter-ms 20 --sse
+  python3 bench_fetch_mcp.py --mode batch       # 使用 fetch_mcp_server(urls=...) 驱动
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+TOOL_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TOOL_DIR, '1.0.0'))
+
+from fetch_mcp import (fetch_mcp_server, get_fetch_metrics,  # noqa: E402
+                       clear_mcp_session_pool)
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def start_standin(args: argparse.Namespace):
+    command = [
+        sys.executable, os.path.join(TOOL_DIR, 'mcp_standin_server.py'), '--port', '0',
+        '--latency-ms', str(args.latency_ms), '--jitter-ms', str(args.jitter_ms),
+        '--doc-chars', str(args.doc_chars), '--error-rate', str(args.error_rate)
+    ]
+    if args.sse:
+        command.append('--sse')
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    # 启动输出形如「MCP 替身服务已启动：http://127.0.0.1:xxxxx/mcp（Ctrl+C 退出）」
+    url = line[line.index('http'):].split('（')[0].strip()
+    return process, url
+
+
+def run_level(concurrency: int, args: argparse.Namespace, mcp_url: str) -> dict:
+    urls = [f"https://host{i % args.hosts}.example/page/{i}" for i in range(args.requests)]
+    latencies = []
+    failures = 0
+    start = time.perf_counter()
+    if args.mode == 'batch':
+        results = fetch_mcp_server(urls=urls, max_concurrency=concurrency, mcp_server_url=mcp_url,
+                                   max_length=args.max_length, return_timing=True)['results']
+        for result in results:
+            failures += 0 if result['success'] else 1
+            latencies.append(result['timing']['total_ms'])
+    else:
+        def one(url: str):
+            t0 = time.perf_counter()
+            result = fetch_mcp_server(url=url, mcp_server_url=mcp_url, max_length=args.max_length)
+            return (time.perf_counter() - t0) * 1000, result['success']
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for latency, success in executor.map(one, urls):
+                latencies.append(latency)
+                failures += 0 if success else 1
+    elapsed = time.perf_counter() - start
+
+    metrics = get_fetch_metrics(reset=True)['domains']
+    # 批量模式在开始前统一握手一次，不计入单个抓取的阶段耗时
+    handshakes = sum(d['phases'].get('initialize', {}).get('count', 0) for d in metrics.values()) \
+        if args.mode == 'single' else '-'
+    ttfb = [d['phases']['tool_call.ttfb']['p50_ms'] for d in metrics.values() if 'tool_call.ttfb' in d['phases']]
+    return {
+        'concurrency': concurrency,
+        'throughput': len(urls) / elapsed,
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'p99_ms': percentile(latencies, 99),
+        'ttfb_p50_ms': statistics.median(ttfb) if ttfb else 0.0,
+        'failures': failures,
+        'handshakes': handshakes
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ModelScope Fetch MCP 离线压测')
+    parser.add_argument('--levels', default='1,2,4,8,16,32', help='逗号分隔的并发档位')
+    parser.add_argument('--requests', type=int, default=200, help='每一档的请求数')
+    parser.add_argument('--mode', choices=('single', 'batch'), default='single')
+    parser.add_argument('--hosts', type=int, default=4, help='目标 URL 分布的域名数')
+    parser.add_argument('--max-length', type=int, default=10000)
+    parser.add_argument('--latency-ms', type=float, default=20, help='替身服务 tools/call 固定延迟')
+    parser.add_argument('--jitter-ms', type=float, default=10, help='替身服务额外随机延迟上限')
+    parser.add_argument('--doc-chars', type=int, default=20000)
+    parser.add_argument('--error-rate', type=float, default=0)
+    parser.add_argument('--sse', action='store_true', help='替身服务以 SSE 返回结果')
+    args = parser.parse_args()
+
+    process, mcp_url = start_standin(args)
+    try:
+        print(f"替身服务：{mcp_url}  模式：{args.mode}  每档请求数：{args.requests}  "
+              f"延迟：{args.latency_ms}+{args.jitter_ms} ms  SSE：{args.sse}")
+        print(f"{'并发':>6} {'吞吐(req/s)':>12} {'p50(ms)':>10} {'p95(ms)':>10} {'p99(ms)':>10} "
+              f"{'TTFB p50':>10} {'失败':>6} {'握手':>6}")
+        for level in [int(x) for x in args.levels.split(',') if x.strip()]:
+            clear_mcp_session_pool()
+            r = run_level(level, args, mcp_url)
+            print(f"{r['concurrency']:>6} {r['throughput']:>12.1f} {r['p50_ms']:>10.2f} {r['p95_ms']:>10.2f} "
+                  f"{r['p99_ms']:>10.2f} {r['ttfb_p50_ms']:>10.2f} {r['failures']:>6} {r['handshakes']:>6}")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == '__main__':
+    main()
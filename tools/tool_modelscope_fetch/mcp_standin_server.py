@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+本地 MCP 替身服务（Streamable HTTP），用于离线测试与压测 fetch_mcp_server
+
+实现的行为与 ModelScope 托管的 fetch MCP 服务一致：
+  - initialize：返回 mcp-session-id 响应头；notifications/initialized 返回 202
+  - 未知或过期的 mcp-session-id 返回 404（可用 --session-ttl 模拟会话过期）
+  - tools/call fetch：不访问网络，按 URL 生成确定性的 Markdown 文档，支持 max_length、start_index，
+    截断提示与 No more content 提示的格式与 fetch 工具相同；ignore_max_length 模拟不遵守 max_length 的服务端
+  - 响应可为 application/json 或 SSE（text/event-stream，结果前附带一条进度通知）
+  - 可配置 tools/call 的固定延迟与随机抖动；fail_initialize(n) 使接下来 n 次 initialize 返回 503
+
+用法：
+  python3 mcp_standin_server.py --port 8765 --latency-ms 50 --jitter-ms 20 --sse
+  然后将 fetch_mcp_server 的 mcp_server_url 设为 http://127.0.0.1:8765/mcp
+
+也可在代码中启动：server, url = start_server(latency_ms=10)，用完调用 server.shutdown()
+"""
+
+import argparse
+import json
+import random
+import socket
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+TRUNCATION_HINT = "\n\n<error>Content truncated. Call the fetch tool with a start_index of {} to get more content.</error>"
+NO_MORE_CONTENT = "<error>No more content available.</error>"
+
+
+def build_document(url: str, length: int) -> str:
+    """按 URL 生成长度为 length 的确定性 Markdown 文档，同一 URL 每次结果相同"""
+    host = urlparse(url).netloc or "localhost"
+    lines = [f"# Stand-in page for {host}", "", f"Source: {url}", ""]
+    text = "\n".join(lines) + "\n"
+    seed = sum(url.encode("utf-8"))
+    paragraph = 0
+    while len(text) < length:
+        paragraph += 1
+        text += f"## Section {paragraph}\n\nParagraph {paragraph} of the stand-in document (seed {seed}). " \
+                f"Lorem ipsum dolor sit amet, consectetur adipiscing elit.\n\n"
+    return text[:length]
+
+
+class StandinState:
+    """替身服务的配置与运行时状态"""
+
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0, sse: bool = False,
+                 doc_chars: int = 20000, session_ttl: float = 0, error_rate: float = 0,
+                 ignore_max_length: bool = False):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.sse = sse
+        self.doc_chars = doc_chars
+        self.session_ttl = session_ttl
+        self.error_rate = error_rate
+        self.ignore_max_length = ignore_max_length
+        self.sessions: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self.init_failures_pending = 0
+        self.lock = threading.Lock()
+
+    def count(self, name: str) -> None:
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+
+    def session_valid(self, session_id: Optional[str]) -> bool:
+        with self.lock:
+            created = self.sessions.get(session_id or "")
+            if created is None:
+                return False
+            if self.session_ttl and time.monotonic() - created > self.session_ttl:
+                del self.sessions[session_id]
+                return False
+            return True
+
+    def new_session(self) -> str:
+        session_id = uuid.uuid4().hex
+        with self.lock:
+            self.sessions[session_id] = time.monotonic()
+        return session_id
+
+    def expire_sessions(self) -> None:
+        with self.lock:
+            self.sessions.clear()
+
+    def fail_initialize(self, count: int) -> None:
+        """接下来 count 次 initialize 返回 503"""
+        with self.lock:
+            self.init_failures_pending = count
+
+    def should_fail_initialize(self) -> bool:
+        with self.lock:
+            if self.init_failures_pending > 0:
+                self.init_failures_pending -= 1
+                return True
+        return False
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # 带缓冲写出，响应头与响应体合并发送（handle_one_request 结束时统一 flush）
+    wbufsize = -1
+    state: StandinState = None
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+    def setup(self) -> None:
+        super().setup()
+        # 关闭 Nagle，避免小响应被延迟确认拖慢
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def do_POST(self) -> None:
+        try:
+            message = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        except ValueError:
+            self.send_empty(400)
+            return
+        method = message.get("method")
+        self.state.count(method or "unknown")
+        if method == "initialize":
+            if self.state.should_fail_initialize():
+                self.send_empty(503)
+                return
+            session_id = self.state.new_session()
+            self.send_json({"jsonrpc": "2.0", "id": message.get("id"), "result": {
+                "protocolVersion": message.get("params", {}).get("protocolVersion"),
+                "capabilities": {"tools": {}},
+                "serverInfo": {"name": "mcp-standin", "version": "1.0"}
+            }}, {"mcp-session-id": session_id})
+            return
+        if not self.state.session_valid(self.headers.get("mcp-session-id")):
+            self.send_empty(404)
+            return
+        if method == "notifications/initialized":
+            self.send_empty(202)
+            return
+        if method != "tools/call" or message.get("params", {}).get("name") != "fetch":
+            self.send_rpc({"jsonrpc": "2.0", "id": message.get("id"),
+                           "error": {"code": -32601, "message": f"Unsupported method: {method}"}})
+            return
+
+        delay = self.state.latency_ms + random.uniform(0, self.state.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+        if self.state.error_rate and random.random() < self.state.error_rate:
+            self.send_empty(503)
+            return
+        self.send_rpc({"jsonrpc": "2.0", "id": message.get("id"), "result": {
+            "content": [{"type": "text", "text": self.fetch_text(message["params"].get("arguments", {}))}],
+            "isError": False
+        }})
+
+    def fetch_text(self, arguments: Dict[str, Any]) -> str:
+        url = arguments.get("url", "")
+        max_length = int(arguments.get("max_length") or 5000)
+        if self.state.ignore_max_length:
+            max_length = self.state.doc_chars
+        start_index = int(arguments.get("start_index") or 0)
+        document = build_document(url, self.state.doc_chars)
+        if start_index >= len(document):
+            return NO_MORE_CONTENT
+        content = document[start_index:start_index + max_length]
+        if start_index + max_length < len(document):
+            content += TRUNCATION_HINT.format(start_index + max_length)
+        return f"Contents of {url}:\n{content}"
+
+    def send_rpc(self, payload: Dict[str, Any]) -> None:
+        if not self.state.sse:
+            self.send_json(payload)
+            return
+        progress = {"jsonrpc": "2.0", "method": "notifications/progress", "params": {"progress": 1}}
+        body = "".join(f"event: message\ndata: {json.dumps(item)}\n\n" for item in (progress, payload)).encode("utf-8")
+        self.send_body(200, "text/event-stream", body)
+
+    def send_json(self, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_body(200, "application/json", json.dumps(payload).encode("utf-8"), headers)
+
+    def send_empty(self, status: int) -> None:
+        self.send_body(status, "text/plain", b"")
+
+    def send_body(self, status: int, content_type: str, body: bytes, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_server(host: str = "127.0.0.1", port: int = 0, **options: Any) -> Tuple[ThreadingHTTPServer, str]:
+    """在后台线程启动替身服务，返回 (server, MCP 地址)；server.state 可用于查看计数或模拟会话过期"""
+    state = StandinState(**options)
+    handler = type("BoundStandinHandler", (StandinHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.state = state
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/mcp"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="本地 MCP 替身服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0, help="tools/call 固定延迟")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="tools/call 额外随机延迟上限")
+    parser.add_argument("--sse", action="store_true", help="以 text/event-stream 返回 tools/call 结果")
+    parser.add_argument("--doc-chars", type=int, default=20000, help="生成文档的字符数")
+    parser.add_argument("--session-ttl", type=float, default=0, help="会话有效期（秒），0 表示不过期")
+    parser.add_argument("--error-rate", type=float, default=0, help="tools/call 返回 503 的概率")
+    args = parser.parse_args()
+    server, url = start_server(
+        args.host, args.port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, sse=args.sse,
+        doc_chars=args.doc_chars, session_ttl=args.session_ttl, error_rate=args.error_rate
+    )
+    print(f"MCP 替身服务已启动：{url}（Ctrl+C 退出）", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
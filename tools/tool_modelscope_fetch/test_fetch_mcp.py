@@ -1,104 +1,198 @@
 #!/usr/bin/env python3
 """
 ModelScope Fetch MCP 工具测试脚本
+
+在本地启动 MCP 替身服务（mcp_standin_server.py）后运行，不访问网络，结果可重复；
+替身服务分别以 JSON 与 SSE 响应各运行一遍。可以直接 python3 运行，也可以用 pytest 运行。
+需要验证线上服务时，设置环境变量 FETCH_MCP_LIVE_URL 为 MCP 服务地址。
 """
 
+import os
+import shutil
 import sys
-sys.path.insert(0, '/home/ben/fetch-mcp-docker/MaxKB-toolstore/tools/tool_modelscope_fetch/1.0.0')
-
-from fetch_mcp import fetch_mcp_server
-
-
-def test_basic_usage():
-    """测试基础用法"""
-    print("=" * 60)
-    print("测试 1: 基础用法（只提供 URL）")
-    print("=" * 60)
-    
-    result = fetch_mcp_server(url="https://example.com")
-    
-    if result["success"]:
-        print(f"✓ 成功")
-        print(f"  文档名称：{result['document_name']}")
-        print(f"  内容长度：{result['content_length']}")
-        print(f"  内容预览：{result['content'][:200]}...")
-    else:
-        print(f"✗ 失败")
-        print(f"  错误：{result.get('error', '未知错误')}")
-        print(f"  详情：{result.get('details', '')}")
-    
-    print()
-
-
-def test_custom_config():
-    """测试自定义配置"""
-    print("=" * 60)
-    print("测试 2: 自定义配置")
-    print("=" * 60)
-    
+import tempfile
+
+TOOL_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TOOL_DIR, '1.0.0'))
+sys.path.insert(0, TOOL_DIR)
+sys.path.insert(0, os.path.dirname(TOOL_DIR))
+
+from fetch_mcp import (fetch_mcp_server,  # noqa: E402
+                       clear_mcp_session_pool, get_fetch_metrics)
+from mcp_standin_server import start_server, build_document  # noqa: E402
+from testkit import check, fixture, run_tests, skip  # noqa: E402
+import fetch_mcp  # noqa: E402
+
+
+@fixture(params=(False, True), ids=("json", "sse"))
+def standin(param):
+    """替身服务，param 为是否以 SSE 返回 tools/call 结果"""
+    server, mcp_url = start_server(doc_chars=20000, sse=param)
+    print(f"替身服务：{mcp_url}（{'SSE' if param else 'JSON'} 响应）\n")
+    yield server, mcp_url
+    clear_mcp_session_pool()
+    server.shutdown()
+
+
+@fixture()
+def server(standin):
+    return standin[0]
+
+
+@fixture()
+def mcp_url(standin):
+    return standin[1]
+
+
+@fixture()
+def live_url():
+    if not os.environ.get("FETCH_MCP_LIVE_URL"):
+        skip("未设置 FETCH_MCP_LIVE_URL")
+    return os.environ["FETCH_MCP_LIVE_URL"]
+
+
+def test_basic_usage(server, mcp_url):
+    """基础用法（只提供 URL）"""
+    result = fetch_mcp_server(url="https://example.com", mcp_server_url=mcp_url)
+    check("抓取成功", result["success"], result.get("error", ""))
+    check("文档名称", result["document_name"] == "Stand-in page for example.com [example.com]", result["document_name"])
+    check("内容长度", result["content_length"] == len(result["content"]), result["content_length"])
+
+
+def test_custom_config(server, mcp_url):
+    """自定义配置"""
     result = fetch_mcp_server(
         url="https://example.com",
         custom_name="测试文档",
         max_length=5000,
-        ignore_robots=True
-    )
-    
-    if result["success"]:
-        print(f"✓ 成功")
-        print(f"  文档名称：{result['document_name']}")
-        print(f"  内容长度：{result['content_length']}")
-    else:
-        print(f"✗ 失败")
-        print(f"  错误：{result.get('error', '未知错误')}")
-    
-    print()
-
-
-def test_all_parameters():
-    """测试所有参数"""
-    print("=" * 60)
-    print("测试 3: 使用所有参数（完整配置）")
-    print("=" * 60)
-    
-    result = fetch_mcp_server(
-        url="https://example.com",
-        custom_name="完整配置测试",
-        max_length=8000,
         ignore_robots=True,
-        mcp_server_url="https://mcp.api-inference.modelscope.net/b13c348780054e/mcp",
-        api_key="",  # 如果需要认证，在这里填写
-        protocol_version="2024-11-05",
-        client_name="maxkb",
-        client_version="1.0",
-        timeout_init=30,
-        timeout_call=60
+        mcp_server_url=mcp_url
     )
-    
-    if result["success"]:
-        print(f"✓ 成功")
-        print(f"  文档名称：{result['document_name']}")
-        print(f"  内容长度：{result['content_length']}")
-        print(f"  源 URL: {result['source_url']}")
-    else:
-        print(f"✗ 失败")
-        print(f"  错误：{result.get('error', '未知错误')}")
-    
-    print()
+    check("自定义名称", result["document_name"] == "测试文档")
+    check("max_length 生效", "start_index of 5000" in result["content"])
 
+    # 服务端不遵守 max_length 时，超出读取上限后停止读取并按 max_length 截断
+    server.state.ignore_max_length, server.state.doc_chars = True, 200000
+    try:
+        url = "https://example.com/oversized"
+        result = fetch_mcp_server(url=url, max_length=1000, start_index=0, mcp_server_url=mcp_url)
+    finally:
+        server.state.ignore_max_length, server.state.doc_chars = False, 20000
+    check("超长响应仍返回成功", result["success"], result.get("error", ""))
+    expected = f"Contents of {url}:\n" + build_document(url, 200000)[:1000]
+    check("内容按 max_length 截断并带截断提示", result["content"] == expected +
+          "\n\n<error>Content truncated. Call the fetch tool with a start_index of 1000 to get more content.</error>",
+          result["content_length"])
 
-if __name__ == "__main__":
-    print("\n开始运行 ModelScope Fetch MCP 工具测试\n")
-    
+
+def test_session_reuse(server, mcp_url):
+    """会话复用与过期重连"""
+    clear_mcp_session_pool()
+    before = dict(server.state.counters)
+    for i in range(5):
+        fetch_mcp_server(url=f"https://example.com/{i}", mcp_server_url=mcp_url)
+    handshakes = server.state.counters.get("initialize", 0) - before.get("initialize", 0)
+    check("5 次抓取只握手 1 次", handshakes == 1, handshakes)
+
+    server.state.expire_sessions()
+    result = fetch_mcp_server(url="https://example.com/expired", mcp_server_url=mcp_url)
+    check("会话过期后自动重连", result["success"], result.get("error", ""))
+
+    # 过期后重新握手失败：返回握手错误，并关闭该会话而不是遗留或放回会话池
+    closed = []
+    original_close = fetch_mcp._McpSession.close
+    fetch_mcp._McpSession.close = lambda self: (closed.append(self), original_close(self))[1]
+    try:
+        server.state.expire_sessions()
+        server.state.fail_initialize(1)
+        result = fetch_mcp_server(url="https://example.com/reinit-failed", mcp_server_url=mcp_url)
+    finally:
+        fetch_mcp._McpSession.close = original_close
+    check("重新握手失败时返回错误", result.get("error") == "Initialize failed: 503", result.get("error", ""))
+    check("失败的会话被关闭", len(closed) == 1 and clear_mcp_session_pool() == 0, len(closed))
+    result = fetch_mcp_server(url="https://example.com/after-failure", mcp_server_url=mcp_url)
+    check("之后的抓取重新建立会话", result["success"], result.get("error", ""))
+
+
+def test_batch(server, mcp_url):
+    """批量抓取"""
+    urls = [f"https://site{i % 3}.example/page/{i}" for i in range(12)]
+    result = fetch_mcp_server(urls="\n".join(urls), max_concurrency=4, per_host_rate=50, mcp_server_url=mcp_url)
+    check("全部成功", result["succeeded"] == 12, result["succeeded"])
+    check("按输入顺序返回", [r["source_url"] for r in result["results"]] == urls)
+    result = fetch_mcp_server(urls=urls[:2], mcp_server_url=mcp_url)
+    check("urls 也可以是列表", result["count"] == 2 and result["failed"] == 0, result["count"])
+
+
+def test_long_document(server, mcp_url):
+    """长文档分段抓取"""
+    url = "https://docs.example/long"
+    result = fetch_mcp_server(url, long_document=True, max_length=3000, max_chunks=100, max_concurrency=4,
+                              mcp_server_url=mcp_url)
+    check("拼接结果与原文一致", result["content"] == build_document(url, server.state.doc_chars),
+          f"{result['window_count']} 段")
+    check("未截断", not result["truncated"])
+    result = fetch_mcp_server(url, long_document=True, max_length=3000, max_chunks=2, mcp_server_url=mcp_url)
+    check("max_chunks 限制读取段数", result["window_count"] == 2 and result["truncated"]
+          and result["next_start_index"] == 6000, result.get("next_start_index"))
+    result = fetch_mcp_server(url, long_document=True, return_chunks=True, max_length=3000, max_chunks=100,
+                              mcp_server_url=mcp_url)
+    chunks = result["chunks"]
+    check("分段按顺序返回", [c["index"] for c in chunks] == list(range(len(chunks))) and "content" not in result,
+          len(chunks))
+    check("分段起止位置连续", all(c["start_index"] == p["end_index"] for p, c in zip(chunks, chunks[1:]))
+          and chunks[0]["start_index"] == 0 and chunks[-1]["end_index"] == server.state.doc_chars)
+    check("分段拼接与原文一致", "".join(c["content"] for c in chunks) == build_document(url, server.state.doc_chars))
+    result = fetch_mcp_server(urls=[url], long_document=True, mcp_server_url=mcp_url)
+    check("urls 与 long_document 同时提供时报错", not result["success"] and "long_document" in result["error"], result)
+
+
+def test_cache_and_timing(server, mcp_url):
+    """磁盘缓存与耗时明细"""
+    cache_dir = tempfile.mkdtemp(prefix="fetch_cache_")
     try:
-        test_basic_usage()
-        test_custom_config()
-        test_all_parameters()
-        
-        print("=" * 60)
-        print("测试完成")
-        print("=" * 60)
-        
-    except Exception as e:
-        print(f"\n测试过程中发生异常：{e}")
-        import traceback
-        traceback.print_exc()
+        first = fetch_mcp_server(url="https://cache.example/a", mcp_server_url=mcp_url, cache_dir=cache_dir,
+                                 return_timing=True)
+        second = fetch_mcp_server(url="https://cache.example/a", mcp_server_url=mcp_url, cache_dir=cache_dir)
+        check("首次未命中", not first["from_cache"])
+        check("再次命中缓存", second["from_cache"])
+        check("包含 tool_call 阶段", "tool_call" in first["timing"]["phases"], first["timing"]["total_ms"])
+        check("指标注册表有数据", "cache.example" in get_fetch_metrics()["domains"])
+
+        # 累计估算大小，只在估算超过上限时扫描目录淘汰
+        scans = []
+        original_evict = fetch_mcp._cache_evict
+        fetch_mcp._cache_evict = lambda *args: (scans.append(args), original_evict(*args))[1]
+        try:
+            for i in range(20):
+                fetch_mcp_server(url=f"https://cache.example/page/{i}", max_length=5000, mcp_server_url=mcp_url,
+                                 cache_dir=cache_dir, cache_max_mb=0.05)
+        finally:
+            fetch_mcp._cache_evict = original_evict
+        total = sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(cache_dir) for name in names)
+        check("缓存目录不超过上限", total <= 0.05 * 1024 * 1024, total)
+        check("并非每次写入都扫描目录", 0 < len(scans) < 20, len(scans))
+
+        metrics = fetch_mcp_server(metrics_action="metrics")
+        check("metrics_action 返回指标", "cache.example" in metrics["metrics"]["domains"])
+        fetch_mcp_server(metrics_action="reset_metrics")
+        check("reset_metrics 清零指标", fetch_mcp_server(metrics_action="metrics")["metrics"]["domains"] == {})
+        removed = fetch_mcp_server(metrics_action="clear_cache", cache_dir=cache_dir)["removed"]
+        check("clear_cache 清空缓存", removed > 0 and not any(names for _, _, names in os.walk(cache_dir)), removed)
+        check("clear_sessions 关闭会话", fetch_mcp_server(metrics_action="clear_sessions")["closed"] >= 1)
+        check("未知操作报错", not fetch_mcp_server(metrics_action="bogus")["success"])
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def test_live_service(live_url):
+    """线上服务"""
+    result = fetch_mcp_server(url="https://example.com", mcp_server_url=live_url)
+    check("线上抓取成功", result["success"], result.get("error", ""))
+
+
+if __name__ == "__main__":
+    run_tests("ModelScope Fetch MCP 工具测试", [
+        test_basic_usage, test_custom_config, test_session_reuse, test_batch, test_long_document,
+        test_cache_and_timing, test_live_service
+    ])
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Redis 查询工具测试脚本
+
+工具代码只保存在 1.0.0/Redis 查询.tool 中，脚本从中取出代码执行。
+默认使用 fakeredis 在进程内模拟 Redis（pip install fakeredis），不访问网络；
+设置环境变量 REDIS_TEST_HOST（可选 REDIS_TEST_PORT、REDIS_TEST_PASSWORD、REDIS_TEST_DB）时改为连接真实的 Redis，
+测试会写入并删除 test:* 键，请使用空闲的库。
+可以直接 python3 运行，也可以用 pytest 运行；缺少 redis 或 fakeredis 时跳过。
+"""
+
+import json
+import os
+import pickle
+import sys
+
+TOOL_DIR = os.path.dirname(os.path.abspath(__file__))
+TOOL_FILE = os.path.join(TOOL_DIR, "1.0.0", "Redis 查询.tool")
+sys.path.insert(0, os.path.dirname(TOOL_DIR))
+
+from testkit import check, fixture, run_tests, skip  # noqa: E402
+
+
+class _ToolUnpickler(pickle.Unpickler):
+    """读取 MaxKB 导出的 .tool 文件，不依赖 MaxKB 的模块"""
+
+    def find_class(self, module, name):
+        if module.startswith("tools."):
+            return type(name, (), {})
+        return super().find_class(module, name)
+
+
+def load_query_redis():
+    with open(TOOL_FILE, "rb") as f:
+        code = _ToolUnpickler(f).load().tool["code"]
+    namespace = {}
+    exec(code, namespace)
+    return namespace["query_redis"]
+
+
+def connect():
+    """返回 (连接参数, 直接操作 Redis 的客户端)"""
+    try:
+        import redis
+    except ImportError:
+        skip("需要 redis（pip install redis）")
+
+    if os.environ.get("REDIS_TEST_HOST"):
+        params = {
+            "host": os.environ["REDIS_TEST_HOST"],
+            "port": os.environ.get("REDIS_TEST_PORT", "6379"),
+            "password": os.environ.get("REDIS_TEST_PASSWORD", ""),
+            "db": os.environ.get("REDIS_TEST_DB", "15")
+        }
+        client = redis.Redis(host=params["host"], port=int(params["port"]), password=params["password"] or None,
+                             db=int(params["db"]))
+        return params, client
+
+    try:
+        import fakeredis
+    except ImportError:
+        skip("需要 fakeredis（pip install fakeredis）")
+
+    server = fakeredis.FakeServer()
+
+    class FakeRedis(fakeredis.FakeRedis):
+        def __init__(self, host=None, port=None, **kwargs):
+            super().__init__(server=server, **kwargs)
+
+    # 工具在函数内 import redis 并调用 redis.Redis，替换后所有连接都指向同一个内存服务器
+    redis.Redis = FakeRedis
+    return {"host": "127.0.0.1", "port": "6379", "password": "", "db": "0"}, FakeRedis()
+
+
+@fixture()
+def connection():
+    params, client = connect()
+    yield params, client
+    keys = list(client.scan_iter("test:*"))
+    if keys:
+        client.delete(*keys)
+
+
+@fixture()
+def client(connection):
+    return connection[1]
+
+
+@fixture()
+def query(connection):
+    """以 JSON 解析结果的 query_redis，只需传入命令与可选参数"""
+    params = connection[0]
+    query_redis = load_query_redis()
+
+    def run(command, **kwargs):
+        return json.loads(query_redis(params["host"], params["port"], params["password"], params["db"], command,
+                                      **kwargs))
+    return run
+
+
+def test_quoted_newlines(query, client):
+    """引号内的换行"""
+    result = query('SET test:note "line1\nline2"')
+    check("单条命令不被拆分", result["result"] is True and "results" not in result, result)
+    check("值中保留换行", client.get("test:note") == b"line1\nline2", client.get("test:note"))
+
+    result = query("SET test:a 'x\ny'\nGET test:a\nGET test:note")
+    check("管道按引号外的换行拆分为 3 条", len(result["results"]) == 3, result)
+    check("每条命令原文完整", result["results"][0]["command"] == "SET test:a 'x\ny'", result["results"][0])
+    check("管道结果正确", [r.get("result") for r in result["results"]] == [True, "x\ny", "line1\nline2"],
+          result["results"])
+
+
+def test_keys_via_scan(query, client):
+    """KEYS 以 SCAN 执行"""
+    client.mset({f"test:key:{i}": i for i in range(50)})
+    scanned = query("KEYS test:key:*")
+    direct = query("KEYS test:key:*", keys_via_scan=False)
+    check("返回结构与 KEYS 相同", set(scanned) == {"command", "result", "type"} and scanned["type"] == "list",
+          sorted(scanned))
+    check("结果与 KEYS 一致", sorted(scanned["result"]) == sorted(direct["result"]), len(scanned["result"]))
+    check("按 max_results 截断", len(query("KEYS test:key:*", max_results=7)["result"]) == 7)
+
+
+def test_scan_remaining(query, client):
+    """SCAN 分段遍历不遗漏"""
+    client.sadd("test:set", *range(300))
+    seen = []
+    sizes = []
+    cursor = "0"
+    while len(sizes) < 100:
+        result = query(f"SSCAN test:set {cursor} COUNT 40", max_results=25)
+        sizes.append(len(result["result"]))
+        seen += result["result"] + result.get("remaining", [])
+        cursor = result["cursor"]
+        if cursor == "0":
+            break
+    check("每段不超过 max_results", max(sizes) <= 25, sizes)
+    check("result 加 remaining 覆盖全部成员", set(seen) == {str(i) for i in range(300)}, len(set(seen)))
+
+
+if __name__ == "__main__":
+    run_tests("Redis 查询工具测试", [test_quoted_newlines, test_keys_via_scan, test_scan_remaining])